@@ -33,8 +33,14 @@ class QuoriClockApp:
         self.alarm_time = None
         self.timer_running = False
         self.timer_seconds = 0.0
+        self.timer_deadline = 0.0
         self.stopwatch_running = False
         self.stopwatch_time = 0.0
+        self.sw_started = 0.0
+        # カーネルの共有フレームクロック上で動かす (各ループの after を個別に回さない)
+        self.clock = os_core.frame_clock
+        self.timer_job = None
+        self.sw_job = None
 
         self.setup_styles()
         self.create_widgets()
@@ -117,16 +123,19 @@ class QuoriClockApp:
 
     # --- ロジック部 ---
     def update_time_loop(self):
+        self.update_time()
+        # 秒の頭に合わせて発火 / 最小化中もアラーム判定は止めない
+        self.clock.every(1000, self.update_time, widget=self.root, align=True, skip_hidden=False)
+
+    def update_time(self):
         now = datetime.datetime.now()
         cur_t = now.strftime("%H:%M:%S")
         self.lbl_big_time.config(text=cur_t)
         self.lbl_date.config(text=now.strftime("%Y / %m / %d (%a)"))
         
         if self.alarm_time == cur_t:
-            self.trigger_alarm()
-            
-        if self.root.winfo_exists():
-            self.root.after(1000, self.update_time_loop)
+            # モーダルは共有ティックの外で出す (表示中も他アプリの描画を止めない)
+            self.root.after(0, self.trigger_alarm)
 
     def set_alarm(self):
         self.alarm_time = self.ent_alarm.get()
@@ -139,37 +148,51 @@ class QuoriClockApp:
     def start_timer(self):
         try:
             self.timer_seconds = float(self.ent_timer_input.get())
-            self.timer_running = True
-            self.run_timer_tick()
         except ValueError:
             messagebox.showerror("Error", "Invalid time input")
+            return
+        # 残り時間は締切時刻との差で計算 (tick が遅れても誤差が積もらない)
+        self.timer_deadline = time.monotonic() + self.timer_seconds
+        self.timer_running = True
+        if self.timer_job: self.timer_job.cancel()
+        self.run_timer_tick()
+        self.timer_job = self.clock.every(100, self.run_timer_tick, widget=self.root, skip_hidden=False)
 
     def run_timer_tick(self):
-        if self.timer_running and self.timer_seconds > 0:
-            self.timer_seconds -= 0.1
-            self.lbl_timer_disp.config(text=f"{max(0, self.timer_seconds):.1f}")
-            self.root.after(100, self.run_timer_tick)
-        elif self.timer_seconds <= 0 and self.timer_running:
+        if not self.timer_running: return
+        self.timer_seconds = self.timer_deadline - time.monotonic()
+        self.lbl_timer_disp.config(text=f"{max(0, self.timer_seconds):.1f}")
+        if self.timer_seconds <= 0:
             self.timer_running = False
-            messagebox.showinfo("Timer", "Countdown finished")
+            if self.timer_job:
+                self.timer_job.cancel()
+                self.timer_job = None
+            self.root.after(0, lambda: messagebox.showinfo("Timer", "Countdown finished"))
 
     def start_sw(self):
         if not self.stopwatch_running:
             self.stopwatch_running = True
-            self.update_sw_tick()
+            self.sw_started = time.monotonic() - self.stopwatch_time
+            # WATCH タブが見えていない間は表示更新をスキップ (経過時間は開始時刻から算出)
+            self.sw_job = self.clock.every(50, self.update_sw_tick, widget=self.lbl_sw_disp)
 
-    def stop_sw(self): self.stopwatch_running = False
+    def stop_sw(self):
+        if self.stopwatch_running:
+            self.stopwatch_time = time.monotonic() - self.sw_started
+            self.lbl_sw_disp.config(text=f"{self.stopwatch_time:.2f}s")
+        self.stopwatch_running = False
+        if self.sw_job:
+            self.sw_job.cancel()
+            self.sw_job = None
 
     def reset_sw(self):
-        self.stopwatch_running = False
+        self.stop_sw()
         self.stopwatch_time = 0.0
         self.lbl_sw_disp.config(text="0.00s")
 
     def update_sw_tick(self):
         if self.stopwatch_running:
-            self.stopwatch_time += 0.05
-            self.lbl_sw_disp.config(text=f"{self.stopwatch_time:.2f}s")
-            self.root.after(50, self.update_sw_tick)
+            self.lbl_sw_disp.config(text=f"{time.monotonic() - self.sw_started:.2f}s")
 
     def save_schedule(self):
         date = self.cal.get() if DateEntry else "Unknown"
@@ -47,7 +47,12 @@ class DesktopExt:
             "last_update": ""
         }
         
-        # 1. 保存されたデータのロード
+        # 1. 保存されたデータのロード (カーネルの設定ストアがあれば共有インスタンスを使う)
+        self.store = None
+        if hasattr(self.os_core, "stores"):
+            self.store = self.os_core.stores.open(CONFIG_FILE, self.local_config)
+            self.store.subscribe(self.on_store_changed)
+            self.win.bind("<Destroy>", lambda e: e.widget is self.win and self.store.unsubscribe(self.on_store_changed))
         self.load_desktop_data()
         
         # 2. ロードされたデータに基づき初期描画
@@ -61,7 +66,9 @@ class DesktopExt:
     # -------------------------------------------------------------------------
     def load_desktop_data(self):
         """desktop_ext_deta.qcfg から設定を読み込みます。"""
-        if os.path.exists(CONFIG_FILE):
+        if self.store:
+            self.local_config.update(self.store.snapshot())
+        elif os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                     stored_data = json.load(f)
@@ -76,13 +83,23 @@ class DesktopExt:
             import datetime
             self.local_config["last_update"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.local_config, f, indent=4)
+            if self.store:
+                # ディスクへの書き出しはストアが遅延・集約して行う
+                self.store.update(self.local_config)
+            else:
+                with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+                    json.dump(self.local_config, f, indent=4)
             
             self.os_core.write_log("Desktop Extension: System state persisted.")
         except Exception as e:
             messagebox.showerror("STORAGE ERROR", f"Failed to save desktop data: {e}")
 
+    def on_store_changed(self, store, changed):
+        """別ウィンドウ等からの更新をこのウィンドウの状態へ反映します。"""
+        self.local_config.update(store.snapshot())
+        if hasattr(self, "status_label") and self.status_label.winfo_exists():
+            self.status_label.config(text=f"Last Sync: {self.local_config['last_update'] or 'RESET'}")
+
     # -------------------------------------------------------------------------
     # CORE LOGIC METHODS
     # -------------------------------------------------------------------------
@@ -157,9 +174,7 @@ class DesktopExt:
             # Kernel側のリセット
             self.os_core.bg_label.config(image="", text="Quori OS 10 Core Online", fg="#0088ff")
             self.os_core.desktop_image_ref = None
-            if hasattr(self.os_core, 'icon_group') and self.os_core.icon_group:
-                self.os_core.icon_group.destroy()
-                self.os_core.icon_group = None
+            self._clear_icon_group()
             
             # 保存データの初期化
             self.local_config = {
@@ -175,19 +190,55 @@ class DesktopExt:
     def render_icons(self):
         """デスクトップ上にアイコンをレンダリングし、状態を保存します。"""
         if hasattr(self.os_core, 'icon_group') and self.os_core.icon_group:
-            self.os_core.icon_group.destroy()
+            self._clear_icon_group()
             self.local_config["icons_visible"] = False
         else:
             self.os_core.icon_group = tk.Frame(self.os_core.root, bg="", bd=0)
             self.os_core.icon_group.place(x=60, y=60)
+            self.os_core.desktop_icons = {}
             
-            apps = [f for f in os.listdir(os.path.dirname(__file__)) if f.endswith(".py")]
-            for i, name in enumerate(apps):
-                aid = name.replace(".py", "")
-                btn = tk.Button(self.os_core.icon_group, text=f"💠\n{aid.upper()}", 
-                                fg="white", bg="black", relief="flat", font=("Consolas", 10), 
-                                width=12, command=lambda n=aid: self.os_core.invoke_app(n))
-                btn.grid(row=i//5, column=i%5, padx=20, pady=20)
+            for aid in self._installed_apps():
+                self._add_desktop_icon(aid)
+            self._layout_desktop_icons()
+
+            # app/ の変更はカーネルのインデックスから差分で受け取る
+            if hasattr(self.os_core, "app_index"):
+                self.os_core.icon_group_watch = self.os_core.app_index.subscribe(self._on_app_delta)
             self.local_config["icons_visible"] = True
             
         self.save_desktop_data()
+
+    def _installed_apps(self):
+        if hasattr(self.os_core, "app_index"):
+            return self.os_core.app_index.names()
+        return sorted(f.replace(".py", "") for f in os.listdir(os.path.dirname(__file__)) if f.endswith(".py"))
+
+    def _add_desktop_icon(self, aid):
+        self.os_core.desktop_icons[aid] = tk.Button(
+            self.os_core.icon_group, text=f"💠\n{aid.upper()}", 
+            fg="white", bg="black", relief="flat", font=("Consolas", 10), 
+            width=12, command=lambda n=aid: self.os_core.invoke_app(n))
+
+    def _layout_desktop_icons(self):
+        for i, aid in enumerate(sorted(self.os_core.desktop_icons)):
+            self.os_core.desktop_icons[aid].grid(row=i//5, column=i%5, padx=20, pady=20)
+
+    def _on_app_delta(self, delta):
+        """追加/削除されたアイコンだけ作成・破棄し、グリッド位置を詰め直します。"""
+        if not (self.os_core.icon_group and self.os_core.icon_group.winfo_exists()): return
+        for entry in delta.removed:
+            btn = self.os_core.desktop_icons.pop(entry.name, None)
+            if btn: btn.destroy()
+        for entry in delta.added:
+            if entry.name not in self.os_core.desktop_icons: self._add_desktop_icon(entry.name)
+        if delta.added or delta.removed:
+            self._layout_desktop_icons()
+
+    def _clear_icon_group(self):
+        if getattr(self.os_core, "icon_group_watch", None):
+            self.os_core.app_index.unsubscribe(self.os_core.icon_group_watch)
+            self.os_core.icon_group_watch = None
+        if getattr(self.os_core, "icon_group", None):
+            self.os_core.icon_group.destroy()
+        self.os_core.icon_group = None
+        self.os_core.desktop_icons = {}
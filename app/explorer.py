@@ -1,7 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 import os
+import io
+import time
 import datetime
+import importlib
 
 def run(master, os_core):
     """Quori OS エントリーポイント"""
@@ -75,6 +78,33 @@ def run(master, os_core):
             except Exception as e:
                 messagebox.showerror("Error", f"Could not create file: {e}")
 
+    def run_script(path, name):
+        """.qs: アプリ名1語だけなら従来通り起動、それ以外は qcp のスクリプトとして実行 (出力はログへ)"""
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        modules = getattr(os_core, "modules", None)
+        qcp = modules.load("qcp")[0] if modules else importlib.import_module("app.qcp")
+        app_to_launch = qcp.launcher_target(source)
+        if app_to_launch:
+            os_core.launch_app(app_to_launch)
+            return
+
+        out = io.StringIO()
+        shell = qcp.ScriptShell(os_core, out=out, cwd=target_dir, acc_color=acc)
+        t0 = time.perf_counter()
+        status_var.set(f"RUNNING: {name}")
+
+        def done(status):
+            shell.close()
+            elapsed = (time.perf_counter() - t0) * 1000
+            status_var.set(f"SCRIPT {name}: {shell.commands} command(s), exit {status} ({elapsed:.0f} ms)")
+            if hasattr(os_core, "write_log"):
+                os_core.write_log(f"Script {name} exit {status} ({shell.commands} command(s)):\n{out.getvalue()[-4000:]}",
+                                  "INFO" if status == 0 else "ERROR")
+            if status: messagebox.showerror("Script Error", f"{name} exited with {status}\n\n{out.getvalue()[-1500:]}")
+            refresh()   # > でファイルが増えているかもしれない
+        shell.run_async(source.splitlines(), win, done)
+
     def on_double_click(event):
         selected = tree.selection()
         if not selected: return
@@ -84,9 +114,7 @@ def run(master, os_core):
 
         if os.path.isfile(path):
             if clean_name.endswith(".qs"):
-                with open(path, "r", encoding="utf-8") as f:
-                    app_to_launch = f.read().strip()
-                os_core.launch_app(app_to_launch)
+                run_script(path, clean_name)
             else:
                 os_core.launch_app("texteditor", target_file=clean_name)
 
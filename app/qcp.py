@@ -1,17 +1,27 @@
 import tkinter as tk
-from tkinter import messagebox, filedialog, font
-from PIL import Image, ImageTk
+from tkinter import font
 import os
+import re
 import sys
-import json
-import importlib
-import importlib.util
-import winreg
-import subprocess
 import time
 import datetime
-import ctypes
 import threading
+import shlex
+import argparse
+import itertools
+
+from core.imports import lazy_import
+from core.term_output import OutputBuffer
+from core.term_jobs import JobManager
+from core.term_commands import CommandRegistry, CommandError, Completer, PENDING, common_prefix, item_text, split_args, stream_lines
+from core import term_fs
+
+# ホスト診断でしか使わないモジュールは初回使用まで読み込まない
+ctypes = lazy_import("ctypes")
+try:
+    winreg = lazy_import("winreg")
+except ModuleNotFoundError:
+    winreg = None   # Windows 以外のホスト
 
 # =============================================================================
 # [QCP-PRO] ADVANCED TERMINAL SUBSYSTEM - VERSION 3.0.5
@@ -92,7 +102,7 @@ class QuoriCommandPrompt:
             relief="flat",
             padx=25,
             pady=25,
-            undo=True
+            undo=False   # 出力の挿入を undo 履歴に積むとスクロールバックを捨ててもメモリが減らない
         )
         self.text_area.pack(side="left", fill="both", expand=True)
 
@@ -101,21 +111,42 @@ class QuoriCommandPrompt:
         self.text_area.config(yscrollcommand=self.scroll_bar.set)
         self.scroll_bar.config(command=self.text_area.yview)
 
+        # 出力はフレーム毎にまとめて挿入 (スクロールバックは上限付き)
+        clock = getattr(self.os_core, "frame_clock", None)
+        self.out = OutputBuffer(self.text_area, self.main_font, self.bold_font, accent=self.acc_color,
+                                frame_ms=max(1, int(1000 / clock.fps)) if clock else 16)
+        theme = getattr(self.os_core, "theme", None)
+        if theme:
+            theme.subscribe(self.on_theme_changed)
+            self.win.bind("<Destroy>", lambda e: theme.unsubscribe(self.on_theme_changed) if e.widget is self.win else None, add="+")
+
+        # WIN: コマンドのジョブ (出力は逐次、端末が詰まったら読み取りを止める)
+        self.jobs = JobManager(self.on_job_output, on_exit=self.on_job_exit, backlog=lambda: self.out.pending_chars)
+        self.completer = Completer(COMMANDS, app_names=lambda: app_names(self.os_core))
+        self.last_status = 0
+        self.running = False              # 非同期コマンドの実行中 (終わるまで次の入力は受け付けない)
+        self.cancel = threading.Event()   # Ctrl+C で立つ (ワーカーで動くコマンドが見る)
+        self.win.bind("<Destroy>", lambda e: self.jobs.kill_all() if e.widget is self.win else None, add="+")
+
         # イベントバインド
         self.text_area.bind("<Return>", self.handle_input_event)
         self.text_area.bind("<BackSpace>", self.enforce_prompt_protection)
+        self.text_area.bind("<Control-c>", self.interrupt_job)
+        self.text_area.bind("<Control-z>", self.detach_job)
+        self.text_area.bind("<Tab>", self.complete_input)
         self.text_area.focus_set()
 
     def write_out(self, text, color="#dcdcdc", is_bold=False):
-        """ターミナルへの標準出力"""
-        tag_key = f"color_{color}_bold_{is_bold}"
-        if is_bold:
-            self.text_area.tag_configure(tag_key, foreground=color, font=self.bold_font)
-        else:
-            self.text_area.tag_configure(tag_key, foreground=color, font=self.main_font)
-            
-        self.text_area.insert(tk.END, text, tag_key)
-        self.text_area.see(tk.END)
+        """ターミナルへの標準出力 (次のフレームでまとめて描画)"""
+        self.out.write(text, color, is_bold)
+
+    def post_out(self, text, color="#dcdcdc", is_bold=False):
+        """ワーカースレッドからの出力 (after を経由せずバッファに積む)"""
+        self.out.post(text, color, is_bold)
+
+    def on_theme_changed(self, old, new):
+        if self.out.accent.lower() == old.lower():
+            self.acc_color = self.out.accent = new
 
     def execute_boot_diagnostics(self):
         """起動時のシステムスキャン演出 (WinReg, CTypes活用)"""
@@ -124,43 +155,45 @@ class QuoriCommandPrompt:
         self.write_out(f"[*] Boot Time: {boot_time}\n")
         self.write_out(f"[*] Connected to Kernel: {self.version}\n")
         
-        # ホストOS特定 (winreg)
-        try:
-            h_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion")
-            prod_name = winreg.QueryValueEx(h_key, "ProductName")[0]
-            winreg.CloseKey(h_key)
-            self.write_out(f"[*] Host OS: {prod_name}\n")
-        except: pass
+        # ホストOS特定 (winreg / Windows 以外ではスキップ)
+        if winreg is not None:
+            try:
+                h_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion")
+                prod_name = winreg.QueryValueEx(h_key, "ProductName")[0]
+                winreg.CloseKey(h_key)
+                self.write_out(f"[*] Host OS: {prod_name}\n")
+            except: pass
 
-        # メモリ負荷取得 (ctypes)
-        try:
-            class MEMORYSTATUSEX(ctypes.Structure):
-                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong), 
-                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
-                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
-                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
-                            ("sullAvailExtendedVirtual", ctypes.c_ulonglong)]
-            stat = MEMORYSTATUSEX()
-            stat.dwLength = ctypes.sizeof(stat)
-            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
-            self.write_out(f"[*] System Memory Load: {stat.dwMemoryLoad}%\n")
-        except: pass
+        # メモリ負荷取得 (ctypes / windll は Windows のみ)
+        if os.name == "nt":
+            try:
+                class MEMORYSTATUSEX(ctypes.Structure):
+                    _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong), 
+                                ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                                ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                                ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                                ("sullAvailExtendedVirtual", ctypes.c_ulonglong)]
+                stat = MEMORYSTATUSEX()
+                stat.dwLength = ctypes.sizeof(stat)
+                ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
+                self.write_out(f"[*] System Memory Load: {stat.dwMemoryLoad}%\n")
+            except: pass
 
         self.write_out("-" * 60 + "\n")
         self.write_out("Ready for commands. Type 'help' for assistance.\n\n")
         self.refresh_prompt_display()
 
     def refresh_prompt_display(self):
-        prompt = f"Q:{self.current_dir}> "
-        self.write_out(prompt, self.acc_color, True)
-        self.text_area.mark_set("input_start", "insert")
+        self.out.prompt(f"Q:{self.current_dir}> ")
 
     def enforce_prompt_protection(self, event):
         if self.text_area.index("insert") == self.text_area.index("input_start"):
             return "break"
 
     def handle_input_event(self, event):
-        raw_input = self.text_area.get("input_start", "insert").strip()
+        if self.running: return "break"   # 実行中の入力は先行入力として残す
+        raw_input = self.text_area.get("input_start", "end-1c").strip()
+        self.out.commit_input()
         self.write_out("\n")
         
         if raw_input:
@@ -171,94 +204,674 @@ class QuoriCommandPrompt:
         return "break"
 
     def route_command(self, cmd_line):
-        """コマンド解析とKernelへのリレー"""
-        cmd_lower = cmd_line.lower()
-
-        # 1. Windows Bridge
-        if cmd_line.upper().startswith("WIN:"):
-            target = cmd_line[4:].strip()
-            threading.Thread(target=self.execute_host_shell, args=(target,), daemon=True).start()
-            return
-
-        # 2. Kernel App Launch (qoa !m)
-        elif cmd_lower.startswith("qoa "):
-            self.handle_qoa_logic(cmd_line)
-
-        # 3. File System
-        elif cmd_lower in ["ls", "dir"]:
-            self.list_directory()
-        elif cmd_lower.startswith("cd "):
-            self.change_directory(cmd_line[3:].strip())
-
-        # 4. Utilities
-        elif cmd_lower == "help":
-            self.display_help()
-        elif cmd_lower in ["cls", "clear"]:
-            self.text_area.delete("1.0", tk.END)
+        """コマンド解析とKernelへのリレー (コマンド表 COMMANDS 経由)"""
+        self.cancel.clear()
+        self.running = True
+        COMMANDS.dispatch(self, cmd_line)
+
+    # --- SHELL INTERFACE (コマンドのハンドラから使う) ---
+    write = write_out
+    post = post_out
+
+    def finish(self, status=0):
+        """コマンド終了: プロンプトを戻す (ワーカースレッドからも可)"""
+        self.last_status = status
+        self.running = False
+        if threading.current_thread() is threading.main_thread():
             self.refresh_prompt_display()
-            return
-        elif cmd_lower == "exit":
-            self.win.destroy()
-            return
         else:
-            self.write_out(f"Command '{cmd_line}' not found.\n", "red")
+            try: self.win.after(0, self.refresh_prompt_display)
+            except (tk.TclError, RuntimeError): pass
+        return status
 
-        self.refresh_prompt_display()
+    def clear(self):
+        self.out.clear()
+
+    def close(self):
+        self.jobs.kill_all()
+        self.win.destroy()
+
+    def start_job(self, command, background=False):
+        return self.jobs.start(command, self.current_dir, foreground=not background)
+
+    def throttle(self, high_water=512 * 1024):
+        """ワーカー用: 端末の未描画分が捌けるまで待つ (中断されたら即戻る)"""
+        while self.out.pending_chars > high_water and not self.cancel.is_set():
+            time.sleep(0.01)
+
+    # --- COMPLETION ---
+    def complete_input(self, event):
+        """Tab: 候補が1つなら確定、複数なら共通部分まで伸ばし、伸びなければ一覧を出す"""
+        line = self.text_area.get("input_start", "insert")
+        start, candidates = self.completer.complete(self, line)
+        if candidates:
+            word = line[start:]
+            common = common_prefix(candidates) if len(candidates) > 1 else candidates[0]
+            if len(common) > len(word) or (common != word and len(candidates) == 1):
+                self.text_area.delete(f"input_start+{start}c", "insert")
+                self.text_area.insert("insert", common)
+            elif len(candidates) > 1:
+                more = "  ..." if len(candidates) >= 200 else ""
+                self.write_out("  ".join(c.rstrip() for c in candidates) + more + "\n", "#888888")
+        return "break"
+
+    # --- HOST JOBS ---
+    def on_job_output(self, job, text, is_err):
+        """読み取りスレッドから。バックグラウンドのジョブは行頭に [id] を付ける"""
+        color = "red" if is_err else "#dcdcdc"
+        if not job.foreground:
+            prefix = f"[{job.id}] "
+            bol = getattr(job, "at_line_start", True)
+            text = (prefix if bol else "") + text.replace("\n", "\n" + prefix)
+            if text.endswith(prefix):
+                text = text[:-len(prefix)]
+                job.at_line_start = True
+            else: job.at_line_start = False
+        self.post_out(text, color)
+
+    def on_job_exit(self, job):
+        """監視スレッドから。フォアグラウンドのジョブならプロンプトを戻す"""
+        if job.state == "killed":
+            self.post_out(f"^C [{job.id}] killed\n", "orange")
+        elif not job.foreground:
+            self.post_out(f"[{job.id}] Done ({job.returncode})  {job.command}\n", "#888888")
+        elif job.returncode:
+            self.post_out(f"[exit {job.returncode}]\n", "#888888")
+        if job.foreground: self.finish(job.returncode)
+
+    def interrupt_job(self, event):
+        """Ctrl+C: 選択中ならコピー、フォアグラウンドのジョブがあれば中断、無ければ入力を破棄"""
+        if self.text_area.tag_ranges("sel"): return None
+        job = self.jobs.foreground()
+        if job:
+            self.jobs.kill(job)
+        elif self.running:
+            self.cancel.set()
+        else:
+            self.out.commit_input()
+            self.write_out("^C\n", "orange")
+            self.refresh_prompt_display()
+        return "break"
+
+    def detach_job(self, event):
+        """Ctrl+Z: フォアグラウンドのジョブをバックグラウンドへ (実行は継続)"""
+        job = self.jobs.foreground()
+        if job:
+            job.foreground = False
+            self.write_out(f"\n[{job.id}] moved to background\n", self.acc_color)
+            self.finish(0)
+        return "break"
+
+
+# =============================================================================
+# [COMMANDS] BUILT-IN COMMANDS (handler(shell, args) — 端末でもスクリプトでも同じ実装)
+# =============================================================================
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(APP_DIR, "deta")   # > / >> のリダイレクト先
+COMMANDS = CommandRegistry(data_dir=DATA_DIR)
+
+
+def app_names(os_core):
+    """qoa の補完対象: カーネルのアプリ索引 (無ければ app/ の .py) + 設定アプリ"""
+    index = getattr(os_core, "app_index", None)
+    if index is not None: names = index.names()
+    else: names = [f[:-3] for f in os.listdir(APP_DIR) if f.endswith(".py") and not f.startswith("__")]
+    return list(names) + ["setting"]
+
+
+def complete_qoa(shell, before, word):
+    if len(before) == 1: return [f + " " for f in ("!m", "!p") if f.startswith(word)]
+    completer = getattr(shell, "completer", None)
+    return [n + " " for n in completer.app_trie().complete(word)] if completer else []
+
+
+@COMMANDS.command("WIN:", prefix=True, usage="WIN:<cmd> [&]", complete="path",
+                  help="Host shell command (streams output, & = background)")
+def cmd_host(shell, args):
+    """WIN:<cmd> はフォアグラウンド (終了でプロンプト)、WIN:<cmd> & はバックグラウンド"""
+    background = args.endswith("&")
+    if background: args = args[:-1].strip()
+    if not args: raise CommandError("Usage: WIN:<command> [&]")
+    try:
+        job = shell.start_job(args, background)
+    except OSError as e:
+        shell.write(f"Shell Error: {e}\n", "red")
+        return 1
+    if background:
+        shell.write(f"[{job.id}] {job.proc.pid}\n", shell.acc_color)
+        return 0
+    return PENDING
 
-    def execute_host_shell(self, shell_cmd):
-        """[Threading/Subprocess] Windowsコマンド実行"""
+
+def jobs_stream(shell, args, upstream):
+    return (job.describe() for job in shell.jobs.running())
+
+
+@COMMANDS.command("jobs", stream=jobs_stream, help="List host jobs (Ctrl+C interrupt, Ctrl+Z background)")
+def cmd_jobs(shell, args):
+    jobs = shell.jobs.running()
+    if not jobs: shell.write("No jobs.\n")
+    for job in jobs: shell.write(job.describe() + "\n")
+
+
+def _job_arg(shell, arg):
+    try:
+        job = shell.jobs.get(int(arg.lstrip("%")) if arg else None)
+    except ValueError:
+        job = None
+    if job is None: raise CommandError(f"No such job: {arg or '(none)'}")
+    return job
+
+
+@COMMANDS.command("fg", usage="fg [n]", help="Bring a host job to the foreground")
+def cmd_fg(shell, args):
+    job = _job_arg(shell, args)
+    job.foreground = True
+    shell.write(job.command + "\n", shell.acc_color)
+    # 既に終わっていたら終了通知は来ないのでここで終える
+    return job.returncode if job.returncode is not None else PENDING
+
+
+@COMMANDS.command("kill", usage="kill <n>", help="Terminate a host job and its children")
+def cmd_kill(shell, args):
+    shell.jobs.kill(_job_arg(shell, args))
+
+
+@COMMANDS.command("qoa", usage="qoa !m|!p <app>", complete=complete_qoa,
+                  help="Launch system module (!p = isolated process)")
+def cmd_qoa(shell, args):
+    """Kernelの invoke_app を呼び出す"""
+    tokens = args.split()
+    if len(tokens) < 2 or tokens[0] not in ("!m", "!p"):
+        raise CommandError("Usage: qoa !m <app_name>  |  qoa !p <app_name> (isolated process)")
+    module_name = tokens[1]
+    # Kernel側のメソッド存在確認
+    if not hasattr(shell.os_core, "invoke_app"):
+        shell.write("Kernel Error: invoke_app method not found.\n", "red")
+        return 1
+    if tokens[0] == "!p":
+        # 隔離モード: 別プロセスで起動 (重いアプリでもデスクトップが固まらない)
+        shell.os_core.invoke_app(module_name, isolated=True)
+        shell.write(f"Relaying isolated launch request for {module_name} to Kernel...\n")
+    else:
+        shell.os_core.invoke_app(module_name)
+        shell.write(f"Relaying launch request for {module_name} to Kernel...\n")
+
+
+LS_USAGE = "Usage: ls [-l] [-a] [-R] [-S|-t|-U] [-r] [-n MAX] [path|glob] [glob]"
+
+
+def parse_ls(args):
+    """ls の引数 → オプション辞書 (フラグはまとめ書き可: -lR)"""
+    opts = {"long": False, "all": False, "recursive": False, "sort": "name", "reverse": False, "limit": None, "target": "", "pattern": None}
+    tokens = split_args(args)   # app\deta や C:\Users をそのまま受け取る
+    while tokens:
+        tok = tokens.pop(0)
+        if tok == "-n":
+            if not tokens or not tokens[0].isdigit(): raise CommandError(LS_USAGE)
+            opts["limit"] = int(tokens.pop(0))
+        elif tok.startswith("-") and len(tok) > 1:
+            for flag in tok[1:]:
+                if flag == "l": opts["long"] = True
+                elif flag == "a": opts["all"] = True
+                elif flag == "R": opts["recursive"] = True
+                elif flag == "S": opts["sort"] = "size"
+                elif flag == "t": opts["sort"] = "time"
+                elif flag == "U": opts["sort"] = None
+                elif flag == "r": opts["reverse"] = True
+                else: raise CommandError(LS_USAGE)
+        elif not opts["target"]:
+            opts["target"] = tok
+        elif opts["pattern"] is None:
+            opts["pattern"] = tok   # ls -R app *.py
+        else:
+            raise CommandError(LS_USAGE)
+    return opts
+
+
+def ls_target(shell, args):
+    """ls の引数 → (オプション, ディレクトリ, glob)"""
+    opts = parse_ls(args)
+    root, pattern = term_fs.split_target(shell.current_dir, opts["target"])
+    if opts["pattern"]:
+        if pattern: raise CommandError(LS_USAGE)
+        pattern = opts["pattern"]
+    if not os.path.isdir(root): raise CommandError(f"Path not found: {opts['target']}")
+    return opts, root, pattern
+
+
+def ls_stream(shell, args, upstream):
+    """パイプライン用: FileRecord を走査順に返す (-n を付けた時だけ件数を切る)"""
+    opts, root, pattern = ls_target(shell, args)
+    records = term_fs.walk(root, opts["recursive"], pattern, opts["all"], opts["sort"], opts["reverse"], long=opts["long"])
+    return itertools.islice(records, opts["limit"]) if opts["limit"] else records
+
+
+@COMMANDS.command("ls", aliases=("dir",), usage="ls [-lRaStrU] [glob]", complete="path", stream=ls_stream,
+                  help="List directory (-l long, -R recursive, -n MAX entries)")
+def cmd_ls(shell, args):
+    """scandir の型情報で一覧 (stat は -l/-S/-t の時だけ)。走査と整形はワーカーで、結果は逐次表示"""
+    opts, root, pattern = ls_target(shell, args)
+    limit = 10000 if opts["limit"] is None else opts["limit"]   # 端末へ直接出す時だけの既定の上限
+
+    def worker():
+        status, errors = 0, []
         try:
-            res = subprocess.run(shell_cmd, shell=True, capture_output=True, text=True, cwd=self.current_dir)
-            if res.stdout: self.win.after(0, lambda: self.write_out(res.stdout))
-            if res.stderr: self.win.after(0, lambda: self.write_out(res.stderr, "red"))
+            t0 = time.perf_counter()
+            shell.post(f"\n Index of {os.path.join(root, pattern) if pattern else root}:\n", shell.acc_color)
+            records = term_fs.walk(root, opts["recursive"], pattern, opts["all"], opts["sort"], opts["reverse"],
+                                   long=opts["long"], errors=errors)
+            if limit: records = itertools.islice(records, limit)
+            count = stream_lines(shell, map(str, records))
+            for path, e in errors[:20]:
+                shell.post(f"Access Denied: {e}\n", "red")
+            note = ""
+            if shell.cancel.is_set(): note, status = " (interrupted)", 130
+            elif limit and count >= limit: note = f" (stopped at {limit}, use -n)"
+            shell.post(f"-- {count} entries in {(time.perf_counter() - t0) * 1000:.0f} ms{note} --\n\n", "#888888")
         except Exception as e:
-            self.win.after(0, lambda: self.write_out(f"Shell Error: {e}\n", "red"))
-        self.win.after(0, self.refresh_prompt_display)
-
-    def handle_qoa_logic(self, raw_input):
-        """Kernelの invoke_app を呼び出す"""
-        tokens = raw_input.split()
-        if len(tokens) >= 3 and tokens[1] == "!m":
-            module_name = tokens[2]
-            # Kernel側のメソッド存在確認
-            if hasattr(self.os_core, "invoke_app"):
-                self.os_core.invoke_app(module_name)
-                self.write_out(f"Relaying launch request for {module_name} to Kernel...\n")
-            else:
-                self.write_out("Kernel Error: invoke_app method not found.\n", "red")
-        else:
-            self.write_out("Usage: qoa !m <app_name>\n", "orange")
+            shell.post(f"ls: {e}\n", "red")
+            status = 1
+        shell.finish(status)
+    threading.Thread(target=worker, name="qcp-ls", daemon=True).start()
+    return PENDING
+
+
+@COMMANDS.command("cd", usage="cd <path>", complete="path", help="Change working directory")
+def cmd_cd(shell, args):
+    new_path = os.path.abspath(os.path.join(shell.current_dir, args))
+    if not os.path.isdir(new_path):
+        shell.write("Path not found.\n", "red")
+        return 1
+    shell.current_dir = new_path
+    os.chdir(new_path)
+    completer = getattr(shell, "completer", None)
+    if completer: completer.dirs.prefetch(new_path)   # 次の Tab 補完用に裏で一覧を作っておく
+
+
+def parse_log(args):
+    """log の引数 → log_index.query の引数"""
+    opts = {"since": None, "until": None, "level": None, "grep": None, "event": None, "limit": "200"}
+    try:
+        tokens = split_args(args)   # --grep C:\Users の \ も残す
+        while tokens:
+            key = tokens.pop(0)
+            if not key.startswith("--") or key[2:] not in opts or not tokens:
+                raise ValueError(f"bad option '{key}'")
+            opts[key[2:]] = tokens.pop(0)
+        from core.log_index import parse_since
+        query = {
+            "since": parse_since(opts["since"]) if opts["since"] else None,
+            "until": parse_since(opts["until"]) if opts["until"] else None,
+            "level": opts["level"], "event": opts["event"], "grep": opts["grep"],
+            "limit": int(opts["limit"]),
+        }
+    except ValueError as e:
+        raise CommandError(f"Usage: log [--since 10m] [--until TIME] [--level ERROR] [--event spawn] [--grep TEXT] [--limit N] ({e})")
+    return query
+
+
+def log_stream(shell, args, upstream):
+    index = getattr(shell.os_core, "log_index", None)
+    if index is None: raise CommandError("Kernel Error: log index not available.")
+    return index.query(**parse_log(args))
+
+
+@COMMANDS.command("log", usage="log [opts]", stream=log_stream, help="Query kernel log (--since 10m --level ERROR --grep app)")
+def cmd_log(shell, args):
+    """log --since 10m --level ERROR --grep texteditor (Kernelのログ索引を利用)"""
+    index = getattr(shell.os_core, "log_index", None)
+    if index is None:
+        shell.write("Kernel Error: log index not available.\n", "red")
+        return 1
+    query = parse_log(args)
+
+    def worker():
+        status = 0
+        try:
+            t0 = time.perf_counter()
+            records = list(index.query(**query))
+            elapsed = (time.perf_counter() - t0) * 1000
+            shell.post("".join(r + "\n" for r in records))
+            shell.post(f"-- {len(records)} record(s) in {elapsed:.1f} ms --\n", shell.acc_color)
+        except Exception as e:
+            shell.post(f"Log Query Error: {e}\n", "red")
+            status = 1
+        shell.finish(status)
+    threading.Thread(target=worker, daemon=True).start()
+    return PENDING
+
 
-    def list_directory(self):
+@COMMANDS.command("prof", usage="prof launch|sample", complete=lambda shell, before, word:
+                  [w + " " for w in ("launch", "sample") if w.startswith(word)] if len(before) == 1 else [],
+                  help="prof launch <app> (.pstats) / prof sample 10s (.folded)")
+def cmd_prof(shell, args):
+    """prof launch <app> (cProfile) / prof sample 10s (統計サンプラー)"""
+    profiler = getattr(shell.os_core, "profiler", None)
+    tokens = args.split()
+    usage = "Usage: prof launch <app>  |  prof sample <seconds>[s]"
+    if profiler is None:
+        shell.write("Kernel Error: profiler not available.\n", "red")
+        return 1
+    if len(tokens) == 2 and tokens[0] == "launch":
         try:
-            files = os.listdir(self.current_dir)
-            self.write_out(f"\n Index of {self.current_dir}:\n", self.acc_color)
-            for f in files:
-                prefix = "<DIR>" if os.path.isdir(os.path.join(self.current_dir, f)) else "     "
-                self.write_out(f" {prefix}  {f}\n")
-            self.write_out("\n")
+            report, path = profiler.profile_launch(tokens[1])
         except Exception as e:
-            self.write_out(f"Access Denied: {e}\n", "red")
+            shell.write(f"Profiler Error: {e}\n", "red")
+            return 1
+        shell.write(report + "\n", "#ffffff")
+        shell.write(f"-- pstats saved: {path} --\n", shell.acc_color)
+    elif len(tokens) == 2 and tokens[0] == "sample":
+        try:
+            seconds = float(tokens[1].rstrip("s"))
+            if seconds <= 0: raise ValueError(tokens[1])
+        except ValueError:
+            raise CommandError(usage)
 
-    def change_directory(self, path):
+        def done(report, path):
+            if path is None:
+                shell.post(report + "\n", "red")
+                return
+            shell.post(report + "\n", "#ffffff")
+            shell.post(f"-- folded stacks saved: {path} --\n", shell.acc_color)
         try:
-            new_path = os.path.abspath(os.path.join(self.current_dir, path))
-            if os.path.isdir(new_path):
-                self.current_dir = new_path
-                os.chdir(new_path)
-            else: self.write_out("Path not found.\n", "red")
-        except Exception as e: self.write_out(f"CD Error: {e}\n", "red")
-
-    def display_help(self):
-        help_text = """
---- Quori Command Prompt Help ---
- qoa !m <app>   : Launch system module
- ls / dir       : List directory contents
- cd <path>      : Change working directory
- cls / clear    : Clear screen
- WIN:<cmd>      : Direct Windows shell access
- exit           : Close terminal
-"""
-        self.write_out(help_text, "#ffffff")
+            profiler.sample(seconds, done)
+        except RuntimeError as e:
+            shell.write(f"Profiler Error: {e}\n", "red")
+            return 1
+        shell.write(f"Sampling main thread for {seconds:g} s (results will print here)...\n")
+    else:
+        raise CommandError(usage)
+
+
+def help_stream(shell, args, upstream):
+    rows = [f" {cmd.usage:<22}: {cmd.help}" for cmd in COMMANDS.commands()]
+    rows.append(f" {'a | b > file':<22}: Pipe ls/log/jobs/help into filters, > / >> write into app/deta")
+    rows.append(f" {'Tab':<22}: Complete commands, app names and paths")
+    return iter(rows)
+
+
+@COMMANDS.command("help", stream=help_stream, help="Show this help")
+def cmd_help(shell, args):
+    shell.write("\n--- Quori Command Prompt Help ---\n" + "\n".join(help_stream(shell, args, None)) + "\n\n", "#ffffff")
+
+
+# =============================================================================
+# [PIPELINE FILTERS] LAZY STAGES FOR "|" (stream(shell, args, upstream) — 上流から引いた分だけ動く)
+# =============================================================================
+
+def _pipe_tokens(name, args, upstream):
+    if upstream is None: raise CommandError(f"{name}: reads from a pipe (e.g. ls -R | {name} ...)")
+    return split_args(args)   # grep \.qtf$ の \ も残す
+
+
+@COMMANDS.pipe("grep", usage="... | grep [-ivF] TEXT", help="Keep matching lines (regex; -i case, -v invert, -F fixed)")
+def pipe_grep(shell, args, upstream):
+    """レコードはパス (text 属性)、行はそのまま照合"""
+    tokens = _pipe_tokens("grep", args, upstream)
+    flags = set()
+    while tokens and re.fullmatch(r"-[ivF]+", tokens[0]):
+        flags.update(tokens.pop(0)[1:])
+    if len(tokens) != 1: raise CommandError("Usage: ... | grep [-i] [-v] [-F] TEXT")
+    try:
+        rx = re.compile(re.escape(tokens[0]) if "F" in flags else tokens[0], re.IGNORECASE if "i" in flags else 0)
+    except re.error as e:
+        raise CommandError(f"grep: {e}")
+    search, invert = rx.search, "v" in flags
+    return (item for item in upstream if (search(item_text(item)) is None) == invert)
+
+
+@COMMANDS.pipe("head", usage="... | head [N]", help="First N items (default 10), then stop upstream")
+def pipe_head(shell, args, upstream):
+    tokens = _pipe_tokens("head", args, upstream)
+    if tokens and tokens[0] == "-n": tokens.pop(0)
+    if len(tokens) > 1 or (tokens and not tokens[0].lstrip("-").isdigit()): raise CommandError("Usage: ... | head [N]")
+    return itertools.islice(upstream, int(tokens[0].lstrip("-")) if tokens else 10)
+
+
+SORT_FIELDS = {"name": "name", "path": "path", "size": "size", "time": "mtime"}
+
+
+@COMMANDS.pipe("sort", usage="... | sort [-rnfk]", help="Sort (-n numeric, -f fold case, -k name|size|time for ls)")
+def pipe_sort(shell, args, upstream):
+    """全件を溜める唯一のフィルタ (並べ終えてから流す)"""
+    tokens = _pipe_tokens("sort", args, upstream)
+    usage = "Usage: ... | sort [-r] [-n] [-f] [-k name|path|size|time]"
+    flags, field = set(), None
+    while tokens:
+        tok = tokens.pop(0)
+        if tok == "-k" and tokens and tokens[0] in SORT_FIELDS: field = SORT_FIELDS[tokens.pop(0)]
+        elif re.fullmatch(r"-[rnf]+", tok): flags.update(tok[1:])
+        else: raise CommandError(usage)
+    if field:
+        return _sort_by_field(upstream, field, "r" in flags)
+    if "n" in flags:
+        def key(item):
+            m = re.match(r"\s*(-?\d+(?:\.\d+)?)", item_text(item))
+            return float(m.group(1)) if m else float("inf")
+    elif "f" in flags:
+        def key(item): return item_text(item).lower()
+    else:
+        key = item_text
+
+    def run():
+        yield from sorted(upstream, key=key, reverse="r" in flags)
+    return run()
+
+
+def _sort_by_field(upstream, field, reverse):
+    """
+    レコードの属性で並べる。ls が stat していなければここで取る (ls -R | sort -k size でも効く)。
+    値の無いもの (ディレクトリのサイズ等) は向きに関係なく最後
+    """
+    def run():
+        keyed, missing = [], []
+        for item in upstream:
+            if field in ("size", "mtime") and getattr(item, "mtime", 0) is None and hasattr(item, "with_stat"):
+                item = item.with_stat()
+            value = getattr(item, field, None)
+            if value is None: missing.append(item)
+            else: keyed.append((value, item))
+        keyed.sort(key=lambda pair: pair[0], reverse=reverse)
+        yield from (item for _, item in keyed)
+        yield from missing
+    return run()
+
+
+@COMMANDS.pipe("count", usage="... | count", help="Number of items")
+def pipe_count(shell, args, upstream):
+    _pipe_tokens("count", args, upstream)
+
+    def run():
+        yield str(sum(1 for _ in upstream))
+    return run()
+
+
+@COMMANDS.pipe("wc", usage="... | wc", help="Lines, words and characters of the output")
+def pipe_wc(shell, args, upstream):
+    _pipe_tokens("wc", args, upstream)
+
+    def run():
+        lines = words = chars = 0
+        for item in upstream:
+            text = str(item)
+            lines += text.count("\n") + 1
+            words += len(text.split())
+            chars += len(text) + 1
+        yield f"{lines:>8} {words:>8} {chars:>8}"
+    return run()
+
+
+@COMMANDS.command("cls", aliases=("clear",), usage="cls / clear", help="Clear screen")
+def cmd_cls(shell, args):
+    shell.clear()
+
+
+@COMMANDS.command("exit", usage="exit [status]", help="Close terminal (scripts: stop with status)")
+def cmd_exit(shell, args):
+    if args.strip().lstrip("-").isdigit(): shell.last_status = int(args)
+    shell.close()
+    return PENDING   # ウィンドウが無くなるのでプロンプトは出さない
+
+
+# =============================================================================
+# [SCRIPT] HEADLESS SHELL + .qs BATCH RUNNER (python -m app.qcp --script file.qs)
+# =============================================================================
+
+def script_lines(lines):
+    """空行と # コメントを除いた実行行"""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"): yield line
+
+
+def launcher_target(source):
+    """旧形式の .qs (アプリ名1語だけ) ならそのアプリ名、スクリプトなら None"""
+    rows = list(script_lines(source.splitlines()))
+    if len(rows) == 1 and len(rows[0].split()) == 1 and COMMANDS.parse(rows[0])[0] is None:
+        return rows[0]
+    return None
+
+
+class ScriptShell:
+    """
+    tk.Text を持たない qcp シェル。コマンド表・ハンドラは端末と同じものをそのまま使い、
+    出力は行毎に描画せずファイル風オブジェクト (既定 stdout/stderr) へ書くだけ。
+    ・execute / run_lines: 呼び出し元のスレッドで実行し、PENDING のコマンドは finish まで待つ (CLI 用)
+    ・run_async: Tk のメインスレッドから after で1行ずつ進める (Explorer 用。qoa 等のウィンドウ操作もそのまま動く)
+    """
+    def __init__(self, os_core=None, out=None, err=None, cwd=None, acc_color="#00d9ff"):
+        self.os_core = os_core
+        self.out = out or sys.stdout
+        self.err = err or (self.out if out else sys.stderr)
+        self.current_dir = cwd or os.getcwd()
+        self.acc_color = acc_color
+        self.cancel = threading.Event()
+        self.running = False
+        self.closed = False
+        self.last_status = 0
+        self.commands = 0
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self.jobs = JobManager(self.on_job_output, on_exit=self.on_job_exit)
+        self.completer = None   # Tab 補完は無い (cd の度に一覧を先読みするスレッドも起こさない)
+
+    # --- SHELL INTERFACE ---
+    def write(self, text, color="#dcdcdc", is_bold=False):
+        with self._lock:
+            (self.err if color in ("red", "orange") else self.out).write(text)
+
+    post = write
+
+    def finish(self, status=0):
+        self.last_status = status
+        self.running = False
+        self._done.set()
+        return status
+
+    def throttle(self, high_water=0):
+        pass   # 描画待ちの出力は無い
+
+    def clear(self):
+        pass
+
+    def close(self):
+        """exit / 実行終了: 残っているジョブを止め、以降の行は実行しない"""
+        self.closed = True
+        self.jobs.kill_all()
+        self.running = False
+        self._done.set()
+
+    def start_job(self, command, background=False):
+        return self.jobs.start(command, self.current_dir, foreground=not background)
+
+    def on_job_output(self, job, text, is_err):
+        self.write(text, "red" if is_err else "#dcdcdc")
+
+    def on_job_exit(self, job):
+        if job.foreground: self.finish(job.returncode)
+
+    def interrupt(self):
+        """Ctrl+C 相当: フォアグラウンドのジョブを止め、ワーカーのコマンドには cancel を立てる"""
+        job = self.jobs.foreground()
+        if job: self.jobs.kill(job)
+        self.cancel.set()
+
+    # --- EXECUTION ---
+    def begin(self, line):
+        """1行を開始 (同期コマンドは戻る時点で終わっている。PENDING なら running のまま)"""
+        self.cancel.clear()
+        self._done.clear()
+        self.running = True
+        self.commands += 1
+        COMMANDS.dispatch(self, line)
+
+    def execute(self, line):
+        self.begin(line)
+        while self.running and not self._done.wait(0.1):   # 短く区切って待つ (Ctrl+C を受け取れるように)
+            pass
+        return self.last_status
+
+    def _should_stop(self, keep_going):
+        return self.closed or (self.last_status != 0 and not keep_going)
+
+    def run_lines(self, lines, keep_going=False):
+        """スクリプトを最後まで (既定では失敗した行で止まる)。終了ステータスを返す"""
+        for line in script_lines(lines):
+            self.execute(line)
+            if self._should_stop(keep_going): break
+        return self.last_status
+
+    def run_async(self, lines, widget, on_done=None, keep_going=False, budget_ms=8):
+        """
+        widget.after で進める版。同期コマンドは1回の呼び出しで budget_ms まで続けて実行し、
+        PENDING のコマンドは終わるまで数 ms 毎に様子を見る (UI は止まらない)
+        """
+        todo = iter(list(script_lines(lines)))
+
+        def step():
+            deadline = time.perf_counter() + budget_ms / 1000
+            while not self.running:
+                line = None if self._should_stop(keep_going) else next(todo, None)
+                if line is None:
+                    if on_done: on_done(self.last_status)
+                    return
+                self.begin(line)
+                if time.perf_counter() > deadline: break
+            try:
+                widget.after(10 if self.running else 1, step)
+            except tk.TclError:
+                self.close()   # 呼び出し元のウィンドウが閉じられた
+        widget.after(0, step)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.qcp", description="Quori Command Prompt (headless)")
+    parser.add_argument("--script", metavar="FILE", help=".qs script to run (one command per line, # comments)")
+    parser.add_argument("-c", dest="command", metavar="LINE", help="run a single command line")
+    parser.add_argument("-k", "--keep-going", action="store_true", help="continue after a failing command")
+    args = parser.parse_args(argv)
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    elif args.command:
+        lines = [args.command]
+    else:
+        parser.error("--script FILE or -c LINE is required")
+
+    shell = ScriptShell()
+    try:
+        status = shell.run_lines(lines, keep_going=args.keep_going)
+    except KeyboardInterrupt:
+        shell.interrupt()
+        shell._done.wait(5)
+        status = 130
+    finally:
+        shell.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
 
 # --- END OF QCP SOURCE ---
@@ -3,6 +3,42 @@ import platform
 def run(root, os_core):
     w = tk.Toplevel(root)
     w.title('MONITOR')
-    w.geometry('300x200')
+    w.geometry('560x460')
     info = f'ARCH: {platform.machine()}'
-    tk.Label(w, text=info, font=('Consolas', 12)).pack(pady=50)
+    tk.Label(w, text=info, font=('Consolas', 12)).pack(pady=(20, 10))
+
+    # メインループ計測 (Kernelの loop_monitor があれば表示)
+    monitor = getattr(os_core, 'loop_monitor', None)
+    if monitor is None:
+        tk.Label(w, text='Loop monitor not available.', fg='#888', font=('Consolas', 10)).pack()
+        return
+
+    table = tk.Label(w, text='', font=('Consolas', 9), justify='left', anchor='nw')
+    table.pack(fill='both', expand=True, padx=15)
+    status = tk.Label(w, text='', fg='#888', font=('Consolas', 8))
+    watchdog = getattr(os_core, 'watchdog', None)
+    status.pack(side='bottom', pady=5)
+
+    def refresh():
+        if not w.winfo_exists(): return
+        snap = monitor.snapshot()
+        lag = snap['lag']
+        stalls = watchdog.stats() if watchdog else {}
+        lines = [f"SCHEDULER LAG  p50 {lag['p50']:6.1f} ms   p99 {lag['p99']:6.1f} ms   max {lag['max']:6.1f} ms", '',
+                 f"{'APP':<16}{'CALLS':>8}{'p50 ms':>10}{'p99 ms':>10}{'MAX ms':>10}{'LAG p99':>10}{'STALLS':>8}"]
+        rows = sorted(snap['apps'].items(), key=lambda kv: kv[1]['p99'], reverse=True)
+        for name, s in rows[:15]:
+            lag_p99 = snap['lag_by_app'].get(name, {}).get('p99', 0.0)
+            n_stall = stalls.get(name, {}).get('stalls', 0)
+            lines.append(f"{name[:15]:<16}{s['count']:>8}{s['p50']:>10.2f}{s['p99']:>10.2f}{s['max']:>10.1f}{lag_p99:>10.1f}{n_stall:>8}")
+        if watchdog and watchdog.last_report:
+            lines += ['', f"LAST STALL REPORT: {watchdog.last_report}"]
+        table.config(text='\n'.join(lines))
+        w.after(1000, refresh)
+
+    def dump():
+        if hasattr(os_core, 'dump_loop_profile'):
+            status.config(text=f'DUMPED: {os_core.dump_loop_profile()}')
+
+    tk.Button(w, text='DUMP PROFILE', command=dump, font=('Consolas', 9), relief='flat').pack(side='bottom', pady=5)
+    refresh()
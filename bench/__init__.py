@@ -0,0 +1 @@
+"""Quori OS ベンチマークスイート (python -m bench)"""
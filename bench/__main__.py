@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tkinter as tk
+from types import SimpleNamespace
+
+from bench.harness import BASE_DIR, virtual_display, run_cases, save_results, compare
+from bench.stub_core import StubCore
+import bench.cases  # noqa: F401  (ケースの登録)
+
+# =============================================================================
+# [BENCH CLI]
+#   python -m bench run [--only icons taskbar] [--out bench/results/HEAD.json]
+#   python -m bench compare old.json new.json [--threshold 0.1]
+# =============================================================================
+
+
+def cmd_run(args):
+    work_dir = tempfile.mkdtemp(prefix="quori-bench-")
+    try:
+        with virtual_display() as display:
+            root = None
+            if display:
+                try:
+                    root = tk.Tk()
+                    root.withdraw()
+                except tk.TclError as e:
+                    print(f"[WARN] Tk unavailable on {display}: {e}")
+                    root = None
+            print(f"Display: {display or 'none (GUI cases skipped)'}")
+            ctx = SimpleNamespace(
+                root=root, display=display, core=StubCore(root, work_dir) if root else None,
+                repeat=args.repeat, boot_runs=args.boot_runs, log=print,
+                taskbar_sizes=(10, 100, 500), text_sizes_mb=(1, 10),
+                explorer_files=2000, paint_strokes=5000,
+            )
+            data = run_cases(ctx, only=args.only)
+            if root is not None: root.destroy()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    out = args.out or os.path.join(BASE_DIR, "bench", "results", f"{data['meta']['revision'] or 'local'}.json")
+    print(f"Results written to {save_results(data, out)}")
+    return 0
+
+
+def cmd_compare(args):
+    with open(args.old, encoding="utf-8") as f: old = json.load(f)
+    with open(args.new, encoding="utf-8") as f: new = json.load(f)
+    print(f"{old['meta'].get('revision')} -> {new['meta'].get('revision')}  (threshold {args.threshold:.0%})")
+    rows, regressions = compare(old, new, args.threshold)
+    for row in rows: print(row)
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Quori OS benchmark suite")
+    sub = parser.add_subparsers(dest="command")
+    p_run = sub.add_parser("run", help="run benchmarks and write a JSON result file")
+    p_run.add_argument("--only", nargs="*", help="run cases whose name contains any of these")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--boot-runs", type=int, default=1)
+    p_run.add_argument("--out")
+    p_cmp = sub.add_parser("compare", help="compare two result files (exit 1 on regression)")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in ("run", "compare", "-h", "--help"):
+        argv = ["run"] + argv   # サブコマンド省略時は run
+    args = parser.parse_args(argv)
+    if args.command == "compare": return cmd_compare(args)
+    return cmd_run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+import tkinter as tk
+from types import SimpleNamespace
+
+from bench.harness import bench, measure, timing, throughput, Skip, BASE_DIR
+from bench.stub_core import APP_DIR
+
+# =============================================================================
+# [BENCH CASES] KERNEL + APP HOT PATHS
+# =============================================================================
+
+# 起動時に外部へ出る/ブロックするアプリ (npbrowser: windll + sleep) は対象外
+INVOKE_APPS = ("clock", "texteditor", "explorer", "Q-paint", "sys_mon", "qcp")
+ICON_SIZES = ((45, 45), (64, 64), (32, 32))
+
+
+# -----------------------------------------------------------------------------
+# BOOT
+# -----------------------------------------------------------------------------
+_BOOT_PROBE = r"""
+import sys, json, time
+sys.path.insert(0, {base!r})
+import boost
+def gate(self, _orig=boost.QuoriOSCore.draw_login_gate):
+    _orig(self)
+    total = (time.perf_counter() - boost.PROCESS_T0) * 1000
+    stages = {{s["stage"]: s["ms"] for s in self.boot_timeline.stages()}}
+    print("BENCH_RESULT " + json.dumps({{"total": total, "stages": stages}}), flush=True)
+    self.root.after(0, self.root.destroy)
+boost.QuoriOSCore.draw_login_gate = gate
+boost.QuoriOSCore()
+boost.tk.mainloop()
+"""
+
+
+@bench("boot", gui=True)
+def bench_boot(ctx):
+    """新しいプロセスでカーネルを起動し、ログイン画面が出るまで (フェード演出込み)"""
+    totals, stages = [], {}
+    for _ in range(ctx.boot_runs):
+        out = subprocess.run([sys.executable, "-c", _BOOT_PROBE.format(base=BASE_DIR)], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=120)
+        line = next((l for l in out.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+        if line is None:
+            raise Skip(f"kernel did not reach login (exit {out.returncode}): {out.stderr.strip()[-200:]}")
+        data = json.loads(line.split(" ", 1)[1])
+        totals.append(data["total"])
+        for name, ms in data["stages"].items():
+            stages.setdefault(name, []).append(ms)
+    metrics = {"to_login": timing(totals)}
+    for name in ("kernel.imports", "kernel.init", "boot.logo"):
+        if name in stages: metrics[name.replace(".", "_")] = timing(stages[name])
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# invoke_app
+# -----------------------------------------------------------------------------
+@bench("invoke_app", gui=True)
+def bench_invoke_app(ctx):
+    core = ctx.core
+    metrics = {}
+    for name in INVOKE_APPS:
+        if not os.path.exists(os.path.join(APP_DIR, f"{name}.py")): continue
+        try:
+            cold = measure(lambda: (core.invoke_app(name), core.root.update_idletasks()),
+                           repeat=ctx.repeat, warmup=0,
+                           setup=lambda: (core.close_windows(), core.forget_app(name)))
+            warm = measure(lambda: (core.invoke_app(name), core.root.update_idletasks()),
+                           repeat=ctx.repeat, setup=core.close_windows)
+        except Exception as e:
+            ctx.log(f"[WARN] invoke_app {name}: {e}")
+            continue
+        finally:
+            core.close_windows()
+        metrics[f"{name}.cold"] = cold
+        metrics[f"{name}.warm"] = warm
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# TASKBAR SYNC
+# -----------------------------------------------------------------------------
+def _taskbar_host(ctx, app_dir):
+    """boost.QuoriOSCore のタスクバー関連メソッドだけを載せた軽量ホスト"""
+    import boost
+    from core.app_index import AppIndex
+    names = ("sync_taskbar_with_orange_logic", "add_taskbar_button", "is_taskbar_app", "on_app_index_delta")
+    Host = type("TaskbarHost", (), {n: boost.QuoriOSCore.__dict__[n] for n in names})
+    host = Host()
+    host.root = ctx.root
+    host.system_mode = "normal"
+    host.current_user = {"name": "bench", "color": "#00d9ff"}
+    host.invoke_app = lambda name, **kw: None
+    host.modules = SimpleNamespace(forget=lambda name: None)
+    host.app_index = AppIndex(app_dir)
+    host.app_index.refresh()
+    host.app_strip = tk.Frame(ctx.root)
+    host.app_strip.pack()
+    host.taskbar_buttons = {}
+    return host
+
+
+@bench("taskbar_sync", gui=True)
+def bench_taskbar_sync(ctx):
+    metrics = {}
+    for n in ctx.taskbar_sizes:
+        with tempfile.TemporaryDirectory() as app_dir:
+            for i in range(n):
+                with open(os.path.join(app_dir, f"bench_app_{i:04d}.py"), "w") as f:
+                    f.write("def run(root, os_core): pass\n")
+            host = _taskbar_host(ctx, app_dir)
+
+            def full():
+                for btn in host.taskbar_buttons.values(): btn.destroy()
+                host.taskbar_buttons.clear()
+                host.sync_taskbar_with_orange_logic()
+                ctx.root.update_idletasks()
+            metrics[f"n{n}.full"] = measure(full, repeat=ctx.repeat)
+            metrics[f"n{n}.noop"] = measure(host.sync_taskbar_with_orange_logic, repeat=ctx.repeat)
+
+            def add_one(counter=[0]):
+                counter[0] += 1
+                with open(os.path.join(app_dir, f"zz_added_{counter[0]:04d}.py"), "w") as f:
+                    f.write("def run(root, os_core): pass\n")
+                host.on_app_index_delta(host.app_index.refresh())
+                ctx.root.update_idletasks()
+            metrics[f"n{n}.add_one"] = measure(add_one, repeat=ctx.repeat)
+            host.app_strip.destroy()
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# ICONS
+# -----------------------------------------------------------------------------
+@bench("icons")
+def bench_icons(ctx):
+    """ThumbnailStore (ディスク) 段はディスプレイ不要。PhotoImage 段は GUI がある時のみ。"""
+    from core.icon_cache import IconCache, ThumbnailStore
+    from bench.stub_core import ICON_DIR, LOGO_NORMAL
+    names = ("setting", "clock", "missing_app")
+    metrics = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def fresh():
+            return IconCache(ICON_DIR, ThumbnailStore(cache_dir), lambda mode: LOGO_NORMAL)
+
+        def load_all(cache):
+            for name in names:
+                for size in ICON_SIZES: cache.load_image(name, size, "normal")
+
+        cold = []
+        for _ in range(ctx.repeat):
+            for entry in os.scandir(cache_dir): os.remove(entry.path)
+            t0 = time.perf_counter(); load_all(fresh()); cold.append((time.perf_counter() - t0) * 1000)
+        metrics["decode.cold"] = timing(cold)
+        metrics["decode.warm_disk"] = measure(lambda: load_all(fresh()), repeat=ctx.repeat)
+
+        if ctx.root is not None:
+            cache = fresh()
+            count, t0 = 0, time.perf_counter()
+            while time.perf_counter() - t0 < 0.5:
+                for name in names:
+                    for size in ICON_SIZES:
+                        cache.get(name, size, "normal")
+                        count += 1
+            metrics["get.hot"] = throughput(count, time.perf_counter() - t0)
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# USER DIRECTORY
+# -----------------------------------------------------------------------------
+@bench("users")
+def bench_users(ctx):
+    """ユーザー数を増やしてもログイン/更新の時間と書き込み量が変わらないこと (反復回数は下げて計測)"""
+    from core.config_store import ConfigRegistry
+    from core.users import UserDirectory
+    metrics = {}
+    for n in (10, 1000):
+        with tempfile.TemporaryDirectory() as users_dir:
+            stores = ConfigRegistry(delay=60)
+            directory = UserDirectory(users_dir, stores, iterations=1000)
+            for i in range(n):
+                directory.create(f"user{i:05d}", f"pw{i:05d}")
+            stores.flush_all()
+            target = random.Random(0).randrange(n)
+            metrics[f"n{n}.open"] = measure(lambda: UserDirectory(users_dir, iterations=1000), repeat=ctx.repeat)
+            metrics[f"n{n}.login"] = measure(lambda: directory.authenticate(f"pw{target:05d}"), repeat=ctx.repeat)
+
+            uid = directory.find(f"user{target:05d}")["id"]
+            index_before = os.path.getsize(directory.index_path)
+            metrics[f"n{n}.update"] = measure(lambda: (directory.update(uid, color=f"#{random.randrange(1 << 24):06x}"),
+                                                       directory.flush(uid)), repeat=ctx.repeat)
+            metrics[f"n{n}.rename"] = measure(lambda c=[0]: (c.__setitem__(0, c[0] + 1),
+                                                             directory.update(uid, name=f"renamed{c[0]}")), repeat=ctx.repeat)
+            written = os.path.getsize(directory.index_path) - index_before
+            metrics[f"n{n}.index_bytes_per_rename"] = {"unit": "bytes", "value": written / (ctx.repeat + 1), "n": ctx.repeat + 1}
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# QCP COMPLETION
+# -----------------------------------------------------------------------------
+@bench("completion")
+def bench_completion(ctx):
+    """qcp の Tab 補完: 数万件のディレクトリでも2回目以降は接頭辞木を引くだけ"""
+    from core.term_commands import DirectoryCache, Completer, CommandRegistry
+    metrics = {}
+    for n in (1000, 20000):
+        with tempfile.TemporaryDirectory() as d:
+            for i in range(n): open(os.path.join(d, f"file_{i:05d}.qtf"), "w").close()
+            metrics[f"n{n}.cold"] = measure(lambda: DirectoryCache().entries(d), repeat=ctx.repeat, warmup=0)
+            completer = Completer(CommandRegistry())
+            completer.complete_path(d, "")
+            metrics[f"n{n}.warm_unique"] = measure(lambda: completer.complete_path(d, f"file_{n // 2:05d}"), repeat=ctx.repeat)
+            metrics[f"n{n}.warm_broad"] = measure(lambda: completer.complete_path(d, "file_0"), repeat=ctx.repeat)
+    return metrics
+
+
+@bench("pipeline")
+def bench_pipeline(ctx):
+    """qcp のパイプライン: head で下流が止まれば上流の走査もそこで止まる (全件を数える場合と比較)"""
+    import threading
+    from app.qcp import COMMANDS
+
+    class Sink:
+        acc_color = "#00d9ff"
+        os_core = None
+
+        def __init__(self, cwd):
+            self.current_dir, self.cancel, self.done = cwd, threading.Event(), threading.Event()
+        def write(self, text, color=None, is_bold=False): pass
+        post = write
+        def throttle(self, high_water=0): pass
+        def finish(self, status=0):
+            self.done.set()
+            return status
+
+    def run(cwd, line):
+        shell = Sink(cwd)
+        COMMANDS.dispatch(shell, line)
+        shell.done.wait()
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as d:
+        for i in range(50):
+            sub = os.path.join(d, f"dir_{i:02d}")
+            os.mkdir(sub)
+            for k in range(1000): open(os.path.join(sub, f"file_{k:04d}.qtf"), "w").close()
+        metrics["grep_head20"] = measure(lambda: run(d, "ls -R | grep .qtf | head 20"), repeat=ctx.repeat)
+        metrics["count_all"] = measure(lambda: run(d, "ls -R | count"), repeat=ctx.repeat, warmup=0)
+    return metrics
+
+
+@bench("script")
+def bench_script(ctx):
+    """ヘッドレス qcp で .qs を流す速さ (同期コマンド / ワーカーで動くパイプライン)"""
+    import io
+    from app.qcp import ScriptShell
+    metrics = {}
+    for name, line in (("cd", "cd ."), ("pipeline", "help | grep ls | count")):
+        lines = [line] * 1000
+        shell = ScriptShell(out=io.StringIO(), cwd=os.getcwd())
+        metrics[f"{name}_x1000"] = measure(lambda: shell.run_lines(lines), repeat=ctx.repeat)
+        shell.close()
+    return metrics
+
+
+# -----------------------------------------------------------------------------
+# LARGE LOADS
+# -----------------------------------------------------------------------------
+@bench("texteditor", gui=True)
+def bench_texteditor(ctx):
+    core = ctx.core
+    mod, _ = core.modules.load("texteditor")
+    metrics = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for mb in ctx.text_sizes_mb:
+            name = f"bench_{mb}mb.qtf"
+            line = "Quori OS benchmark line 0123456789 abcdefghijklmnopqrstuvwxyz\n"
+            with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+                f.write(line * (mb * 1024 * 1024 // len(line)))
+            top = tk.Toplevel(core.root)
+            editor = mod.QuoriTextEditor(top, core, "#00d9ff", None)
+            editor.target_dir = data_dir
+            metrics[f"load_{mb}mb"] = measure(lambda: (editor.load_file(name), core.root.update_idletasks()),
+                                              repeat=ctx.repeat, warmup=0)
+            top.destroy()
+    return metrics
+
+
+@bench("explorer", gui=True)
+def bench_explorer(ctx):
+    """explorer は app/deta 固定なので、一時ファイルを作って計測後に必ず消す"""
+    core = ctx.core
+    deta = os.path.join(APP_DIR, "deta")
+    os.makedirs(deta, exist_ok=True)
+    prefix = f"__qbench_{os.getpid()}_"
+    created = []
+    try:
+        for i in range(ctx.explorer_files):
+            path = os.path.join(deta, f"{prefix}{i:05d}.qtf")
+            with open(path, "w", encoding="utf-8") as f: f.write("x")
+            created.append(path)
+        metrics = {f"open_{ctx.explorer_files}": measure(
+            lambda: (core.invoke_app("explorer"), core.root.update_idletasks()),
+            repeat=ctx.repeat, setup=core.close_windows)}
+    finally:
+        for path in created:
+            try: os.remove(path)
+            except OSError: pass
+        core.close_windows()
+    return metrics
+
+
+@bench("qpaint", gui=True)
+def bench_qpaint(ctx):
+    core = ctx.core
+    mod, _ = core.modules.load("Q-paint")
+    rng = random.Random(7)
+    strokes = [(rng.randrange(800), rng.randrange(600)) for _ in range(ctx.paint_strokes)]
+    metrics = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        app = mod.QPaintApp(core.root, core)
+
+        def replay():
+            app.canvas.delete("all"); app.objects = []
+            app._start_draw(SimpleNamespace(x=1, y=1))
+            for x, y in strokes: app._draw(SimpleNamespace(x=x + 1, y=y + 1))
+            app._stop_draw(None)
+            core.root.update_idletasks()
+        metrics[f"draw_{ctx.paint_strokes}"] = measure(replay, repeat=ctx.repeat, warmup=0)
+
+        # 保存ダイアログ/完了メッセージはベンチ中だけ差し替え
+        saved = (mod.filedialog.asksaveasfilename, mod.messagebox.showinfo)
+        try:
+            mod.messagebox.showinfo = lambda *a, **k: None
+            mod.filedialog.asksaveasfilename = lambda **k: os.path.join(out_dir, "bench" + k.get("defaultextension", ".png"))
+            metrics["export_png"] = measure(app.export_png, repeat=ctx.repeat)
+            metrics["save_svg"] = measure(app.save_svg, repeat=ctx.repeat)
+        finally:
+            mod.filedialog.asksaveasfilename, mod.messagebox.showinfo = saved
+        app.win.destroy()
+    return metrics
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import datetime
+import statistics
+import subprocess
+from contextlib import contextmanager
+
+# =============================================================================
+# [BENCH HARNESS] REGISTRY + TIMING + JSON RESULTS + COMPARE
+# =============================================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = []
+
+
+class Skip(Exception):
+    """実行環境の都合で計測できないケース (ディスプレイ無し等)"""
+
+
+def bench(name, gui=False):
+    """ベンチマーク関数の登録。関数は ctx を受け取り {指標名: 結果} を返す。"""
+    def deco(func):
+        CASES.append((name, gui, func))
+        return func
+    return deco
+
+
+def measure(func, repeat=5, warmup=1, setup=None):
+    """func() の所要時間 (ms) を repeat 回計測した結果"""
+    runs = []
+    for i in range(warmup + repeat):
+        if setup: setup()
+        t0 = time.perf_counter()
+        func()
+        ms = (time.perf_counter() - t0) * 1000
+        if i >= warmup: runs.append(ms)
+    return timing(runs)
+
+
+def timing(runs):
+    return {"unit": "ms", "median": statistics.median(runs), "min": min(runs), "max": max(runs),
+            "n": len(runs), "runs": [round(r, 3) for r in runs]}
+
+
+def throughput(count, seconds):
+    return {"unit": "ops/s", "value": count / seconds if seconds else 0.0, "n": count}
+
+
+# -----------------------------------------------------------------------------
+# VIRTUAL DISPLAY
+# -----------------------------------------------------------------------------
+@contextmanager
+def virtual_display(width=1920, height=1080, display=":97"):
+    """DISPLAY が無い Linux では Xvfb を起動して GUI ケースを実行 (Windows/macOS はそのまま)"""
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        yield os.environ.get("DISPLAY", "native")
+        return
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        yield None
+        return
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5)   # サーバーの起動待ち
+        yield display if proc.poll() is None else None
+    finally:
+        proc.terminate()
+        proc.wait(5)
+        os.environ.pop("DISPLAY", None)
+
+
+# -----------------------------------------------------------------------------
+# RESULTS
+# -----------------------------------------------------------------------------
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_cases(ctx, only=None, log=print):
+    results, skipped = {}, {}
+    for name, gui, func in CASES:
+        if only and not any(pat in name for pat in only): continue
+        if gui and ctx.root is None:
+            skipped[name] = "no display"
+            log(f"[SKIP] {name}: no display")
+            continue
+        try:
+            metrics = func(ctx)
+        except Skip as e:
+            skipped[name] = str(e)
+            log(f"[SKIP] {name}: {e}")
+            continue
+        for metric, value in metrics.items():
+            key = f"{name}.{metric}"
+            results[key] = value
+            log(f"{key:<44}{format_value(value)}")
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "display": ctx.display,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def format_value(value):
+    if value["unit"] == "ms":
+        return f"{value['median']:>10.2f} ms  (min {value['min']:.2f}, n={value['n']})"
+    return f"{value['value']:>10.1f} {value['unit']}"
+
+
+def save_results(data, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def _score(value):
+    """大きいほど悪い方向に揃えた代表値"""
+    if value["unit"] == "ms": return value["median"]
+    if value["unit"] == "ops/s": return -value["value"]
+    return value["value"]   # bytes 等は小さいほど良い
+
+
+def compare(old, new, threshold=0.10):
+    """
+    2つの結果ファイルを比較し (行リスト, 劣化件数) を返す。
+    ms は中央値が、ops/s はスループットが threshold を超えて悪化したら REGRESSION。
+    """
+    rows, regressions = [], 0
+    for key in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(key), new["results"].get(key)
+        if a is None or b is None:
+            rows.append(f"{key:<44}{'(only in ' + ('new' if a is None else 'old') + ')':>24}")
+            continue
+        base, cur = abs(_score(a)), abs(_score(b))
+        change = (cur - base) / base if base else 0.0
+        worse = _score(b) > _score(a)
+        flag = ""
+        if abs(change) > threshold:
+            flag = "REGRESSION" if worse else "improved"
+            if worse: regressions += 1
+        rows.append(f"{key:<44}{base:>10.2f} -> {cur:>10.2f} {a['unit']:<6}{change:>+8.1%}  {flag}")
+    return rows, regressions
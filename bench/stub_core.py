@@ -0,0 +1,87 @@
+import os
+import sys
+
+from bench.harness import BASE_DIR
+
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.icon_cache import IconCache, ThumbnailStore
+from core.module_registry import ModuleRegistry
+from core.app_index import AppIndex
+from core.config_store import ConfigRegistry
+from core.frame_clock import FrameClock
+from core.loop_monitor import LoopMonitor
+from core.users import UserDirectory
+
+# =============================================================================
+# [STUB CORE] MINIMAL os_core FOR DRIVING app/*.run WITHOUT BOOTING THE KERNEL
+# =============================================================================
+
+APP_DIR = os.path.join(BASE_DIR, "app")
+ICON_DIR = os.path.join(APP_DIR, "__appdeta__")
+LOGO_NORMAL = os.path.join(BASE_DIR, "logo.png")
+
+
+class StubCore:
+    """
+    アプリの run() に渡す最小限の os_core。
+    キャッシュ・設定ストア等はカーネルと同じ実装を一時ディレクトリ上で使い、
+    launch_app はアプリを起動せず記録だけします (ベンチ中に別アプリが開かないように)。
+    """
+    def __init__(self, root, work_dir):
+        self.root = root
+        self.work_dir = work_dir
+        self.kernel_version = "BENCH"
+        self.session_id = "BENCH"
+        self.system_mode = "normal"
+        self.config = {"password": "", "accent_color": "#00d9ff", "user_name": "BENCH"}
+        self.current_user = {"name": "bench", "color": "#00d9ff"}
+        self.sw = root.winfo_screenwidth() if root else 1920
+        self.sh = root.winfo_screenheight() if root else 1080
+        self.logs = []
+        self.launched = []
+
+        self.stores = ConfigRegistry(delay=0.05)
+        self.config_store = self.stores.open(os.path.join(work_dir, "system.qcfg"), {"system_info": {}})
+        self.users = UserDirectory(os.path.join(work_dir, "users"), self.stores, iterations=1000)
+        self.icon_cache = IconCache(ICON_DIR, ThumbnailStore(os.path.join(work_dir, "icons")), lambda mode: LOGO_NORMAL)
+        self.modules = ModuleRegistry(BASE_DIR, APP_DIR)
+        self.app_index = AppIndex(APP_DIR)
+        self.app_index.refresh()
+        if root is not None:
+            self.frame_clock = FrameClock(root)
+            self.loop_monitor = LoopMonitor(root)
+
+    def write_log(self, message, level="INFO", subsystem=None):
+        self.logs.append((level, message))
+
+    def get_icon(self, name, size=(45, 45)):
+        return self.icon_cache.get(name, size, self.system_mode)
+
+    def invoke_app(self, name, **kwargs):
+        """カーネルの invoke_app と同じ経路 (ModuleRegistry.load → run)"""
+        mod, rec = self.modules.load(name)
+        if hasattr(mod, "run"): mod.run(self.root, self, **kwargs)
+        elif hasattr(mod, "SettingApp"): mod.SettingApp(self.root, self)
+        return rec
+
+    def launch_app(self, name, **kwargs):
+        self.launched.append((name, kwargs))
+
+    def refresh_taskbar_apps(self):
+        return self.app_index.refresh()
+
+    def dump_loop_profile(self):
+        return self.loop_monitor.dump(os.path.join(self.work_dir, "loop_profile.json"))
+
+    def forget_app(self, name):
+        """次の invoke_app をコールド (import からやり直し) にする"""
+        self.modules.forget(name)
+        for key in (name, f"app.{name}"):
+            sys.modules.pop(key, None)
+
+    def close_windows(self):
+        for w in self.root.winfo_children():
+            w.destroy()
+        self.root.update()
@@ -1,19 +1,38 @@
-import tkinter as tk
-from tkinter import messagebox, filedialog, ttk
-from PIL import Image, ImageTk
+import time
+PROCESS_T0 = time.perf_counter()
 import os
 import sys
-import json
-import importlib
-import importlib.util
-import subprocess
-import time
+
+# --importtime / QUORI_IMPORTTIME=1 : モジュール毎の import 時間をブートレポートに出す
+from core.imports import ImportProfiler, lazy_import
+IMPORT_PROFILER = ImportProfiler.from_environ()
+
+import tkinter as tk
+from PIL import ImageTk
 import datetime
-import ctypes
-import threading
-import webbrowser
-import platform
 import logging
+import atexit
+
+# エラー表示・電源メニューでしか使わないので初回使用まで読み込まない
+messagebox = lazy_import("tkinter.messagebox")
+
+from core.icon_cache import IconCache, ThumbnailStore
+from core.module_registry import ModuleRegistry, AppNotFoundError
+from core.prewarm import BootTimeline, BootPrewarmer
+from core.app_index import AppIndex
+from core.config_store import ConfigRegistry
+from core.logpipe import KernelLogPipeline, get_logger
+from core.log_index import LogIndex
+from core.app_host import AppSupervisor, KERNEL_BOUND_APPS
+from core.loop_monitor import LoopMonitor
+from core.frame_clock import FrameClock
+from core.session import SessionCache
+from core.boot_assets import BootAssets
+from core.watchdog import StallWatchdog
+from core.profiler import ProfilerService
+from core.storage_stats import StorageStats
+from core.theme import ThemeRegistry, accent_for
+from core.users import UserDirectory
 
 # 起動メッセージ
 print("Quori OS Launching...\nLoading Kernel Components...")
@@ -29,23 +48,46 @@ APP_DIR = os.path.join(BASE_DIR, "app")
 ICON_DIR = os.path.join(APP_DIR, "__appdeta__")
 CONFIG_PATH = os.path.join(BASE_DIR, "system.qcfg")
 LOG_PATH = os.path.join(BASE_DIR, "system.log")
+CACHE_DIR = os.path.join(BASE_DIR, "__qcache__")
+DIAG_DIR = os.path.join(BASE_DIR, "diagnostics")
+USERS_DIR = os.path.join(BASE_DIR, "users")
 
 LOGO_NORMAL = os.path.join(BASE_DIR, "logo.png")
 LOGO_PRO = os.path.join(BASE_DIR, "pro_logo.png")
 LOGIN_BG = os.path.join(BASE_DIR, "login_bg.png")
 
-logging.basicConfig(
-    filename=LOG_PATH, level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] %(message)s'
-)
+# ログはキュー経由でバックグラウンドスレッドが書き出す (サイズ/日数でローテーション + gzip圧縮)
+LOG_PIPELINE = KernelLogPipeline(LOG_PATH)
+if __name__ != "__mp_main__":  # 隔離プロセス (spawn) のログはパイプ経由でカーネルが書く
+    LOG_PIPELINE.install(level="INFO")
+    atexit.register(LOG_PIPELINE.stop)
+log = get_logger("kernel")
 
 # =============================================================================
 # [2] MASTER KERNEL ENGINE
 # =============================================================================
+KERNEL_IMPORTED = time.perf_counter()
+
+
 class QuoriOSCore:
     def __init__(self):
+        # タイムラインはプロセス開始基準 (ブート画面が出るまでのコールドスタート時間を測る)
+        self.boot_timeline = BootTimeline(t0=PROCESS_T0)
+        self.boot_timeline.add("kernel.imports", PROCESS_T0, KERNEL_IMPORTED,
+                               "profiled" if IMPORT_PROFILER else "")
+        self.boot_timeline.begin("kernel.init")
         self.root = tk.Tk()
         self.root.withdraw()
+
+        # after/bind/command のコールバックを計測 (アプリ別 p50/p99 + スケジューラ遅延)
+        self.loop_monitor = LoopMonitor(self.root).install()
+        self.loop_monitor.start_probe()
+
+        # アニメーション・周期処理の共有ティック (アプリ毎の after ループを1本に集約)
+        self.frame_clock = FrameClock(self.root, monitor=self.loop_monitor)
+
+        # アクセント色の正本 (変更時は開いている全ウィンドウをその場で塗り替える)
+        self.theme = ThemeRegistry(self.root)
         
         self.kernel_version = "11.5.0.PRO-ULTIMATE"
         self.session_id = f"Q11P-{int(time.time())}"
@@ -54,73 +96,202 @@ class QuoriOSCore:
         self.current_user = None
         self.system_mode = "normal" 
         self.taskbar_images = {} 
+        self.taskbar_buttons = {}
+        self.session = None
+        self.bg_label = None
+        self.prewarm = None
+        self.boot_report = ""
         
         self.config = {"password": "", "accent_color": "#00d9ff", "user_name": "ADMIN"}
-        self.user_db = {}
         
         self.initialize_filesystem()
+
+        # 隔離モード (別プロセス) で動くアプリの監視役
+        self.supervisor = AppSupervisor(self, BASE_DIR)
+        atexit.register(self.supervisor.shutdown)
+
+        # system.qcfg の正本はメモリ上のストア (書き込みは遅延・集約・アトミック)
+        self.stores = ConfigRegistry()
+        self.config_store = self.stores.open(CONFIG_PATH)
+        self.config_store.subscribe(self.on_system_config_changed, keys=("users", "system_info"))
+        atexit.register(self.stores.flush_all)
+        # ユーザー別プロフィール + ハッシュ索引 (プロフィールの書き出しは同じレジストリが担当)
+        self.users = UserDirectory(USERS_DIR, self.stores)
         self.load_v11_config_persistence()
+        self.frame_clock.set_fps(self.config_store.get("system_info", {}).get("frame_rate", 60))
+        self.theme.accent = self.current_accent()   # 塗り替え無しで初期値だけ合わせる
+
+        # サブシステム別ログレベル (system.qcfg の "logging" セクション)
+        LOG_PIPELINE.configure(self.config_store.get("logging", {}))
+        self.config_store.subscribe(lambda store, changed: LOG_PIPELINE.configure(store.get("logging", {})), keys=("logging",))
+
+        # system.log の索引 (時刻バケット/レベル/イベント → バイトオフセット)
+        self.log_index = LogIndex(LOG_PATH)
+        atexit.register(self.log_index.save)
+
+        # UIスレッドの停止検知 (鼓動が途絶えたらスタックを採取して diagnostics/ へ)
+        self.watchdog = StallWatchdog(self.root, DIAG_DIR, after=self.loop_monitor.raw_after,
+                                      **StallWatchdog.options(self.config_store.get("system_info", {}).get("watchdog")))
+        self.watchdog.start()
+        self.profiler = ProfilerService(self, DIAG_DIR)
+
+        # アイコンキャッシュ (メモリLRU + 縮小済みPNGのディスクストア)
+        self.icon_cache = IconCache(
+            ICON_DIR, ThumbnailStore(os.path.join(CACHE_DIR, "icons")),
+            lambda mode: LOGO_PRO if mode == "pro" else LOGO_NORMAL
+        )
+        self.modules = ModuleRegistry(BASE_DIR, APP_DIR)
+
+        # 起動ロゴ/ログイン背景の事前描画 (画面サイズ × モードごと)
+        self.boot_assets = BootAssets(
+            ThumbnailStore(os.path.join(CACHE_DIR, "boot")),
+            lambda mode: LOGO_PRO if mode == "pro" else LOGO_NORMAL, LOGIN_BG
+        )
+
+        # app/ のスナップショット (差分通知でタスクバーを部分更新)
+        self.app_index = AppIndex(APP_DIR)
+        self.app_index.refresh()
+        self.app_index.subscribe(self.on_app_index_delta)
+
+        # app/ の容量 (アプリ別・分類別)。走査はプリウォーム/裏スレッドで
+        self.storage = StorageStats(APP_DIR)
+        self.app_index.subscribe(self.storage.apply_delta)
+
+        # ユーザー毎のデスクトップ (ロック時は隠すだけ・複数ユーザー分を保持)
+        self.sessions = SessionCache(self)
         
         self.sw = self.root.winfo_screenwidth()
         self.sh = self.root.winfo_screenheight()
         
-        logging.info(f"Kernel {self.kernel_version} initialized.")
+        log.info(f"Kernel {self.kernel_version} initialized.")
+        self.boot_timeline.end("kernel.init")
         self.initiate_boot_sequence()
 
     def initialize_filesystem(self):
-        for d in [APP_DIR, ICON_DIR]:
+        for d in [APP_DIR, ICON_DIR, CACHE_DIR]:
             if not os.path.exists(d):
                 os.makedirs(d)
 
     def load_v11_config_persistence(self):
-        if os.path.exists(CONFIG_PATH):
-            try:
-                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.user_db = data.get("users", {})
-                    sys_info = data.get("system_info", {})
-                    self.system_mode = sys_info.get("mode", "normal")
-            except Exception as e:
-                logging.error(f"Config Load Error: {e}")
+        self.system_mode = self.config_store.get("system_info", {}).get("mode", "normal")
+        self.migrate_legacy_users()
         
-        if not self.user_db:
-            self.user_db = {"test01-q": {"name": "ADMIN", "role": "ADMIN", "color": "#00d9ff"}}
-            self.save_system_state_to_disk()
+        if not len(self.users):
+            self.users.create("ADMIN", "test01-q", role="ADMIN", color="#00d9ff")
+
+    def migrate_legacy_users(self):
+        """system.qcfg の "users" (平文パスワードがキー) をユーザーディレクトリへ移し、元は消す"""
+        legacy = self.config_store.get("users")
+        if not legacy: return
+        self.users.migrate(legacy)
+        with self.config_store.transaction() as data:
+            data.pop("users", None)
 
     def save_system_state_to_disk(self):
+        """ストアへ反映 (ディスクへの書き出しはストアがまとめて行う)"""
         try:
-            disk_data = {"users": self.user_db, "system_info": {"mode": self.system_mode}}
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(disk_data, f, indent=4, ensure_ascii=False)
+            with self.config_store.transaction() as data:
+                data.setdefault("system_info", {})["mode"] = self.system_mode
             return True
-        except: return False
+        except Exception as e:
+            log.error(f"Config Save Error: {e}")
+            return False
+
+    def on_system_config_changed(self, store, changed):
+        """Settings 等が system.qcfg を更新した時にカーネル側の状態を同期"""
+        if "users" in changed and store.get("users"):
+            self.migrate_legacy_users()   # 旧形式で書き込むアプリ向け
+        if "system_info" in changed:
+            mode = store.get("system_info", {}).get("mode", self.system_mode)
+            if mode != self.system_mode and hasattr(self, "sw"):
+                # 次回起動/ロック画面用のアセットを先に用意
+                self.boot_assets.prerender_async((self.sw, self.sh), (mode,))
+            self.system_mode = mode
+            self.frame_clock.set_fps(store.get("system_info", {}).get("frame_rate", self.frame_clock.fps))
+        self.apply_theme()
+        self.supervisor.broadcast_state()
+
+    def current_accent(self):
+        return accent_for(self.system_mode, (self.current_user or {}).get("color"))
+
+    def apply_theme(self, user_color=None):
+        """モード/ユーザー色の変更を開いているウィンドウへ即時反映 (作り直しはしない)"""
+        if user_color and self.current_user: self.current_user["color"] = user_color
+        acc = self.current_accent()
+        if self.theme.set_accent(acc) and self.session:
+            self.session.retheme(self.system_mode, acc)
+        return acc
+
+    def remote_state(self):
+        """隔離プロセスへ渡すカーネル状態のスナップショット (pickle 可能な値のみ)"""
+        return {
+            "config": dict(self.config), "system_mode": self.system_mode,
+            "kernel_version": self.kernel_version, "session_id": self.session_id,
+            "sw": getattr(self, "sw", 0), "sh": getattr(self, "sh", 0),
+            "current_user": dict(self.current_user) if self.current_user else None,
+            "accent": self.theme.accent,
+        }
+
+    def write_log(self, message, level="INFO", subsystem=None):
+        """
+        アプリ向けログAPI。呼び出し元モジュール (app.qcp 等) をサブシステム名として記録します。
+        キューに積むだけなのでUIループを止めません。
+        """
+        if subsystem is None:
+            subsystem = sys._getframe(1).f_globals.get("__name__", "app")
+            if subsystem == "__main__": subsystem = "kernel"
+        if not isinstance(level, int):
+            level = logging.getLevelName(str(level).upper())
+            if not isinstance(level, int): level = logging.INFO
+        get_logger(subsystem).log(level, message)
+
+    def dump_loop_profile(self):
+        """メインループ計測結果を diagnostics/ に書き出してパスを返す"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = self.loop_monitor.dump(os.path.join(DIAG_DIR, f"loop_profile_{stamp}.json"))
+        log.info(f"Loop profile dumped: {path}")
+        return path
 
     def get_icon(self, name, size=(45, 45)):
-        icon_path = os.path.join(ICON_DIR, f"{name}_logo.png")
-        if not os.path.exists(icon_path):
-            icon_path = LOGO_PRO if self.system_mode == "pro" else LOGO_NORMAL
         try:
-            img = Image.open(icon_path)
-            return ImageTk.PhotoImage(img.resize(size, Image.Resampling.LANCZOS))
-        except: return None
-
-    def invoke_app(self, name, **kwargs):
-        targets = [name, f"app.{name}"]
-        if "setting" in name: targets.extend(["setting", "app.setting"])
-        mod = None
-        for t in targets:
-            try:
-                if t in sys.modules: mod = importlib.reload(sys.modules[t])
-                else: mod = importlib.import_module(t)
-                break
-            except: continue
-        if mod:
-            if hasattr(mod, "run"): mod.run(self.root, self, **kwargs)
-            elif hasattr(mod, "SettingApp"): mod.SettingApp(self.root, self)
-        else:
+            return self.icon_cache.get(name, size, self.system_mode)
+        except Exception as e:
+            log.error(f"Icon Load Error ({name}): {e}")
+            return None
+
+    def invoke_app(self, name, isolated=None, **kwargs):
+        # 隔離モード: 専用プロセス + 専用Tkルートで実行 (system_info.isolated_apps で常時指定も可)
+        if isolated is None:
+            isolated = name in self.config_store.get("system_info", {}).get("isolated_apps", [])
+        if isolated and name in KERNEL_BOUND_APPS:
+            log.warning(f"{name} needs kernel-only services (config_store/users/theme) and cannot be isolated; launching in-process.")
+            isolated = False
+        if isolated:
+            self.supervisor.launch(name, **kwargs)
+            return
+
+        # ソースが変わった時だけ reload (変更なしなら sys.modules のモジュールを再利用)
+        try:
+            mod, rec = self.modules.load(name)
+        except AppNotFoundError:
+            log.error(f"App Load Error: module {name} not found.")
             messagebox.showerror("Error", f"Module {name} not found.")
+            return
+        except Exception as e:
+            log.exception(f"App Load Error ({name})")
+            messagebox.showerror("Error", f"Module {name} failed to load:\n{e}")
+            return
+
+        log.info(f"Process {name} spawned: {rec.module_name} [{rec.last_action} {rec.import_ms:.1f} ms]")
+        if hasattr(mod, "run"): mod.run(self.root, self, **kwargs)
+        elif hasattr(mod, "SettingApp"): mod.SettingApp(self.root, self)
+
+    def launch_app(self, name, **kwargs):
+        """explorer 等が使う別名"""
+        return self.invoke_app(name, **kwargs)
 
     def initiate_boot_sequence(self):
+        self.boot_timeline.begin("boot.logo")
         self.boot_win = tk.Toplevel(self.root)
         self.boot_win.attributes("-fullscreen", True, "-topmost", True)
         self.boot_win.configure(bg="black")
@@ -131,31 +302,79 @@ class QuoriOSCore:
         else:
             target_logo, acc_color = LOGO_NORMAL, "#00d9ff"
             
-        logo_sz = int(min(self.sw, self.sh) * 0.55)
-        try:
-            if os.path.exists(target_logo):
-                raw = Image.open(target_logo)
-                self.boot_logo_tk = ImageTk.PhotoImage(raw.resize((logo_sz, logo_sz), Image.Resampling.LANCZOS))
-                tk.Label(self.boot_win, image=self.boot_logo_tk, bg="black").place(relx=0.5, rely=0.5, anchor="center")
-            else: raise FileNotFoundError
-        except:
-            tk.Label(self.boot_win, text="QUORI OS 11", fg=acc_color, bg="black", font=("Consolas", 60, "bold")).place(relx=0.5, rely=0.5, anchor="center")
+        # 事前描画済みのロゴ (画面サイズ分のPNG) を読むだけ。未生成ならテキストで始めて描画後に差し替え
+        screen = (self.sw, self.sh)
+        logo = tk.Label(self.boot_win, text="QUORI OS 11", fg=acc_color, bg="black", font=("Consolas", 60, "bold"))
+        logo.place(relx=0.5, rely=0.5, anchor="center")
+        img = self.boot_assets.cached("boot_logo", screen, self.system_mode)
+        if img is not None:
+            self.show_asset(logo, "boot_logo_tk", img)
+        elif os.path.exists(target_logo):
+            self.boot_assets.render_async("boot_logo", screen, self.system_mode,
+                                          lambda img: self.root.after(0, lambda: self.show_asset(logo, "boot_logo_tk", img)))
+
+        self.boot_timeline.end("boot.logo")
+
+        # フェード演出の待ち時間 (約7秒) を使ってアプリを先読み
+        self.start_prewarm()
 
         self.boot_win.attributes("-alpha", 0.0)
-        self.animate_fade(self.boot_win, 0.0, 1.0, 2500, 
-                          lambda: self.root.after(3000, 
-                          lambda: self.animate_fade(self.boot_win, 1.0, 0.0, 1500, self.draw_login_gate)))
+        self.boot_timeline.begin("boot.fade_in")
+        self.animate_fade(self.boot_win, 0.0, 1.0, 2500, self._boot_hold)
+
+    def _boot_hold(self):
+        self.boot_timeline.end("boot.fade_in")
+        self.boot_timeline.begin("boot.hold")
+        self.root.after(3000, self._boot_fade_out)
+
+    def _boot_fade_out(self):
+        self.boot_timeline.end("boot.hold")
+        self.boot_timeline.begin("boot.fade_out")
+        self.animate_fade(self.boot_win, 1.0, 0.0, 1500, self._boot_complete)
+
+    def _boot_complete(self):
+        self.boot_timeline.end("boot.fade_out")
+        self.draw_login_gate()
+        self.report_boot_timing()
+
+    def start_prewarm(self):
+        """app/ のバイトコード生成・import・アイコンのデコード・設定読込をワーカースレッドで実行"""
+        if self.prewarm and self.prewarm.is_alive(): return
+        self.prewarm = BootPrewarmer(APP_DIR, self.modules, self.icon_cache, self.system_mode,
+                                     self.boot_timeline, stores=self.stores,
+                                     extra_tasks=[("prewarm.log_index", self.log_index.update),
+                                                  ("prewarm.boot_assets", lambda: self.boot_assets.prerender((self.sw, self.sh))),
+                                                  ("prewarm.storage", self.storage.scan)])
+        self.prewarm.start()
+
+    def report_boot_timing(self):
+        self.boot_report = self.boot_timeline.report()
+        window = self.boot_timeline.find("boot.logo")
+        if window:
+            self.boot_report += f"\nTIME TO BOOT WINDOW: {window['start_ms'] + window['ms']:.1f} ms"
+        if IMPORT_PROFILER:
+            # 計測はブートまで (以降の import は通常速度で)
+            IMPORT_PROFILER.uninstall()
+            self.boot_report += "\n" + IMPORT_PROFILER.report()
+        if self.prewarm:
+            ready = ", ".join(self.prewarm.ready) or "-"
+            self.boot_report += f"\nPREWARMED (instant first launch): {ready}"
+            if self.prewarm.failed:
+                self.boot_report += f"\nNOT PREWARMED: {', '.join(self.prewarm.failed)}"
+        for line in self.boot_report.splitlines():
+            log.info(line)
+
+    def show_asset(self, label, attr, img):
+        """PIL Image → PhotoImage をラベルに反映 (参照は self.<attr> で保持)"""
+        if not label.winfo_exists(): return
+        setattr(self, attr, ImageTk.PhotoImage(img))
+        label.config(image=getattr(self, attr), text="")
 
     def animate_fade(self, target, start, end, duration, callback):
-        steps = 60
-        delta = (end - start) / steps
-        def step(curr):
-            if not target.winfo_exists(): return
-            target.attributes("-alpha", max(0.0, min(1.0, curr)))
-            if (delta > 0 and curr < end) or (delta < 0 and curr > end):
-                self.root.after(duration // steps, lambda: step(curr + delta))
-            elif callback: callback()
-        step(start)
+        """フレームクロック上のフェード (進み具合は経過時間基準なので負荷が掛かっても duration で終わる)"""
+        def frame(p):
+            target.attributes("-alpha", max(0.0, min(1.0, start + (end - start) * p)))
+        return self.frame_clock.animate(duration, frame, on_done=callback, easing="ease_in_out", widget=target)
 
     def draw_login_gate(self):
         if hasattr(self, 'boot_win'): self.boot_win.destroy()
@@ -163,6 +382,15 @@ class QuoriOSCore:
         self.login_win.attributes("-fullscreen", True)
         self.login_win.configure(bg="#050505")
         acc = "#ff9d00" if self.system_mode == "pro" else "#00d9ff"
+        if os.path.exists(LOGIN_BG):
+            bg = tk.Label(self.login_win, bg="#050505", bd=0)
+            bg.place(x=0, y=0, relwidth=1, relheight=1)
+            img = self.boot_assets.cached("login_bg", (self.sw, self.sh), self.system_mode)
+            if img is not None:
+                self.show_asset(bg, "login_bg_tk", img)
+            else:
+                self.boot_assets.render_async("login_bg", (self.sw, self.sh), self.system_mode,
+                                              lambda img: self.root.after(0, lambda: self.show_asset(bg, "login_bg_tk", img)))
         p = tk.Frame(self.login_win, bg="#000", highlightthickness=2, highlightbackground=acc)
         p.place(relx=0.5, rely=0.6, anchor="center")
         tk.Label(p, text="QuoriOS login window", fg=acc, bg="#000", font=("Consolas", 16, "bold")).pack(pady=20, padx=50)
@@ -173,56 +401,73 @@ class QuoriOSCore:
         tk.Button(p, text="ACCESS", command=self.process_login, bg=acc, fg="black", font=("Consolas", 12, "bold"), padx=60, pady=18).pack(pady=25)
 
     def process_login(self):
-        pw = self.pw_input.get()
-        if pw in self.user_db:
-            self.current_user = self.user_db[pw]
+        user = self.users.authenticate(self.pw_input.get())
+        if user:
+            self.current_user = user
             self.login_win.destroy()
             self.build_desktop_env()
         else: self.pw_input.delete(0, tk.END)
 
     def build_desktop_env(self):
+        """ログイン/アンロック: キャッシュ済みセッションがあれば表示し直すだけ"""
+        t0 = time.perf_counter()
         self.root.deiconify()
         self.root.attributes("-fullscreen", True); self.root.configure(bg="black")
-        acc = "#ff9d00" if self.system_mode == "pro" else self.current_user.get("color", "#00d9ff")
-        
-        tk.Label(self.root, text=f"SESSION: {self.current_user['name'].upper()}", 
-                 fg=acc, bg="black", font=("Consolas", 52, "bold")).place(relx=0.5, rely=0.5, anchor="center")
-        
-        self.bar = tk.Frame(self.root, bg="#050505", height=90)
-        self.bar.pack(side="bottom", fill="x")
-
-        # [PWR]ボタンを先にパッキング（右端を死守）
-        tk.Button(self.bar, text=" [PWR] ", fg="white", bg="#aa0000", relief="flat", 
-                  font=("Consolas", 12, "bold"), padx=25, command=self.show_power_menu).pack(side="right", padx=30, pady=10)
+        acc = self.apply_theme()
 
-        # 固定アイコン（設定・時計）
-        self.taskbar_images["setting"] = self.get_icon("setting")
-        tk.Button(self.bar, image=self.taskbar_images["setting"], bg="#050505", bd=0, 
-                  command=lambda: self.invoke_app("setting")).pack(side="left", padx=10, pady=5)
+        session, built = self.sessions.acquire(self.current_user, acc)
+        self.sessions.activate(session)
+        self.session = session
+        self.bar, self.app_strip, self.bg_label = session.bar, session.app_strip, session.label
+        self.taskbar_images = session.images
+        self.taskbar_buttons = session.taskbar_buttons
 
-        self.taskbar_images["clock"] = self.get_icon("clock")
-        tk.Button(self.bar, image=self.taskbar_images["clock"], bg="#050505", bd=0, 
-                  command=lambda: self.invoke_app("clock")).pack(side="left", padx=5, pady=5)
-
-        # 動的アプリエリア
-        self.app_strip = tk.Frame(self.bar, bg="#050505")
-        self.app_strip.pack(side="left", fill="both", expand=True, padx=10)
-        
+        # ロック中に増減したアプリだけ差分反映
         self.sync_taskbar_with_orange_logic()
+        self.app_index.start_watching(self.root)
+        how = "built" if built else "restored"
+        log.info(f"Desktop session {session.key} {how} in {(time.perf_counter() - t0) * 1000:.1f} ms ({len(self.sessions)} cached).")
+
+    @staticmethod
+    def is_taskbar_app(name):
+        return "setting" not in name and "clock" not in name
 
     def sync_taskbar_with_orange_logic(self):
-        """はみ出し防止：パディングを詰め、スリムなフォントで配置"""
-        for w in self.app_strip.winfo_children(): w.destroy()
-        acc = "#ff9d00" if self.system_mode == "pro" else self.current_user.get("color", "#00d9ff")
-        if os.path.exists(APP_DIR):
-            for f in sorted(os.listdir(APP_DIR)):
-                if f.endswith(".py") and f != "__init__.py" and "setting" not in f and "clock" not in f:
-                    name = f.replace(".py", "")
-                    tk.Button(self.app_strip, text=f"[{name.upper()}]", 
-                              fg=acc, bg="#050505", relief="flat", 
-                              font=("Consolas", 11, "bold"), # スリム化
-                              padx=4, # 詰め
-                              command=lambda n=name: self.invoke_app(n)).pack(side="left", padx=3)
+        """はみ出し防止：パディングを詰め、スリムなフォントで配置 (既存ボタンは再利用し、差分だけ追加/削除)"""
+        wanted = [n for n in self.app_index.names() if self.is_taskbar_app(n)]
+        for name in set(self.taskbar_buttons) - set(wanted):
+            self.taskbar_buttons.pop(name).destroy()
+        for name in wanted:
+            if name not in self.taskbar_buttons: self.add_taskbar_button(name)
+
+    def add_taskbar_button(self, name):
+        acc = self.theme.accent
+        btn = tk.Button(self.app_strip, text=f"[{name.upper()}]", 
+                        fg=acc, bg="#050505", relief="flat", 
+                        font=("Consolas", 11, "bold"), # スリム化
+                        padx=4, # 詰め
+                        command=lambda n=name: self.invoke_app(n))
+        # 名前順を保ったまま挿入
+        successor = min((n for n in self.taskbar_buttons if n > name), default=None)
+        if successor: btn.pack(side="left", padx=3, before=self.taskbar_buttons[successor])
+        else: btn.pack(side="left", padx=3)
+        self.taskbar_buttons[name] = btn
+
+    def on_app_index_delta(self, delta):
+        """app/ の変更通知: 変わったボタンだけ追加/削除"""
+        for entry in delta.removed:
+            self.modules.forget(entry.name)
+            btn = self.taskbar_buttons.pop(entry.name, None)
+            if btn: btn.destroy()
+        if getattr(self, "app_strip", None) is None or not self.app_strip.winfo_exists(): return
+        for entry in delta.added:
+            if self.is_taskbar_app(entry.name) and entry.name not in self.taskbar_buttons:
+                self.add_taskbar_button(entry.name)
+        log.info(f"App index updated: {delta}")
+
+    def refresh_taskbar_apps(self):
+        """AppStore 等からの明示的な再スキャン要求"""
+        return self.app_index.refresh()
 
     # --- [POWER MANAGEMENT MENU] ---
     def show_power_menu(self):
@@ -250,16 +495,27 @@ class QuoriOSCore:
             tk.Label(frame, text=f"| {desc}", fg="#666", bg="#000", font=("Consolas", 9)).pack(side="left", padx=10)
 
     def pwr_shutdown(self):
-        if messagebox.askyesno("Power", "Shutdown QuoriOS?"): self.root.quit()
+        if messagebox.askyesno("Power", "Shutdown QuoriOS?"):
+            self.stores.flush_all()
+            self.supervisor.shutdown()
+            self.root.quit()
 
     def pwr_reboot_pc(self):
         if messagebox.askyesno("Power", "Simulate PC Reboot?"):
+            self.stores.flush_all()
+            self.supervisor.shutdown()
             os.execl(sys.executable, sys.executable, *sys.argv)
 
     def pwr_reboot_os(self):
+        self.boot_timeline = BootTimeline()
+        self.app_index.stop_watching()
+        self.sessions.clear()   # カーネル再起動ではセッションも作り直す
+        self.session = None
         self.pwr_win.destroy(); self.root.withdraw(); self.initiate_boot_sequence()
 
     def pwr_sleep(self):
+        # セッションは破棄せず隠すだけ (アンロックで即復帰)
+        self.sessions.deactivate()
         self.pwr_win.destroy(); self.root.withdraw(); self.draw_login_gate()
 
 if __name__ == "__main__":
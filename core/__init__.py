@@ -0,0 +1 @@
+"""Quori OS カーネル・サブシステム群 (boost.py から利用)"""
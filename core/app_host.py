@@ -0,0 +1,382 @@
+import os
+import sys
+import copy
+import time
+import logging
+import itertools
+import threading
+import traceback
+import multiprocessing
+from contextlib import contextmanager
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [APP HOST] OUT-OF-PROCESS APP HOSTING + KERNEL-SIDE SUPERVISOR
+# =============================================================================
+#
+#   Kernel (QuoriOSCore)                         Worker process (own tk.Tk)
+#   AppSupervisor  <──── multiprocessing.Pipe ────>  RemoteCore (os_core proxy)
+#     log / launch / refresh_taskbar / store_*   <──
+#     state / store_changed / reply / shutdown   ──>
+#
+
+log = get_logger("apphost")
+
+PUMP_MS = 50
+
+# カーネル内のサービス (config_store / users / apply_theme 等) を直接操作するアプリ。
+# RemoteCore はこれらを中継しないので、隔離指定があってもカーネルのプロセスで起動する
+KERNEL_BOUND_APPS = frozenset({"setting"})
+
+# モジュールの読み込み自体に失敗した時の終了コード (作り直しても同じなので再起動しない)
+EXIT_LOAD_FAILED = 3
+
+
+# -----------------------------------------------------------------------------
+# WORKER SIDE
+# -----------------------------------------------------------------------------
+class _PipeLogHandler(logging.Handler):
+    """ワーカー内のログをカーネルのログパイプラインへ転送"""
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+
+    def emit(self, record):
+        try:
+            self.core._send(("log", self.format(record), record.levelno, None))
+        except Exception:
+            pass
+
+
+class RemoteConfigStore:
+    """カーネル側 ConfigStore のローカルコピー。書き込みはパイプ経由でカーネルへ送ります。"""
+    def __init__(self, core, path, data):
+        self.core = core
+        self.path = path
+        self._data = data
+        self._subscribers = []
+
+    def get(self, key, default=None):
+        return copy.deepcopy(self._data.get(key, default))
+
+    def snapshot(self):
+        return copy.deepcopy(self._data)
+
+    @contextmanager
+    def transaction(self):
+        draft = copy.deepcopy(self._data)
+        yield draft
+        if draft != self._data:
+            self._data = draft
+            self.core._send(("store_replace", self.path, draft))
+
+    def set(self, key, value):
+        with self.transaction() as data: data[key] = value
+
+    def update(self, mapping):
+        with self.transaction() as data: data.update(mapping)
+
+    def replace(self, data):
+        with self.transaction() as draft:
+            draft.clear()
+            draft.update(data)
+
+    def subscribe(self, callback, keys=None):
+        self._subscribers.append((callback, set(keys) if keys else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+    def flush(self):
+        return True
+
+    def _apply_remote(self, data):
+        changed = {k for k in self._data.keys() | data.keys() if self._data.get(k) != data.get(k)}
+        self._data = data
+        for callback, keys in list(self._subscribers):
+            if changed and (keys is None or keys & changed):
+                callback(self, changed)
+
+
+class RemoteConfigRegistry:
+    def __init__(self, core):
+        self.core = core
+        self._stores = {}
+
+    def open(self, path, defaults=None):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in self._stores:
+            data = self.core._request("store_open", path, defaults)
+            self._stores[key] = RemoteConfigStore(self.core, path, data)
+        return self._stores[key]
+
+    def flush_all(self):
+        return True
+
+
+class RemoteCore:
+    """
+    ワーカープロセス内でアプリに渡す os_core の代理オブジェクト。
+    設定・ログ・launch_app 等はパイプ越しにカーネルへ中継します。
+    """
+    def __init__(self, conn, root, state, base_dir):
+        self.conn = conn
+        self.root = root
+        self.isolated = True
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._replies = {}
+        self._apply_state(state)
+        self.stores = RemoteConfigRegistry(self)
+
+        from core.frame_clock import FrameClock
+        self.frame_clock = FrameClock(root)
+
+        from core.theme import ThemeRegistry, DEFAULT_ACCENT
+        self.theme = ThemeRegistry(root, state.get("accent", DEFAULT_ACCENT))
+
+        from core.icon_cache import IconCache, ThumbnailStore
+        icon_dir = os.path.join(base_dir, "app", "__appdeta__")
+        logos = {"pro": os.path.join(base_dir, "pro_logo.png"), "normal": os.path.join(base_dir, "logo.png")}
+        self.icon_cache = IconCache(icon_dir, ThumbnailStore(os.path.join(base_dir, "__qcache__", "icons")),
+                                    lambda mode: logos["pro" if mode == "pro" else "normal"])
+
+    def _apply_state(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+        theme = getattr(self, "theme", None)
+        if theme and state.get("accent"):
+            theme.set_accent(state["accent"])   # カーネル側の配色変更をこのプロセスのウィンドウにも反映
+
+    # --- PIPE ---
+    def _send(self, msg):
+        with self._send_lock:
+            self.conn.send(msg)
+
+    def _request(self, kind, *args, timeout=10.0):
+        """同期RPC (カーネルの応答を待つ間に届いた他メッセージは通常処理)"""
+        req_id = next(self._ids)
+        self._send((kind, req_id) + args)
+        deadline = time.monotonic() + timeout
+        while req_id not in self._replies:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                raise TimeoutError(f"Kernel did not answer {kind}")
+            self._dispatch(self.conn.recv())
+        return self._replies.pop(req_id)
+
+    def _dispatch(self, msg):
+        kind = msg[0]
+        if kind == "reply":
+            self._replies[msg[1]] = msg[2]
+        elif kind == "state":
+            self._apply_state(msg[1])
+        elif kind == "store_changed":
+            store = self.stores._stores.get(os.path.normcase(os.path.abspath(msg[1])))
+            if store: store._apply_remote(msg[2])
+        elif kind == "shutdown":
+            self.root.destroy()
+
+    def pump(self):
+        try:
+            while self.conn.poll():
+                self._dispatch(self.conn.recv())
+        except (EOFError, OSError):
+            self.root.destroy()   # カーネルが消えたら道連れ
+            return
+        # アプリのウィンドウが全て閉じられたらプロセス終了
+        if not self.root.winfo_children():
+            self.root.destroy()
+            return
+        self.root.after(PUMP_MS, self.pump)
+
+    # --- os_core API ---
+    def write_log(self, message, level="INFO", subsystem=None):
+        if subsystem is None:
+            subsystem = sys._getframe(1).f_globals.get("__name__", "app")
+        self._send(("log", message, level, subsystem))
+
+    def invoke_app(self, name, **kwargs):
+        self._send(("launch", name, kwargs))
+
+    launch_app = invoke_app
+
+    def refresh_taskbar_apps(self):
+        self._send(("refresh_taskbar",))
+
+    def get_icon(self, name, size=(45, 45)):
+        try:
+            return self.icon_cache.get(name, size, self.system_mode)
+        except Exception:
+            return None
+
+
+def host_main(app_name, conn, base_dir, state, kwargs):
+    """ワーカープロセスのエントリポイント (spawn で起動)"""
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    import tkinter as tk
+    from core.module_registry import ModuleRegistry
+
+    root = tk.Tk()
+    root.withdraw()
+    core = RemoteCore(conn, root, state, base_dir)
+
+    handler = _PipeLogHandler(core)
+    handler.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    try:
+        mod, rec = ModuleRegistry(base_dir, os.path.join(base_dir, "app")).load(app_name)
+        if not hasattr(mod, "run") and not hasattr(mod, "SettingApp"):
+            raise ImportError(f"module {app_name} has no run()")
+    except Exception:
+        core._send(("log", f"Isolated app {app_name} failed to load:\n{traceback.format_exc()}", "ERROR", f"app.{app_name}"))
+        conn.close()
+        sys.exit(EXIT_LOAD_FAILED)
+
+    try:
+        if hasattr(mod, "run"): mod.run(root, core, **kwargs)
+        else: mod.SettingApp(root, core)
+    except Exception:
+        core._send(("log", f"Isolated app {app_name} crashed:\n{traceback.format_exc()}", "ERROR", f"app.{app_name}"))
+        conn.close()
+        sys.exit(1)
+
+    root.after(PUMP_MS, core.pump)
+    root.mainloop()
+    conn.close()
+
+
+# -----------------------------------------------------------------------------
+# KERNEL SIDE
+# -----------------------------------------------------------------------------
+class HostedApp:
+    __slots__ = ("name", "kwargs", "process", "conn", "restarts", "started_at", "store_watches")
+
+    def __init__(self, name, kwargs):
+        self.name = name
+        self.kwargs = kwargs
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.started_at = 0.0
+        self.store_watches = {}
+
+
+class AppSupervisor:
+    """
+    隔離モードで起動したアプリのワーカープロセスを管理します。
+    パイプの中継・クラッシュ時の再起動 (max_restarts 回まで)・シャットダウン時の強制終了。
+    """
+    def __init__(self, core, base_dir, max_restarts=3, poll_ms=100):
+        self.core = core
+        self.base_dir = base_dir
+        self.max_restarts = max_restarts
+        self.poll_ms = poll_ms
+        self.apps = []
+        self._ctx = multiprocessing.get_context("spawn")
+        self._poll_job = None
+
+    def launch(self, name, **kwargs):
+        hosted = HostedApp(name, kwargs)
+        self._start(hosted)
+        self.apps.append(hosted)
+        if self._poll_job is None:
+            self._poll_job = self.core.root.after(self.poll_ms, self._poll)
+        return hosted
+
+    def _start(self, hosted):
+        parent_conn, child_conn = self._ctx.Pipe()
+        hosted.conn = parent_conn
+        hosted.process = self._ctx.Process(
+            target=host_main, name=f"quori-app-{hosted.name}", daemon=True,
+            args=(hosted.name, child_conn, self.base_dir, self.core.remote_state(), hosted.kwargs))
+        hosted.process.start()
+        child_conn.close()
+        hosted.started_at = time.monotonic()
+        log.info(f"Isolated process {hosted.name} started (pid {hosted.process.pid}).")
+
+    def _poll(self):
+        self._poll_job = None
+        for hosted in list(self.apps):
+            try:
+                while hosted.conn.poll():
+                    self._handle(hosted, hosted.conn.recv())
+            except (EOFError, OSError):
+                pass
+            if not hosted.process.is_alive():
+                self._reap(hosted)
+        if self.apps:
+            self._poll_job = self.core.root.after(self.poll_ms, self._poll)
+
+    def _reap(self, hosted):
+        code = hosted.process.exitcode
+        self._drop_watches(hosted)
+        hosted.conn.close()
+        if code == 0:
+            log.info(f"Isolated process {hosted.name} exited.")
+            self.apps.remove(hosted)
+        elif code == EXIT_LOAD_FAILED:
+            log.error(f"Isolated process {hosted.name} could not load its module; not restarting.")
+            self.apps.remove(hosted)
+        elif hosted.restarts < self.max_restarts:
+            hosted.restarts += 1
+            log.warning(f"Isolated process {hosted.name} crashed (exit {code}); restart {hosted.restarts}/{self.max_restarts}.")
+            self._start(hosted)
+        else:
+            log.error(f"Isolated process {hosted.name} crashed (exit {code}); giving up after {self.max_restarts} restarts.")
+            self.apps.remove(hosted)
+
+    def _handle(self, hosted, msg):
+        kind = msg[0]
+        if kind == "log":
+            _, message, level, subsystem = msg
+            self.core.write_log(message, level, subsystem or f"app.{hosted.name}")
+        elif kind == "launch":
+            self.core.invoke_app(msg[1], **msg[2])
+        elif kind == "refresh_taskbar":
+            self.core.refresh_taskbar_apps()
+        elif kind == "store_open":
+            _, req_id, path, defaults = msg
+            store = self.core.stores.open(path, defaults)
+            if path not in hosted.store_watches:
+                def forward(store, changed, hosted=hosted, path=path):
+                    self._send(hosted, ("store_changed", path, store.snapshot()))
+                hosted.store_watches[path] = (store, store.subscribe(forward))
+            self._send(hosted, ("reply", req_id, store.snapshot()))
+        elif kind == "store_replace":
+            _, path, data = msg
+            self.core.stores.open(path).replace(data)
+
+    def _send(self, hosted, msg):
+        try:
+            hosted.conn.send(msg)
+        except (OSError, ValueError):
+            pass
+
+    def _drop_watches(self, hosted):
+        for store, callback in hosted.store_watches.values():
+            store.unsubscribe(callback)
+        hosted.store_watches = {}
+
+    def broadcast_state(self):
+        state = self.core.remote_state()
+        for hosted in self.apps:
+            self._send(hosted, ("state", state))
+
+    def shutdown(self, timeout=1.0):
+        """全ワーカーへ終了要求 → 応答が無ければ kill"""
+        for hosted in self.apps:
+            self._send(hosted, ("shutdown",))
+        deadline = time.monotonic() + timeout
+        for hosted in self.apps:
+            hosted.process.join(max(0.0, deadline - time.monotonic()))
+            if hosted.process.is_alive():
+                hosted.process.kill()
+                hosted.process.join(0.5)
+            self._drop_watches(hosted)
+        self.apps = []
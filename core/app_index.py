@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import namedtuple
+
+# =============================================================================
+# [APP INDEX] SNAPSHOT OF app/ + POLLING WATCHER WITH DELTAS
+# =============================================================================
+
+AppEntry = namedtuple("AppEntry", "name path mtime_ns size")
+
+
+class AppDelta:
+    """スナップショット間の差分 (追加・削除・変更されたアプリ)"""
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self, added=(), removed=(), changed=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = list(changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f"AppDelta(+{[e.name for e in self.added]} -{[e.name for e in self.removed]} "
+                f"~{[e.name for e in self.changed]})")
+
+
+class AppIndex:
+    """
+    app/ 直下の *.py を scandir + mtime で管理するインデックス。
+    refresh() で差分を計算し、購読者に AppDelta を通知します (通知は呼び出し元スレッド)。
+    """
+    def __init__(self, app_dir):
+        self.app_dir = app_dir
+        self.snapshot = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._watch_root = None
+        self._watch_job = None
+        self._watch_interval = 2000
+
+    def scan(self):
+        found = {}
+        try:
+            entries = os.scandir(self.app_dir)
+        except OSError:
+            return found
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".py") or entry.name == "__init__.py":
+                    continue
+                try:
+                    if not entry.is_file(): continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                name = entry.name[:-3]
+                found[name] = AppEntry(name, entry.path, st.st_mtime_ns, st.st_size)
+        return found
+
+    def refresh(self):
+        """再スキャンして差分を購読者へ通知。戻り値: AppDelta"""
+        current = self.scan()
+        with self._lock:
+            old = self.snapshot
+            delta = AppDelta(
+                added=[current[n] for n in sorted(current.keys() - old.keys())],
+                removed=[old[n] for n in sorted(old.keys() - current.keys())],
+                changed=[current[n] for n in sorted(current.keys() & old.keys())
+                         if current[n][2:] != old[n][2:]],
+            )
+            self.snapshot = current
+            subscribers = list(self._subscribers)
+        if delta:
+            for callback in subscribers:
+                callback(delta)
+        return delta
+
+    def names(self):
+        with self._lock:
+            return sorted(self.snapshot)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers: self._subscribers.remove(callback)
+
+    # --- POLLING WATCHER (Tkメインスレッドで動作) ---
+    def start_watching(self, root, interval_ms=2000):
+        self._watch_root = root
+        self._watch_interval = interval_ms
+        if self._watch_job is None:
+            self._watch_job = root.after(interval_ms, self._poll)
+
+    def stop_watching(self):
+        if self._watch_job is not None and self._watch_root is not None:
+            self._watch_root.after_cancel(self._watch_job)
+        self._watch_job = None
+
+    def _poll(self):
+        try:
+            self.refresh()
+        finally:
+            self._watch_job = self._watch_root.after(self._watch_interval, self._poll)
@@ -0,0 +1,84 @@
+import os
+import threading
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [BOOT ASSETS] PRE-RENDERED BOOT LOGO / LOGIN BACKGROUND PER (SCREEN, MODE)
+# =============================================================================
+
+log = get_logger("bootassets")
+
+MODES = ("normal", "pro")
+LOGO_SCALE = 0.55
+
+
+class BootAssets:
+    """
+    起動ロゴ・ログイン背景を (画面サイズ, モード) ごとに縮小済みPNGとして ThumbnailStore に置きます。
+    ウォーム時は画面サイズ分の小さなPNGを1枚デコードするだけ、
+    コールド時は呼び出し側をブロックせずワーカースレッドで描画します。
+    """
+    def __init__(self, store, logo_for_mode, login_bg):
+        self.store = store
+        self.logo_for_mode = logo_for_mode
+        self.login_bg = login_bg
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def spec(self, kind, screen, mode):
+        """(元画像, 出力サイズ)。元画像が無ければ None"""
+        sw, sh = screen
+        if kind == "boot_logo":
+            side = int(min(sw, sh) * LOGO_SCALE)
+            src, size = self.logo_for_mode(mode), (side, side)
+        elif kind == "login_bg":
+            src, size = self.login_bg, (sw, sh)
+        else:
+            raise KeyError(kind)
+        return (src, size) if os.path.exists(src) else None
+
+    def cached(self, kind, screen, mode):
+        """描画済みなら PIL Image を返す (メインスレッドから呼んでよいのはこれだけ)"""
+        spec = self.spec(kind, screen, mode)
+        if spec is None: return None
+        try:
+            if not os.path.exists(self.store.thumb_path(*spec)): return None
+            return self.store.load(*spec)
+        except OSError:
+            return None
+
+    def render(self, kind, screen, mode):
+        spec = self.spec(kind, screen, mode)
+        return self.store.load(*spec) if spec else None
+
+    def render_async(self, kind, screen, mode, on_ready):
+        """ワーカースレッドで描画し on_ready(img) を呼ぶ (Tk への反映は呼び出し側で after 経由に)"""
+        def work():
+            try:
+                img = self.render(kind, screen, mode)
+            except Exception as e:
+                log.warning(f"Boot asset {kind} render failed: {e}")
+                return
+            if img is not None: on_ready(img)
+        threading.Thread(target=work, name=f"boot-asset-{kind}", daemon=True).start()
+
+    def prerender(self, screen, modes=MODES):
+        """全種類 × modes を描画 (済んでいれば stat のみ)。プリウォーム/モード変更時に使用。"""
+        key = (tuple(screen), tuple(modes))
+        with self._lock:
+            if key in self._pending: return
+            self._pending.add(key)
+        try:
+            for mode in modes:
+                for kind in ("boot_logo", "login_bg"):
+                    try:
+                        self.render(kind, screen, mode)
+                    except OSError as e:
+                        log.warning(f"Boot asset {kind}/{mode} prerender failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def prerender_async(self, screen, modes=MODES):
+        threading.Thread(target=self.prerender, args=(screen, modes), name="boot-asset-prerender", daemon=True).start()
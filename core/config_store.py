@@ -0,0 +1,167 @@
+import os
+import copy
+import json
+import threading
+from contextlib import contextmanager
+
+from core.logpipe import get_logger
+
+log = get_logger("config")
+
+# =============================================================================
+# [CONFIG STORE] IN-MEMORY AUTHORITATIVE .qcfg + COALESCED ATOMIC WRITES
+# =============================================================================
+
+_MISSING = object()
+
+
+class ConfigStore:
+    """
+    1つの .qcfg ファイルを担当する唯一の書き手。
+    メモリ上のコピーが正であり、変更は delay 秒ごとにまとめて
+    一時ファイル → os.replace でアトミックに書き出します。
+    """
+    def __init__(self, path, defaults=None, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.write_count = 0
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self._subscribers = []
+        self._data = copy.deepcopy(defaults) if defaults else {}
+        self._data.update(self._read_disk())
+
+    def _read_disk(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            log.error(f"Config Load Error ({os.path.basename(self.path)}): {e}")
+            return {}
+
+    # --- READ ---
+    def get(self, key, default=None):
+        with self._lock:
+            return copy.deepcopy(self._data.get(key, default))
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    # --- WRITE ---
+    @contextmanager
+    def transaction(self):
+        """下書きを編集し、ブロックを抜けた時点で一括反映 (例外時は破棄)。"""
+        with self._lock:
+            draft = copy.deepcopy(self._data)
+            yield draft
+            changed = {k for k in self._data.keys() | draft.keys()
+                       if self._data.get(k, _MISSING) != draft.get(k, _MISSING)}
+            if changed:
+                self._data = draft
+                self._schedule_write()
+        if changed:
+            self._notify(changed)
+
+    def set(self, key, value):
+        with self.transaction() as data:
+            data[key] = value
+
+    def update(self, mapping):
+        with self.transaction() as data:
+            data.update(mapping)
+
+    def replace(self, data):
+        with self.transaction() as draft:
+            draft.clear()
+            draft.update(data)
+
+    # --- SUBSCRIPTION ---
+    def subscribe(self, callback, keys=None):
+        """callback(store, changed_keys)。keys を指定するとそのキーの変更時のみ通知。"""
+        with self._lock:
+            self._subscribers.append((callback, set(keys) if keys else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+    def _notify(self, changed):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, keys in subscribers:
+            if keys is None or keys & changed:
+                try:
+                    callback(self, changed)
+                except Exception:
+                    log.exception(f"Config subscriber failed ({os.path.basename(self.path)})")
+
+    # --- PERSISTENCE ---
+    def _schedule_write(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """保留中の変更を即座に書き出す。成功 (または変更なし) で True。"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            payload = json.dumps(self._data, indent=4, ensure_ascii=False)
+            self._dirty = False
+
+            tmp = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self.write_count += 1
+                return True
+            except OSError as e:
+                self._dirty = True
+                log.error(f"Config Save Error ({os.path.basename(self.path)}): {e}")
+                return False
+
+
+class ConfigRegistry:
+    """パスごとに ConfigStore を1つだけ保持し、全アプリで共有させます。"""
+    def __init__(self, delay=0.5):
+        self.delay = delay
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def open(self, path, defaults=None):
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = self._stores[key] = ConfigStore(path, defaults, self.delay)
+            elif defaults:
+                with store.transaction() as data:
+                    for k, v in defaults.items(): data.setdefault(k, copy.deepcopy(v))
+            return store
+
+    def close(self, path):
+        """書き出してから登録を外す (ファイルを消す前に呼ぶ。以降の open/flush_all で書き戻されない)"""
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            store = self._stores.pop(key, None)
+        return store.flush() if store else True
+
+    def flush_all(self):
+        with self._lock:
+            stores = list(self._stores.values())
+        return all([s.flush() for s in stores])
@@ -0,0 +1,178 @@
+import time
+import tkinter as tk
+
+from core.logpipe import get_logger
+from core.loop_monitor import owner_of
+
+# =============================================================================
+# [FRAME CLOCK] SHARED TICK FOR ANIMATIONS AND PERIODIC TASKS
+# =============================================================================
+
+log = get_logger("frameclock")
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+
+class _Subscription:
+    """animate()/every() が返すハンドル。cancel() で購読解除。"""
+    def __init__(self, callback, widget, owner, skip_hidden=True):
+        self.callback = callback
+        self.widget = widget
+        self.skip_hidden = skip_hidden
+        self.owner = owner or owner_of(callback)
+        self.cancelled = False
+        self.next_due = 0.0
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class _Animation(_Subscription):
+    def __init__(self, duration_ms, on_frame, on_done, easing, widget, owner, now):
+        super().__init__(on_frame, widget, owner)
+        self.duration = max(duration_ms, 1) / 1000
+        self.on_done = on_done
+        self.easing = EASINGS.get(easing, easing) if isinstance(easing, str) else easing
+        self.start = now
+        self.next_due = now
+
+    def step(self, now, visible):
+        """戻り値 True で完了"""
+        progress = min(1.0, (now - self.start) / self.duration)
+        if visible or progress >= 1.0:
+            self.callback(self.easing(progress))
+        if progress >= 1.0:
+            if self.on_done: self.on_done()
+            return True
+        return False
+
+
+class _Periodic(_Subscription):
+    def __init__(self, interval_ms, callback, widget, owner, now, align, skip_hidden):
+        super().__init__(callback, widget, owner, skip_hidden)
+        self.interval = interval_ms / 1000
+        # align=True: 壁時計の境界 (秒の頭など) に合わせて発火
+        self.next_due = now + (self.interval - time.time() % self.interval if align else self.interval)
+
+    def step(self, now, visible):
+        if visible:
+            self.callback()
+        self.next_due += self.interval
+        if self.next_due <= now:   # 大きく遅れた分は取り戻さずに次の周期へ
+            self.next_due = now + self.interval
+        return False
+
+
+class FrameClock:
+    """
+    全アニメーション・周期処理を1本の after ループに多重化するカーネルサービス。
+    ・時刻は time.monotonic() 基準 (負荷で after が遅れても進み具合は正確)
+    ・非表示 (最小化/withdraw) のウィンドウに属する購読者は描画をスキップ
+    ・次の期限まで眠るので、周期処理だけならフレーム毎には起きない
+    """
+    def __init__(self, root, fps=60, monitor=None):
+        self.root = root
+        self.monitor = monitor
+        self.fps = fps
+        self.ticks = 0
+        self._subs = []
+        self._job = None
+        self._due = None
+
+    @property
+    def frame_s(self):
+        return 1.0 / max(1, self.fps)
+
+    def set_fps(self, fps):
+        self.fps = max(1, int(fps))
+
+    # --- SUBSCRIBE ---
+    def animate(self, duration_ms, on_frame, on_done=None, easing="linear", widget=None, owner=None):
+        """on_frame(eased_progress 0.0→1.0) を毎フレーム呼び、終了時に on_done()"""
+        sub = _Animation(duration_ms, on_frame, on_done, easing, widget, owner, time.monotonic())
+        return self._add(sub)
+
+    def every(self, interval_ms, callback, widget=None, align=False, skip_hidden=True, owner=None):
+        """
+        callback() を interval_ms ごとに呼ぶ (widget が破棄されたら自動解除)。
+        アラーム判定など非表示中も止めたくない処理は skip_hidden=False。
+        """
+        sub = _Periodic(interval_ms, callback, widget, owner, time.monotonic(), align, skip_hidden)
+        return self._add(sub)
+
+    def _add(self, sub):
+        self._subs.append(sub)
+        self._wake(sub.next_due)
+        return sub
+
+    # --- LOOP ---
+    def _after(self, ms, func):
+        if self.monitor is not None:
+            return self.monitor.raw_after(ms, func)
+        return self.root.after(ms, func)
+
+    def _wake(self, due):
+        """due までに tick が予定されていなければ前倒しで予約"""
+        if self._job is not None and self._due is not None and self._due <= due:
+            return
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+        self._due = due
+        delay = max(0, int((due - time.monotonic()) * 1000))
+        self._job = self._after(delay, self._tick)
+
+    @staticmethod
+    def _visibility(widget):
+        """None=破棄済み / False=非表示 / True=表示中"""
+        if widget is None: return True
+        try:
+            if not widget.winfo_exists(): return None
+            return bool(widget.winfo_viewable())
+        except tk.TclError:
+            return None
+
+    def _tick(self):
+        self._job = None
+        now = time.monotonic()
+        if self.monitor is not None and self._due is not None:
+            self.monitor.record_lag("frame_clock", max(0.0, (now - self._due) * 1000))
+        self._due = None
+        self.ticks += 1
+        # 半フレーム以内に期限が来るものはまとめて処理 (起床回数の削減)
+        horizon = now + self.frame_s / 2
+
+        for sub in list(self._subs):
+            if sub.cancelled:
+                self._subs.remove(sub)
+                continue
+            if sub.next_due > horizon:
+                continue
+            visible = self._visibility(sub.widget)
+            if visible is None:
+                sub.cancel()
+                self._subs.remove(sub)
+                continue
+            t0 = time.perf_counter()
+            try:
+                done = sub.step(now, visible or not sub.skip_hidden)
+            except Exception:
+                log.exception(f"Frame clock subscriber failed ({sub.owner})")
+                done = True
+            if self.monitor is not None:
+                self.monitor.record(sub.owner, (time.perf_counter() - t0) * 1000)
+            if done or sub.cancelled:
+                sub.cancelled = True
+                if sub in self._subs: self._subs.remove(sub)
+
+        if self._subs:
+            # アニメーションがあれば次フレーム、無ければ最も近い周期処理の期限まで眠る
+            due = min(s.next_due for s in self._subs)
+            self._wake(max(due, now + self.frame_s) if any(isinstance(s, _Animation) for s in self._subs) else due)
+
+    def stats(self):
+        return {"fps": self.fps, "ticks": self.ticks, "subscribers": len(self._subs)}
@@ -0,0 +1,124 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+# =============================================================================
+# [ICON CACHE] MULTI-RESOLUTION THUMBNAIL STORE + PHOTOIMAGE LRU
+# =============================================================================
+
+
+class ThumbnailStore:
+    """
+    縮小済みPNGのディスクキャッシュ。
+    ファイル名に元画像の size/mtime を埋め込み、元画像が更新されたら自動的に作り直します。
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def signature(src_path):
+        st = os.stat(src_path)
+        return f"{st.st_size:x}.{st.st_mtime_ns:x}"
+
+    def _prefix(self, src_path, size):
+        base = os.path.splitext(os.path.basename(src_path))[0]
+        key = hashlib.sha1(os.path.abspath(src_path).encode("utf-8")).hexdigest()[:10]
+        return f"{base}-{key}_{size[0]}x{size[1]}_"
+
+    def thumb_path(self, src_path, size, sig=None):
+        sig = sig or self.signature(src_path)
+        return os.path.join(self.cache_dir, self._prefix(src_path, size) + sig + ".png")
+
+    def load(self, src_path, size, sig=None):
+        """(src, size) の縮小画像を返す。キャッシュが温かければフルサイズのデコードは行わない。"""
+        sig = sig or self.signature(src_path)
+        cached = self.thumb_path(src_path, size, sig)
+        if os.path.exists(cached):
+            try:
+                img = Image.open(cached)
+                img.load()
+                return img
+            except OSError:
+                pass  # 壊れたサムネイルは作り直す
+
+        with Image.open(src_path) as raw:
+            if raw.mode not in ("RGB", "RGBA"):
+                raw = raw.convert("RGBA")
+            img = raw.resize(tuple(size), Image.Resampling.LANCZOS)
+        self._store(img, src_path, size, cached)
+        return img
+
+    def _store(self, img, src_path, size, cached):
+        tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            img.save(tmp, "PNG")
+            os.replace(tmp, cached)
+        except OSError:
+            if os.path.exists(tmp): os.remove(tmp)
+            return
+        # 古い世代のサムネイルを掃除
+        prefix = self._prefix(src_path, size)
+        keep = os.path.basename(cached)
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(prefix) and entry.name != keep and entry.name.endswith(".png"):
+                try: os.remove(entry.path)
+                except OSError: pass
+
+
+class IconCache:
+    """
+    (name, size, mode) をキーにした PhotoImage のLRU。
+    ミス時は ThumbnailStore から縮小済みPNGを読むので、ウォーム状態ではフルサイズのデコードが発生しません。
+    ※ 追い出された PhotoImage を表示中のウィジェットがある場合、呼び出し側で参照を保持してください。
+    """
+    def __init__(self, icon_dir, store, fallback_for_mode, capacity=64):
+        self.icon_dir = icon_dir
+        self.store = store
+        self.fallback_for_mode = fallback_for_mode
+        self.capacity = capacity
+        self._photos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, name, mode):
+        icon_path = os.path.join(self.icon_dir, f"{name}_logo.png")
+        if os.path.exists(icon_path):
+            return icon_path
+        return self.fallback_for_mode(mode)
+
+    def load_image(self, name, size=(45, 45), mode="normal"):
+        """PIL画像を返す (ワーカースレッドからも呼び出し可)。"""
+        path = self.resolve(name, mode)
+        return self.store.load(path, size)
+
+    def get(self, name, size=(45, 45), mode="normal"):
+        """PhotoImage を返す (Tkのメインスレッド専用)。"""
+        size = tuple(size)
+        key = (name, size, mode)
+        path = self.resolve(name, mode)
+        ident = (path, self.store.signature(path))
+
+        with self._lock:
+            hit = self._photos.get(key)
+            if hit and hit[0] == ident:
+                self._photos.move_to_end(key)
+                return hit[1]
+
+        photo = ImageTk.PhotoImage(self.store.load(path, size, ident[1]))
+        with self._lock:
+            self._photos[key] = (ident, photo)
+            self._photos.move_to_end(key)
+            while len(self._photos) > self.capacity:
+                self._photos.popitem(last=False)
+        return photo
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._photos.clear()
+            else:
+                for key in [k for k in self._photos if k[0] == name]:
+                    del self._photos[key]
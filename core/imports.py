@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import builtins
+import threading
+import importlib.util
+
+# =============================================================================
+# [IMPORTS] STARTUP IMPORT PROFILER + LAZY IMPORT
+# =============================================================================
+
+
+def lazy_import(name):
+    """
+    モジュールを importlib.util.LazyLoader で登録だけして返す。
+    本体の実行は最初の属性アクセスまで遅延 (見つからない場合はこの時点で ModuleNotFoundError)。
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    if "." in name:
+        parent, _, child = name.rpartition(".")
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+class ImportProfiler:
+    """
+    builtins.__import__ をラップし、新たに読み込まれたモジュールごとの
+    自己時間 (self) と子を含む累積時間 (cumulative) を記録します (-X importtime 相当)。
+    有効化: 環境変数 QUORI_IMPORTTIME=1 または起動引数 --importtime
+    """
+    def __init__(self):
+        self.records = {}   # name -> [self_ms, cum_ms]
+        self._local = threading.local()   # import の入れ子はスレッド毎 (prewarm のワーカーとメインが交互に import する)
+        self._lock = threading.Lock()
+        self._orig = None
+
+    @property
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None: stack = self._local.stack = []
+        return stack
+
+    @classmethod
+    def from_environ(cls):
+        if os.environ.get("QUORI_IMPORTTIME") == "1" or "--importtime" in sys.argv:
+            return cls().install()
+        return None
+
+    def install(self):
+        if self._orig: return self
+        self._orig = orig = builtins.__import__
+        prof = self
+
+        def __import__(name, globals=None, locals=None, fromlist=(), level=0):
+            before = len(sys.modules)
+            frame = [0.0]
+            stack = prof._stack
+            stack.append(frame)
+            t0 = time.perf_counter()
+            try:
+                return orig(name, globals, locals, fromlist, level)
+            finally:
+                cum = (time.perf_counter() - t0) * 1000
+                stack.pop()
+                if len(sys.modules) > before:
+                    if stack: stack[-1][0] += cum
+                    prof._record(prof._resolve(name, globals, fromlist, level), cum - frame[0], cum)
+
+        builtins.__import__ = __import__
+        return self
+
+    def uninstall(self):
+        if self._orig:
+            builtins.__import__ = self._orig
+            self._orig = None
+
+    @staticmethod
+    def _resolve(name, globals, fromlist, level):
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            try:
+                name = importlib.util.resolve_name("." * level + name, package)
+            except ImportError:
+                pass
+        if fromlist and len(fromlist) == 1 and f"{name}.{fromlist[0]}" in sys.modules:
+            name = f"{name}.{fromlist[0]}"   # from PIL import ImageTk → PIL.ImageTk
+        return name
+
+    def _record(self, name, self_ms, cum_ms):
+        with self._lock:
+            rec = self.records.setdefault(name, [0.0, 0.0])
+            rec[0] += self_ms
+            rec[1] += cum_ms
+
+    def report(self, top=15):
+        lines = ["IMPORT PROFILE", f"{'MODULE':<32}{'SELF':>10}{'CUMUL':>10}"]
+        ranked = sorted(self.records.items(), key=lambda kv: kv[1][1], reverse=True)
+        for name, (self_ms, cum_ms) in ranked[:top]:
+            lines.append(f"{name:<32}{self_ms:>8.1f}ms{cum_ms:>8.1f}ms")
+        total = sum(r[0] for r in self.records.values())
+        lines.append(f"{len(self.records)} modules, {total:.1f} ms total")
+        return "\n".join(lines)
@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import bisect
+import hashlib
+import datetime
+import threading
+
+# =============================================================================
+# [LOG INDEX] TIME-BUCKETED BYTE OFFSETS FOR system.log
+# =============================================================================
+
+# 2026-01-30 15:20:09 [INFO] kernel: ...  /  旧形式: [2026-01-30 15:20:09] ...
+_LINE_RE = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}):\d{2}(?:,\d+)? \[([A-Z]+)\] ")
+_LEGACY_RE = re.compile(rb"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}):\d{2}\] ")
+
+# イベント種別 (バケットごとに件数を持ち、該当の無いバケットは読み飛ばす)
+EVENT_PATTERNS = {
+    "startup": re.compile(rb"KERNEL STARTUP|Kernel .* initialized"),
+    "spawn": re.compile(rb"Process \S+ spawned"),
+    "login": re.compile(rb"Login successful"),
+    "heartbeat": re.compile(rb"[Hh]eartbeat"),
+    "stall": re.compile(rb"Main loop stall"),
+}
+
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+HEAD_BYTES = 256   # 先頭が同じファイルかの判定に使う長さ
+
+
+def parse_since(text, now=None):
+    """'10m' / '2h' / '1d' / '30s' または 'YYYY-MM-DD[ HH:MM[:SS]]' → epoch秒"""
+    now = time.time() if now is None else now
+    m = re.fullmatch(r"(\d+)([smhd])", text.strip())
+    if m:
+        return now - int(m.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[m.group(2)]
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(text.strip(), fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time: {text}")
+
+
+class LogIndex:
+    """
+    system.log の追記に合わせてインクリメンタルに更新される索引。
+    1分単位のバケットごとに「開始バイトオフセット・レベル別件数・イベント別件数」を保持し、
+    時間範囲/レベル/イベントの問い合わせは該当バケットへ seek して読むだけで済ませます。
+    """
+    VERSION = 1
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, log_path, index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + ".qidx"
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._dirty = False
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.head = ""
+        self.indexed_end = 0
+        self.minutes = []   # バケットの分 (epoch // 60)。bisect 用
+        self.buckets = []   # [offset, lines, {level: n}, {event: n}]
+        self._minute_cache = (None, None)
+
+    # --- PERSISTENCE ---
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION: return
+            self.head = data["head"]
+            self.indexed_end = data["end"]
+            self.minutes = data["minutes"]
+            self.buckets = data["buckets"]
+        except (OSError, ValueError, KeyError):
+            self._reset()
+
+    def save(self):
+        with self._lock:
+            if self._dirty: self._save()
+
+    def _save(self):
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        tmp = self.index_path + ".tmp"
+        data = {"version": self.VERSION, "head": self.head, "end": self.indexed_end,
+                "minutes": self.minutes, "buckets": self.buckets}
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _head_signature(f, length=HEAD_BYTES):
+        """長さ:sha1 の文字列。ファイルが短い間は読めた分だけ (追記で変わらないよう、照合は索引時の長さで行う)"""
+        f.seek(0)
+        data = f.read(length)
+        return f"{len(data)}:{hashlib.sha1(data).hexdigest()}"
+
+    # --- BUILD / UPDATE ---
+    def _minute_of(self, stamp):
+        """'YYYY-MM-DD HH:MM' → epoch分。同じ分が続く限り strptime を呼ばない。"""
+        cached = self._minute_cache
+        if cached[0] == stamp:
+            return cached[1]
+        minute = int(datetime.datetime.strptime(stamp.decode("ascii"), "%Y-%m-%d %H:%M").timestamp()) // 60
+        self._minute_cache = (stamp, minute)
+        return minute
+
+    @staticmethod
+    def parse_header(line):
+        """(分のスタンプ, レベル) を返す。継続行 (トレースバック等) は None。"""
+        m = _LINE_RE.match(line)
+        if m: return m.group(1), m.group(2).decode("ascii")
+        m = _LEGACY_RE.match(line)
+        if m: return m.group(1), "ERROR" if b"Error" in line else "INFO"
+        return None
+
+    def update(self):
+        """前回の位置から追記分だけ索引化。ローテーション等で先頭が変わっていれば作り直し。"""
+        with self._lock:
+            try:
+                f = open(self.log_path, "rb")
+            except OSError:
+                return False
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self.indexed_end:
+                    self._reset()
+                elif self.indexed_end:
+                    length, sep, _ = self.head.partition(":")
+                    if not sep or self._head_signature(f, int(length)) != self.head:
+                        self._reset()   # 先頭が書き換わった (ローテーション等。旧形式の索引も1度だけ作り直す)
+                if size == self.indexed_end:
+                    return False
+                self.head = self._head_signature(f)
+
+                f.seek(self.indexed_end)
+                offset = self.indexed_end
+                for line in f:
+                    if not line.endswith(b"\n"): break   # 書き込み途中の行は次回へ
+                    header = self.parse_header(line)
+                    if header:
+                        minute = self._minute_of(header[0])
+                        if not self.minutes or minute > self.minutes[-1]:
+                            self.minutes.append(minute)
+                            self.buckets.append([offset, 0, {}, {}])
+                        # 時刻が巻き戻った行は現在のバケットに含める (minutes を単調に保つ)
+                        bucket = self.buckets[-1]
+                        bucket[1] += 1
+                        bucket[2][header[1]] = bucket[2].get(header[1], 0) + 1
+                        for event, pattern in EVENT_PATTERNS.items():
+                            if pattern.search(line):
+                                bucket[3][event] = bucket[3].get(event, 0) + 1
+                    offset += len(line)
+                self.indexed_end = offset
+            # 索引ファイルの書き出しは間引く (終了時に save() で確定)
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= self.SAVE_INTERVAL:
+                self._save()
+            return True
+
+    # --- QUERY ---
+    def _candidate_buckets(self, since, until, levels, event):
+        lo = 0 if since is None else max(0, bisect.bisect_right(self.minutes, int(since) // 60) - 1)
+        hi = len(self.minutes) if until is None else bisect.bisect_right(self.minutes, int(until) // 60)
+        for i in range(lo, hi):
+            offset, _, lv, ev = self.buckets[i]
+            if levels and not any(lv.get(l) for l in levels): continue
+            if event and not ev.get(event): continue
+            end = self.buckets[i + 1][0] if i + 1 < len(self.buckets) else self.indexed_end
+            yield offset, end
+
+    def query(self, since=None, until=None, level=None, event=None, grep=None, limit=None):
+        """
+        条件に合うレコード (継続行を含む複数行テキスト) を古い順に返すジェネレータ。
+        level は最低レベル ("ERROR" → ERROR/CRITICAL)。
+        """
+        self.update()
+        levels = set(LEVELS[LEVELS.index(level.upper()):]) if level else None
+        pattern = EVENT_PATTERNS.get(event) if event else None
+        if event and pattern is None:
+            raise ValueError(f"Unknown event type: {event}")
+        needle = grep.lower().encode("utf-8") if grep else None
+        with self._lock:
+            ranges = list(self._candidate_buckets(since, until, levels, event))
+
+        found = 0
+        with open(self.log_path, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                for record in self._records(f, end):
+                    header = self.parse_header(record)
+                    minute_ts = self._minute_of(header[0]) * 60
+                    if since is not None and minute_ts + 59 < since: continue
+                    if until is not None and minute_ts > until: continue
+                    if levels and header[1] not in levels: continue
+                    if pattern and not pattern.search(record): continue
+                    if needle and needle not in record.lower(): continue
+                    yield record.decode("utf-8", "replace").replace("\r\n", "\n").rstrip("\n")
+                    found += 1
+                    if limit and found >= limit: return
+
+    @staticmethod
+    def _records(f, end):
+        record = b""
+        while f.tell() < end:
+            line = f.readline()
+            if not line: break
+            if record and LogIndex.parse_header(line):
+                yield record
+                record = b""
+            if record or LogIndex.parse_header(line):
+                record += line
+        if record:
+            yield record
+
+    def stats(self):
+        with self._lock:
+            totals = {}
+            for _, _, lv, _ in self.buckets:
+                for k, v in lv.items(): totals[k] = totals.get(k, 0) + v
+            return {"buckets": len(self.buckets), "indexed_bytes": self.indexed_end, "levels": totals}
@@ -0,0 +1,111 @@
+import os
+import gzip
+import time
+import queue
+import shutil
+import logging
+import logging.handlers
+
+# =============================================================================
+# [LOG PIPELINE] QUEUE HANDLER + BACKGROUND WRITER + COMPRESSED ROTATION
+# =============================================================================
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(subsystem)s: %(message)s"
+
+
+class SubsystemFilter(logging.Filter):
+    """ロガー名 quori.xxx → subsystem=xxx (ルートロガーは kernel 扱い)"""
+    def filter(self, record):
+        name = record.name
+        if name == "root": name = "kernel"
+        elif name.startswith("quori."): name = name[6:]
+        record.subsystem = name
+        return True
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    サイズ (max_bytes) または経過時間 (max_age 秒) でローテーションし、
+    古いセグメントは system.log.1.gz ... として gzip 圧縮します。
+    ※ 書き込み・圧縮は QueueListener のスレッドで実行されるため、UIループは待たされません。
+    """
+    def __init__(self, filename, max_bytes=2 * 1024 * 1024, backup_count=5, max_age=24 * 3600):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_age = max_age
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._gzip_rotator
+        try:
+            # 前回のセッションから放置された古いログは起動時に切り替える
+            self.segment_start = os.path.getmtime(filename) if os.path.getsize(filename) else time.time()
+        except OSError:
+            self.segment_start = time.time()
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self.segment_start >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.segment_start = time.time()
+
+
+class KernelLogPipeline:
+    """
+    ロガー → QueueHandler → (バックグラウンド) QueueListener → ローテーション付きファイル。
+    サブシステム (quori.kernel / quori.app.qcp 等) ごとにレベルを設定できます。
+    """
+    def __init__(self, log_path, max_bytes=2 * 1024 * 1024, backup_count=5, max_age=24 * 3600):
+        self.log_path = log_path
+        self.queue = queue.SimpleQueue()
+        self.file_handler = CompressingRotatingFileHandler(log_path, max_bytes, backup_count, max_age)
+        self.file_handler.setFormatter(logging.Formatter(LOG_FORMAT, "%Y-%m-%d %H:%M:%S"))
+        self.file_handler.addFilter(SubsystemFilter())
+        self.listener = logging.handlers.QueueListener(self.queue, self.file_handler, respect_handler_level=True)
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.levels = {}
+        self._started = False
+
+    def install(self, level="INFO"):
+        root = logging.getLogger()
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.addHandler(self.queue_handler)
+        root.setLevel(level)
+        if not self._started:
+            self.listener.start()
+            self._started = True
+        return self
+
+    def configure(self, settings):
+        """
+        settings = {"level": "INFO", "subsystems": {"kernel": "DEBUG", "app.qcp": "WARNING"}}
+        (system.qcfg の "logging" セクション)
+        """
+        settings = settings or {}
+        if "level" in settings:
+            logging.getLogger().setLevel(str(settings["level"]).upper())
+        for subsystem, level in settings.get("subsystems", {}).items():
+            self.set_level(subsystem, level)
+
+    def set_level(self, subsystem, level):
+        level = str(level).upper() if not isinstance(level, int) else level
+        logging.getLogger(f"quori.{subsystem}").setLevel(level)
+        self.levels[subsystem] = level
+
+    def stop(self):
+        """キューに残ったレコードを書き切ってから停止"""
+        if self._started:
+            self.listener.stop()
+            self._started = False
+        self.file_handler.close()
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f"quori.{subsystem}")
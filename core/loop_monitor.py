@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import datetime
+import threading
+import tkinter as tk
+from collections import deque
+
+# =============================================================================
+# [LOOP MONITOR] TK MAIN-LOOP LAG + PER-APP CALLBACK PROFILING
+# =============================================================================
+
+
+class RollingHistogram:
+    """直近 window 件のサンプル (ms) から p50/p99 を計算"""
+    def __init__(self, window=512):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms: self.max_ms = ms
+
+    def percentile(self, q):
+        data = sorted(self.samples)
+        if not data: return 0.0
+        return data[min(len(data) - 1, int(round(q * (len(data) - 1))))]
+
+    def summary(self):
+        return {"count": self.count, "p50": self.percentile(0.50), "p99": self.percentile(0.99),
+                "max": self.max_ms, "total_ms": self.total_ms}
+
+
+def owner_of(func):
+    """コールバックの所属モジュール → アプリ名 (app.clock → clock / カーネル側は kernel)"""
+    func = getattr(func, "__func__", func)
+    module = getattr(func, "__module__", None) or "?"
+    if module.startswith("app."): return module[4:]
+    if module in ("__main__", "boost") or module.startswith("core."): return "kernel"
+    return module
+
+
+class LoopMonitor:
+    """
+    tk.Misc の after / bind / command= をラップし、
+    ・after の要求時刻と実際の発火時刻の差 (スケジューラ遅延)
+    ・コールバックの実行時間 (所属アプリ別)
+    をローリングヒストグラムに記録します。
+    """
+    def __init__(self, root, window=512, probe_ms=100):
+        self.root = root
+        self.window = window
+        self.probe_ms = probe_ms
+        self.lag = RollingHistogram(window)
+        self.lag_by_app = {}
+        self.callbacks = {}
+        self._lock = threading.Lock()
+        self._orig = {}
+        self._probe_job = None
+
+    # --- RECORDING ---
+    def _hist(self, table, owner):
+        hist = table.get(owner)
+        if hist is None:
+            hist = table[owner] = RollingHistogram(self.window)
+        return hist
+
+    def record(self, owner, ms):
+        with self._lock:
+            self._hist(self.callbacks, owner).add(ms)
+
+    def record_lag(self, owner, ms):
+        with self._lock:
+            self.lag.add(ms)
+            self._hist(self.lag_by_app, owner).add(ms)
+
+    def wrap(self, func, owner=None):
+        if getattr(func, "_quori_timed", False): return func
+        owner = owner or owner_of(func)
+        monitor = self
+
+        def timed(*args):
+            t0 = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                monitor.record(owner, (time.perf_counter() - t0) * 1000)
+        timed._quori_timed = True
+        timed.__wrapped__ = func
+        return timed
+
+    # --- INSTALL ---
+    def install(self):
+        if self._orig: return self
+        orig_after, orig_bind, orig_options = tk.Misc.after, tk.Misc._bind, tk.Misc._options
+        self._orig = {"after": orig_after, "_bind": orig_bind, "_options": orig_options}
+        monitor = self
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return orig_after(widget, ms)
+            owner = owner_of(func)
+            due = time.perf_counter() + (0 if ms == "idle" else ms / 1000)
+            timed = monitor.wrap(func, owner)
+
+            def fire(*a):
+                monitor.record_lag(owner, max(0.0, (time.perf_counter() - due) * 1000))
+                return timed(*a)
+            return orig_after(widget, ms, fire, *args)
+
+        def _bind(widget, what, sequence, func, add, needcleanup=1):
+            if callable(func): func = monitor.wrap(func)
+            return orig_bind(widget, what, sequence, func, add, needcleanup)
+
+        def _options(widget, cnf, kw=None):
+            cnf = tk._cnfmerge((cnf, kw)) if kw else tk._cnfmerge(cnf)
+            if callable(cnf.get("command")):
+                cnf = dict(cnf, command=monitor.wrap(cnf["command"]))
+            return orig_options(widget, cnf)
+
+        tk.Misc.after, tk.Misc._bind, tk.Misc._options = after, _bind, _options
+        return self
+
+    def uninstall(self):
+        for name, func in self._orig.items():
+            setattr(tk.Misc, name, func)
+        self._orig = {}
+        self.stop_probe()
+
+    def raw_after(self, ms, func, *args):
+        """計測ラッパーを通さない after (自前で内訳を記録する FrameClock 用)"""
+        return self._orig.get("after", tk.Misc.after)(self.root, ms, func, *args)
+
+    # --- LAG PROBE ---
+    def start_probe(self):
+        """一定間隔の空タイマーで、アイドル時も含めたスケジューラ遅延を計測"""
+        after = self._orig.get("after", tk.Misc.after)
+
+        def probe(due):
+            self.record_lag("probe", max(0.0, (time.perf_counter() - due) * 1000))
+            schedule()
+
+        def schedule():
+            due = time.perf_counter() + self.probe_ms / 1000
+            self._probe_job = after(self.root, self.probe_ms, probe, due)
+        schedule()
+
+    def stop_probe(self):
+        if self._probe_job is not None:
+            self.root.after_cancel(self._probe_job)
+            self._probe_job = None
+
+    # --- REPORT ---
+    def snapshot(self):
+        with self._lock:
+            return {
+                "lag": self.lag.summary(),
+                "lag_by_app": {k: h.summary() for k, h in self.lag_by_app.items()},
+                "apps": {k: h.summary() for k, h in self.callbacks.items()},
+            }
+
+    def dump(self, path):
+        """オフライン解析用に生サンプル込みで JSON 出力"""
+        with self._lock:
+            data = {
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "summary": None,
+                "samples": {
+                    "lag": list(self.lag.samples),
+                    "lag_by_app": {k: list(h.samples) for k, h in self.lag_by_app.items()},
+                    "apps": {k: list(h.samples) for k, h in self.callbacks.items()},
+                },
+            }
+        data["summary"] = self.snapshot()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return path
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import hashlib
+import importlib
+import threading
+
+# =============================================================================
+# [MODULE REGISTRY] CHANGE-AWARE APP LOADER
+# =============================================================================
+
+
+class AppNotFoundError(ModuleNotFoundError):
+    """app/ にもルートにも該当するソースが無い"""
+
+
+class AppModuleRecord:
+    """1アプリ分のロード情報 (解決済みターゲット・ソースの stat/hash・最終ロード時間)"""
+    __slots__ = ("name", "module_name", "path", "stamp", "digest", "import_ms", "last_action")
+
+    def __init__(self, name, module_name, path):
+        self.name = name
+        self.module_name = module_name
+        self.path = path
+        self.stamp = None
+        self.digest = None
+        self.import_ms = 0.0
+        self.last_action = "none"
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class ModuleRegistry:
+    """
+    アプリモジュールのレジストリ。
+    ソースの mtime/size が変わり、かつ内容の hash も変わった時だけ reload します。
+    2回目以降の起動は sys.modules のモジュールをそのまま返すだけになります。
+    """
+    def __init__(self, base_dir, app_dir):
+        self.base_dir = base_dir
+        self.app_dir = app_dir
+        self._records = {}
+        self._lock = threading.RLock()
+
+    def resolve(self, name):
+        """name → (モジュール名, ソースパス)。従来の探索順 (name → app.name) を維持します。"""
+        candidates = [(name, self.base_dir), (f"app.{name}", self.app_dir)]
+        if "setting" in name:
+            candidates += [("setting", self.base_dir), ("app.setting", self.app_dir)]
+        for mod_name, folder in candidates:
+            path = os.path.join(folder, mod_name.split(".")[-1] + ".py")
+            if os.path.isfile(path):
+                return mod_name, path
+        raise AppNotFoundError(f"Module {name} not found.", name=name)
+
+    @staticmethod
+    def _digest(path):
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def load(self, name):
+        """モジュールを返す (必要な時だけ import/reload)。戻り値: (module, record)"""
+        with self._lock:
+            rec = self._records.get(name)
+            if rec is None or not os.path.isfile(rec.path):
+                rec = AppModuleRecord(name, *self.resolve(name))
+
+            st = os.stat(rec.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            mod = sys.modules.get(rec.module_name)
+            t0 = time.perf_counter()
+
+            if mod is None:
+                mod = importlib.import_module(rec.module_name)
+                rec.digest, action = self._digest(rec.path), "import"
+            elif rec.stamp is None:
+                # 他経路で既に import 済み: 現在のソースを基準として記録のみ
+                rec.digest, action = self._digest(rec.path), "adopt"
+            elif stamp != rec.stamp:
+                digest = self._digest(rec.path)
+                if digest != rec.digest:
+                    mod = importlib.reload(mod)
+                    action = "reload"
+                else:
+                    action = "cached"
+                rec.digest = digest
+            else:
+                action = "cached"
+
+            rec.stamp = stamp
+            rec.import_ms = (time.perf_counter() - t0) * 1000
+            rec.last_action = action
+            self._records[name] = rec
+            return mod, rec
+
+    def get_record(self, name):
+        with self._lock:
+            return self._records.get(name)
+
+    def forget(self, name):
+        with self._lock:
+            self._records.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            return [r.as_dict() for r in self._records.values()]
@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+import compileall
+from contextlib import contextmanager
+
+from core.logpipe import get_logger
+
+log = get_logger("prewarm")
+
+# =============================================================================
+# [BOOT PREWARM] IDLE-WINDOW APP PRELOADING + BOOT TIMING REPORT
+# =============================================================================
+
+
+class BootTimeline:
+    """ブート各ステージの所要時間を記録し、レポートを生成します (スレッドセーフ)。"""
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._open = {}
+        self._stages = []
+        self._lock = threading.Lock()
+
+    def begin(self, name):
+        with self._lock:
+            self._open[name] = time.perf_counter()
+
+    def end(self, name, note=""):
+        now = time.perf_counter()
+        with self._lock:
+            start = self._open.pop(name, None)
+        if start is not None:
+            self.add(name, start, now, note)
+
+    def add(self, name, start, end, note=""):
+        """計測済み区間 (perf_counter 値) を追加 (タイムライン生成前の import 時間など)"""
+        with self._lock:
+            self._stages.append({
+                "stage": name,
+                "start_ms": (start - self.t0) * 1000,
+                "ms": (end - start) * 1000,
+                "thread": threading.current_thread().name,
+                "note": note,
+            })
+
+    def find(self, name):
+        with self._lock:
+            return next((s for s in self._stages if s["stage"] == name), None)
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try: yield
+        finally: self.end(name)
+
+    def stages(self):
+        with self._lock:
+            return sorted(self._stages, key=lambda s: s["start_ms"])
+
+    def report(self):
+        lines = ["BOOT TIMING REPORT", f"{'STAGE':<24}{'START':>10}{'TIME':>10}  THREAD"]
+        for s in self.stages():
+            line = f"{s['stage']:<24}{s['start_ms']:>8.1f}ms{s['ms']:>8.1f}ms  {s['thread']}"
+            if s["note"]: line += f"  ({s['note']})"
+            lines.append(line)
+        with self._lock:
+            for name in self._open:
+                lines.append(f"{name:<24}{'':>10}{'...':>10}  (still running)")
+        return "\n".join(lines)
+
+
+class BootPrewarmer(threading.Thread):
+    """
+    ブート演出 (フェード) の待ち時間を使って app/ を先読みするワーカー。
+    バイトコードのコンパイル → モジュールの import → タスクバーアイコンのデコード → 設定ストアへの読込。
+    """
+    def __init__(self, app_dir, registry, icon_cache, mode, timeline, stores,
+                 icon_names=("setting", "clock"), import_modules=True, extra_tasks=()):
+        super().__init__(name="quori-prewarm", daemon=True)
+        self.app_dir = app_dir
+        self.registry = registry
+        self.icon_cache = icon_cache
+        self.mode = mode
+        self.timeline = timeline
+        self.stores = stores
+        self.icon_names = list(icon_names)
+        self.config_paths = []
+        self.import_modules = import_modules
+        self.extra_tasks = list(extra_tasks)   # [(ステージ名, callable)]
+
+        self.ready = []       # 初回クリック時に import 不要になったアプリ
+        self.failed = {}      # アプリ名 → エラー
+
+    def run(self):
+        with self.timeline.stage("prewarm.total"):
+            apps = self._scan()
+            with self.timeline.stage("prewarm.compile"):
+                for name, path in apps:
+                    compileall.compile_file(path, quiet=2)
+
+            if self.import_modules:
+                self.timeline.begin("prewarm.import")
+                for name, path in apps:
+                    try:
+                        self.registry.load(name)
+                        self.ready.append(name)
+                    except Exception as e:
+                        self.failed[name] = f"{type(e).__name__}: {e}"
+                self.timeline.end("prewarm.import", f"{len(self.ready)} ready, {len(self.failed)} failed")
+
+            with self.timeline.stage("prewarm.icons"):
+                for name in self.icon_names:
+                    try: self.icon_cache.load_image(name, (45, 45), self.mode)
+                    except Exception as e: log.warning(f"Prewarm icon {name}: {e}")
+
+            with self.timeline.stage("prewarm.configs"):
+                for path in self.config_paths:
+                    self.stores.open(path)
+
+            for stage, task in self.extra_tasks:
+                with self.timeline.stage(stage):
+                    try: task()
+                    except Exception as e: log.warning(f"Prewarm task {stage}: {e}")
+
+        for name, err in self.failed.items():
+            log.warning(f"Prewarm: {name} not preloaded ({err})")
+
+    def _scan(self):
+        with self.timeline.stage("prewarm.scan"):
+            apps = []
+            for entry in os.scandir(self.app_dir):
+                if entry.is_file() and entry.name.endswith(".py") and entry.name != "__init__.py":
+                    apps.append((entry.name[:-3], entry.path))
+                elif entry.is_dir() and entry.name == "deta":
+                    for sub in os.scandir(entry.path):
+                        if sub.name.endswith(".qcfg"): self.config_paths.append(sub.path)
+            return sorted(apps)
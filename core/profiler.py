@@ -0,0 +1,120 @@
+import os
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+from collections import Counter
+
+from core import stacks
+from core.logpipe import get_logger
+
+# =============================================================================
+# [PROFILER] cProfile AROUND invoke_app + STATISTICAL MAIN-THREAD SAMPLER
+# =============================================================================
+
+log = get_logger("profiler")
+
+
+def _func_label(filename, lineno, func):
+    if filename == "~": return func   # 組み込み関数
+    return f"{func} ({os.path.basename(filename)}:{lineno})"
+
+
+class ProfilerService:
+    """
+    カーネルのプロファイラ。qcp の `prof launch <app>` / `prof sample 10s` から使います。
+    ・launch: invoke_app (+ 初回描画) を cProfile で計測し .pstats を保存
+    ・sample: メインスレッドのスタックを一定間隔で採取し、折り畳みスタック (.folded) を保存
+    """
+    def __init__(self, core, out_dir, interval_ms=5):
+        self.core = core
+        self.out_dir = out_dir
+        self.interval = interval_ms / 1000
+        self._sampler = None
+
+    def _path(self, kind, name, ext):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.out_dir, f"prof_{kind}_{name}_{stamp}.{ext}")
+
+    # --- DETERMINISTIC ---
+    def profile_launch(self, name, top=15, **kwargs):
+        """メインスレッドから呼ぶこと。戻り値は (レポート文字列, pstats のパス)"""
+        prof = cProfile.Profile()
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            self.core.invoke_app(name, isolated=False, **kwargs)
+            self.core.root.update_idletasks()   # 初回描画までを含める
+        finally:
+            prof.disable()
+        wall = (time.perf_counter() - t0) * 1000
+        path = self._path("launch", name, "pstats")
+        prof.dump_stats(path)
+        log.info(f"Profiled launch of {name}: {wall:.1f} ms -> {os.path.basename(path)}")
+        return self.pstats_table(pstats.Stats(prof), top, f"PROFILE: launch {name} ({wall:.1f} ms wall)"), path
+
+    @staticmethod
+    def pstats_table(stats, top=15, title="PROFILE"):
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)
+        lines = [title, f"{'NCALLS':>8}{'TOT ms':>10}{'CUM ms':>10}  FUNCTION"]
+        for (filename, lineno, func), (cc, nc, tt, ct, _) in rows[:top]:
+            calls = f"{nc}/{cc}" if nc != cc else str(nc)
+            lines.append(f"{calls:>8}{tt * 1000:>10.2f}{ct * 1000:>10.2f}  {_func_label(filename, lineno, func)}")
+        return "\n".join(lines)
+
+    # --- STATISTICAL ---
+    @property
+    def sampling(self):
+        return self._sampler is not None and self._sampler.is_alive()
+
+    def sample(self, seconds, on_done, top=15):
+        """
+        seconds 秒間メインスレッドを採取 (採取はワーカースレッド)。
+        完了時に on_done(レポート文字列, .folded のパス) をワーカースレッドから呼ぶので、
+        UI への反映は呼び出し側で after 経由にしてください。失敗時も on_done(エラー文, None) で必ず呼ぶ。
+        """
+        if self.sampling:
+            raise RuntimeError("sampler already running")
+
+        def work():
+            samples = []
+            try:
+                deadline = time.monotonic() + seconds
+                while time.monotonic() < deadline:
+                    stack = stacks.sample()
+                    if stack: samples.append(stack)
+                    time.sleep(self.interval)
+                path = self._path("sample", f"{seconds:g}s", "folded")
+                with open(path, "w", encoding="utf-8") as f:
+                    for n, stack in stacks.aggregate(samples):
+                        f.write(f"{stacks.collapse(stack)} {n}\n")
+                report = self.sample_table(samples, top, f"SAMPLE: {seconds:g} s, {len(samples)} samples")
+            except Exception as e:
+                log.exception("Sampling failed")
+                on_done(f"SAMPLE FAILED after {len(samples)} samples: {e}", None)   # 待っている呼び出し側へ必ず返す
+                return
+            log.info(f"Sampled main thread for {seconds:g} s ({len(samples)} samples) -> {os.path.basename(path)}")
+            on_done(report, path)
+
+        self._sampler = threading.Thread(target=work, name="quori-sampler", daemon=True)
+        self._sampler.start()
+
+    @staticmethod
+    def sample_table(samples, top=15, title="SAMPLE"):
+        """自己 (最内フレーム) / 包含 (スタック中のどこか) の割合とアプリ別の内訳"""
+        total = max(1, len(samples))
+        self_counts, incl_counts = Counter(), Counter()
+        for stack in samples:
+            module, func, filename, lineno = stack[-1]
+            self_counts[(module, func, filename)] += 1
+            for key in {(m, f, fn) for m, f, fn, _ in stack}:
+                incl_counts[key] += 1
+        owners = Counter(stacks.owner_of_stack(s) for s in samples)
+        lines = [title, "BY APP: " + ", ".join(f"{k} {n * 100 / total:.0f}%" for k, n in owners.most_common()),
+                 f"{'SELF %':>8}{'TOTAL %':>9}  FUNCTION"]
+        for key, n in self_counts.most_common(top):
+            module, func, filename = key
+            lines.append(f"{n * 100 / total:>7.1f}%{incl_counts[key] * 100 / total:>8.1f}%  {func} [{module}] {os.path.basename(filename)}")
+        return "\n".join(lines)
@@ -0,0 +1,141 @@
+import time
+import tkinter as tk
+from collections import OrderedDict
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [DESKTOP SESSION] PER-USER DESKTOP LAYER, BUILT ONCE AND HIDDEN ON LOCK
+# =============================================================================
+
+log = get_logger("session")
+
+
+class DesktopSession:
+    """
+    1ユーザー分のデスクトップ (セッションラベル・タスクバー・固定アイコン)。
+    ルート直下の1枚のレイヤーにまとめ、ロック/スリープ時は破棄せず place_forget() で隠すだけ。
+    """
+    def __init__(self, core, user, accent):
+        self.core = core
+        self.user = user
+        self.key = session_key(user)
+        self.accent = accent
+        self.signature = (core.system_mode, accent, user.get("name"))
+        self.images = {}
+        self.taskbar_buttons = {}
+        self.last_active = 0.0
+        self.build_ms = 0.0
+        self._build()
+
+    def _build(self):
+        t0 = time.perf_counter()
+        core, acc = self.core, self.accent
+        self.layer = tk.Frame(core.root, bg="black")
+
+        self.label = tk.Label(self.layer, text=f"SESSION: {self.user['name'].upper()}",
+                              fg=acc, bg="black", font=("Consolas", 52, "bold"))
+        self.label.place(relx=0.5, rely=0.5, anchor="center")
+
+        self.bar = tk.Frame(self.layer, bg="#050505", height=90)
+        self.bar.pack(side="bottom", fill="x")
+
+        # [PWR]ボタンを先にパッキング（右端を死守）
+        tk.Button(self.bar, text=" [PWR] ", fg="white", bg="#aa0000", relief="flat",
+                  font=("Consolas", 12, "bold"), padx=25, command=core.show_power_menu).pack(side="right", padx=30, pady=10)
+
+        # 固定アイコン（設定・時計）
+        self.images["setting"] = core.get_icon("setting")
+        tk.Button(self.bar, image=self.images["setting"], bg="#050505", bd=0,
+                  command=lambda: core.invoke_app("setting")).pack(side="left", padx=10, pady=5)
+
+        self.images["clock"] = core.get_icon("clock")
+        tk.Button(self.bar, image=self.images["clock"], bg="#050505", bd=0,
+                  command=lambda: core.invoke_app("clock")).pack(side="left", padx=5, pady=5)
+
+        # 動的アプリエリア
+        self.app_strip = tk.Frame(self.bar, bg="#050505")
+        self.app_strip.pack(side="left", fill="both", expand=True, padx=10)
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    def show(self):
+        self.layer.place(x=0, y=0, relwidth=1, relheight=1)
+        self.layer.lower()   # デスクトップ拡張のアイコン等はレイヤーの上に残す
+        self.last_active = time.monotonic()
+
+    def hide(self):
+        self.layer.place_forget()
+
+    def retheme(self, mode, accent):
+        """色はテーマ側がその場で塗り替え済み。作り直し判定用の署名だけ合わせる"""
+        self.accent = accent
+        self.signature = (mode, accent, self.user.get("name"))
+
+    def alive(self):
+        try:
+            return bool(self.layer.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def destroy(self):
+        if self.alive(): self.layer.destroy()
+        # カーネル側が同じ dict を参照しているので作り直さずに空にする
+        self.images.clear()
+        self.taskbar_buttons.clear()
+
+
+def session_key(user):
+    """ユーザーディレクトリの id (名前を変えても同じセッション)。id の無い旧形式は名前"""
+    return user.get("id") or user.get("name", "").lower()
+
+
+class SessionCache:
+    """ユーザー毎の DesktopSession を最大 capacity 件保持 (LRU)。高速ユーザー切替用。"""
+    def __init__(self, core, capacity=4):
+        self.core = core
+        self.capacity = capacity
+        self._sessions = OrderedDict()
+        self.active = None
+
+    def acquire(self, user, accent):
+        """user のセッションを返す (未構築・設定変更時のみ構築)。戻り値は (session, built)"""
+        key = session_key(user)
+        session = self._sessions.get(key)
+        if session and (not session.alive() or session.signature != (self.core.system_mode, accent, user.get("name"))):
+            self.discard(key)
+            session = None
+        if session:
+            session.user = user
+            self._sessions.move_to_end(key)
+            return session, False
+        session = DesktopSession(self.core, user, accent)
+        self._sessions[key] = session
+        while len(self._sessions) > self.capacity:
+            # 表示中と今作ったものは残し、それ以外で最も古いものから追い出す
+            old_key = next((k for k, s in self._sessions.items() if s is not self.active and s is not session), None)
+            if old_key is None: break
+            self.discard(old_key)
+            log.info(f"Session for {old_key} evicted.")
+        return session, True
+
+    def activate(self, session):
+        for other in self._sessions.values():
+            if other is not session: other.hide()
+        session.show()
+        self.active = session
+
+    def deactivate(self):
+        if self.active: self.active.hide()
+
+    def discard(self, key):
+        session = self._sessions.pop(key, None)
+        if session:
+            if session is self.active: self.active = None
+            session.destroy()
+
+    def clear(self):
+        for key in list(self._sessions):
+            self.discard(key)
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,70 @@
+import sys
+import threading
+from collections import Counter
+
+# =============================================================================
+# [STACKS] THREAD STACK CAPTURE + APP ATTRIBUTION (WATCHDOG / PROFILER)
+# =============================================================================
+
+
+def thread_frame(ident=None):
+    """指定スレッド (省略時はメインスレッド) の現在のフレーム"""
+    ident = threading.main_thread().ident if ident is None else ident
+    return sys._current_frames().get(ident)
+
+
+def extract(frame, limit=64):
+    """フレーム → [(module, func, filename, lineno)] (外側 → 内側の順)"""
+    stack = []
+    while frame is not None and len(stack) < limit:
+        code = frame.f_code
+        stack.append((frame.f_globals.get("__name__", "?"), code.co_name, code.co_filename, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample(ident=None, limit=64):
+    frame = thread_frame(ident)
+    return extract(frame, limit) if frame is not None else []
+
+
+def module_owner(module):
+    """モジュール名 → アプリ名 (app.clock → clock / カーネル側は kernel)"""
+    if module.startswith("app."): return module[4:]
+    if module in ("__main__", "boost", "setting") or module.startswith("core."): return "kernel"
+    return None
+
+
+def owner_of_stack(stack):
+    """最も内側のアプリのフレームを持ち主とする (無ければカーネル / それも無ければ最内フレーム)"""
+    fallback = None
+    for module, _, _, _ in reversed(stack):
+        owner = module_owner(module)
+        if owner and owner != "kernel": return owner
+        if owner and fallback is None: fallback = owner
+    if fallback: return fallback
+    return stack[-1][0] if stack else "?"
+
+
+def culprit_frame(stack, owner):
+    """持ち主のモジュール内で最も内側のフレーム (レポートの見出し用)"""
+    for frame in reversed(stack):
+        if module_owner(frame[0]) == owner or frame[0] == owner: return frame
+    return stack[-1] if stack else None
+
+
+def collapse(stack):
+    """flamegraph.pl / speedscope 用の折り畳み形式 "mod:func;mod:func" """
+    return ";".join(f"{module}:{func}" for module, func, _, _ in stack)
+
+
+def aggregate(samples):
+    """同一スタックをまとめて (回数, スタック) の多い順"""
+    counts = Counter(tuple(s) for s in samples if s)
+    return [(n, list(stack)) for stack, n in counts.most_common()]
+
+
+def format_stack(stack, indent="    "):
+    return "\n".join(f'{indent}File "{filename}", line {lineno}, in {func}  [{module}]'
+                     for module, func, filename, lineno in stack)
@@ -0,0 +1,203 @@
+import os
+import time
+import threading
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [STORAGE STATS] BACKGROUND RECURSIVE SCAN OF app/ WITH PER-APP BREAKDOWN
+# =============================================================================
+
+log = get_logger("storage")
+
+CATEGORIES = ("code", "icons", "data", "caches")
+SHARED = "(shared)"
+
+
+def _empty():
+    return dict.fromkeys(CATEGORIES, 0) | {"files": 0}
+
+
+def _match_app(name, apps):
+    """ファイル名の先頭がアプリ名 (+ 区切り) なら、その中で最長のアプリ名"""
+    stem = name.lower()
+    best = None
+    for app in apps:
+        a = app.lower()
+        if stem == a or (stem.startswith(a) and not stem[len(a)].isalnum()):
+            if best is None or len(app) > len(best): best = app
+    return best
+
+
+def classify(rel_parts, apps):
+    """app/ からの相対パス → (アプリ名, 分類)"""
+    name = rel_parts[-1]
+    if len(rel_parts) == 1:
+        if name.endswith(".py"): return name[:-3], "code"
+        return _match_app(name, apps) or SHARED, "data"
+    top = rel_parts[0]
+    if top == "__appdeta__":
+        stem = os.path.splitext(name)[0]
+        if stem.endswith("_logo"): stem = stem[:-5]
+        return (stem if stem in apps else _match_app(stem, apps)) or SHARED, "icons"
+    if top == "__pycache__":
+        return _match_app(name.split(".", 1)[0], apps) or SHARED, "caches"
+    if top == "deta":
+        return _match_app(name, apps) or SHARED, "data"
+    return (top if top in apps else _match_app(top, apps)) or SHARED, "data"
+
+
+class StorageStats:
+    """
+    app/ 以下 (__appdeta__ / deta / __pycache__ / サブディレクトリ含む) を
+    ワーカースレッドで scandir 再帰走査し、アプリ別・分類別の合計をキャッシュします。
+    ・読み出し (snapshot) は常にキャッシュから即座に返す
+    ・AppIndex の差分 (apply_delta) でコードのサイズだけ即時補正し、全体の再走査は間引いて裏で行う
+    """
+    def __init__(self, app_dir, min_interval=5.0):
+        self.app_dir = app_dir
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._files = {}   # 相対パス → (size, app, category)
+        self._totals = {}
+        self._scanned_at = 0.0
+        self.scan_ms = 0.0
+        self._thread = None
+        self._timer = None
+        self._pending = False   # 間引かれた再走査が残っているか
+        self._subscribers = []
+
+    # --- SCAN (worker) ---
+    def _walk(self):
+        apps = {e.name[:-3] for e in os.scandir(self.app_dir) if e.is_file() and e.name.endswith(".py")}
+        apps.add("setting")   # 設定アプリ本体はルート直下 (アイコンは __appdeta__)
+        files = {}
+        stack = [(self.app_dir, ())]
+        while stack:
+            path, rel = stack.pop()
+            try:
+                it = os.scandir(path)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    parts = rel + (entry.name,)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, parts))
+                        elif entry.is_file(follow_symlinks=False):
+                            app, category = classify(parts, apps)
+                            files["/".join(parts)] = (entry.stat().st_size, app, category)
+                    except OSError:
+                        continue
+        return files
+
+    @staticmethod
+    def _aggregate(files):
+        totals = {}
+        for size, app, category in files.values():
+            t = totals.get(app)
+            if t is None: t = totals[app] = _empty()
+            t[category] += size
+            t["files"] += 1
+        return totals
+
+    def scan(self):
+        t0 = time.perf_counter()
+        files = self._walk()
+        totals = self._aggregate(files)
+        with self._lock:
+            changed = totals != self._totals
+            self._files, self._totals = files, totals
+            self._scanned_at = time.time()
+            self.scan_ms = (time.perf_counter() - t0) * 1000
+        if changed: self._notify()
+        return self.snapshot()
+
+    def refresh_async(self, force=False):
+        """前回走査から min_interval 経っていれば裏で再走査 (走査中なら何もしない)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive(): return False
+            if not force and time.time() - self._scanned_at < self.min_interval: return False
+            self._pending = False
+            self._thread = threading.Thread(target=self._scan_safe, name="quori-storage-scan", daemon=True)
+            self._thread.start()
+            return True
+
+    def _refresh_later(self):
+        """再走査を頼む。間引かれたら min_interval が空いた時点で改めて走らせる"""
+        if self.refresh_async(): return
+        with self._lock:
+            self._pending = True
+            if self._timer: return
+            busy = self._thread and self._thread.is_alive()
+            wait = self.min_interval if busy else self._scanned_at + self.min_interval - time.time()
+            self._timer = threading.Timer(max(wait, 0.05), self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            if not self._pending: return   # 間に他の走査が走った
+        self._refresh_later()
+
+    def _scan_safe(self):
+        try:
+            self.scan()
+        except Exception:
+            log.exception("Storage scan failed")
+
+    # --- INCREMENTAL ---
+    def apply_delta(self, delta):
+        """AppIndex の差分: 追加/変更/削除された .py のサイズを即時反映"""
+        with self._lock:
+            if not self._scanned_at: return
+            for entry in delta.removed:
+                rec = self._files.pop(f"{entry.name}.py", None)
+                if rec: self._adjust(rec, -1)
+            for entry in list(delta.added) + list(delta.changed):
+                key = f"{entry.name}.py"
+                old = self._files.get(key)
+                if old: self._adjust(old, -1)
+                rec = (entry.size, entry.name, "code")
+                self._files[key] = rec
+                self._adjust(rec, +1)
+        self._notify()
+        # アイコン/データ等の付随ファイルは裏で取り直す (min_interval で間引き、間引いた分は後で走らせる。コードの分は上で反映済み)
+        self._refresh_later()
+
+    def _adjust(self, rec, sign):
+        size, app, category = rec
+        t = self._totals.setdefault(app, _empty())
+        t[category] += sign * size
+        t["files"] += sign
+        if t["files"] <= 0: self._totals.pop(app, None)
+
+    # --- READ ---
+    def snapshot(self):
+        with self._lock:
+            apps = {k: dict(v) for k, v in self._totals.items()}
+            scanned_at, scan_ms = self._scanned_at, self.scan_ms
+        total = _empty()
+        for t in apps.values():
+            for k in total: total[k] += t[k]
+        installed = sum(1 for app, t in apps.items() if t["code"] and app != SHARED)
+        return {"apps": apps, "total": total, "installed": installed,
+                "scanned_at": scanned_at, "scan_ms": scan_ms, "ready": bool(scanned_at)}
+
+    def subscribe(self, callback):
+        """callback(snapshot) は走査したスレッドから呼ばれる (UI 反映は after 経由で)"""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers: self._subscribers.remove(callback)
+
+    def _notify(self):
+        snap = self.snapshot()
+        for callback in list(self._subscribers):
+            try:
+                callback(snap)
+            except Exception:
+                log.exception("Storage subscriber failed")
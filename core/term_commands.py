@@ -0,0 +1,397 @@
+import os
+import time
+import shlex
+import threading
+
+# =============================================================================
+# [TERMINAL COMMANDS] PLUGGABLE COMMAND REGISTRY + PIPELINES + PREFIX-TRIE COMPLETION
+# =============================================================================
+
+PENDING = object()   # ハンドラの戻り値: 処理は裏で続き、終わったら shell.finish() を呼ぶ
+
+
+class CommandError(Exception):
+    """ハンドラが使い方の誤り等を報告する (メッセージを赤で出して終了ステータス 1)"""
+
+
+class Command:
+    def __init__(self, name, handler, usage="", help="", complete=None, aliases=(), prefix=False, stream=None):
+        self.name = name
+        self.handler = handler     # None ならパイプライン専用 (stream だけで動く)
+        self.stream = stream       # stream(shell, args, upstream) → 行/レコードのイテレータ (先頭の段は upstream=None)
+        self.usage = usage or name
+        self.help = help
+        self.complete = complete   # 引数の補完: "path" / "app" / 関数(shell, args, word) / None
+        self.aliases = tuple(aliases)
+        self.prefix = prefix       # "WIN:" のように空白無しで引数が続く
+
+
+class CommandRegistry:
+    """
+    qcp のコマンド表。ハンドラは handler(shell, args) で、shell は端末 (Tk) でもスクリプト実行器でもよい。
+    shell に求めるもの: write(text, color, is_bold) / post(...) / finish(status) / cancel / throttle() / current_dir / os_core
+    戻り値: None か 0 = 成功、整数 = 終了ステータス、PENDING = 非同期 (後で shell.finish)
+    stream を持つコマンドは "ls -R | grep .qtf | head 20 > hits.txt" のように繋げられる (リダイレクト先は data_dir 以下)
+    """
+    def __init__(self, data_dir=None):
+        self._commands = {}
+        self._prefixes = []
+        self.trie = PrefixTrie()
+        self.data_dir = data_dir
+
+    def register(self, name, handler, **kwargs):
+        cmd = Command(name, handler, **kwargs)
+        for key in (name,) + cmd.aliases:
+            self._commands[key.lower()] = cmd
+            self.trie.insert(key.lower(), key)
+        if cmd.prefix: self._prefixes.append(cmd)
+        return cmd
+
+    def command(self, name, **kwargs):
+        """デコレータ版 register"""
+        def deco(func):
+            self.register(name, func, **kwargs)
+            return func
+        return deco
+
+    def pipe(self, name, **kwargs):
+        """デコレータ: パイプライン専用コマンド (grep/head 等。関数がそのまま stream になる)"""
+        def deco(func):
+            self.register(name, None, stream=func, **kwargs)
+            return func
+        return deco
+
+    def get(self, name):
+        return self._commands.get(name.lower())
+
+    def commands(self):
+        """別名を除いた登録順"""
+        seen = []
+        for cmd in self._commands.values():
+            if cmd not in seen: seen.append(cmd)
+        return seen
+
+    def parse(self, line):
+        """行 → (Command または None, コマンド名, 引数文字列)"""
+        line = line.strip()
+        for cmd in self._prefixes:
+            if line.lower().startswith(cmd.name.lower()):
+                return cmd, cmd.name, line[len(cmd.name):].strip()
+        name, _, args = line.partition(" ")
+        return self.get(name), name, args.strip()
+
+    def dispatch(self, shell, line):
+        """1行を実行。同期コマンドはここで shell.finish(status) まで行う"""
+        cmd, name, args = self.parse(line)
+        if cmd is not None and cmd.prefix:   # WIN: の | や > はホストのシェルに任せる
+            pass
+        elif cmd is None or cmd.handler is None or "|" in line or ">" in line:
+            try:
+                stages, redirect = split_pipeline(line)
+            except CommandError as e:
+                shell.write(f"{e}\n", "orange")
+                return shell.finish(1)
+            if cmd is None or cmd.handler is None or len(stages) > 1 or redirect:
+                return self.run_pipeline(shell, stages, redirect)
+        if cmd is None:
+            shell.write(f"Command '{line}' not found.\n", "red")
+            return shell.finish(127)
+        try:
+            result = cmd.handler(shell, args)
+        except CommandError as e:
+            shell.write(f"{e}\n", "orange")
+            return shell.finish(1)
+        except Exception as e:
+            shell.write(f"{name}: {e}\n", "red")
+            return shell.finish(1)
+        if result is PENDING: return PENDING
+        return shell.finish(result or 0)
+
+    # --- PIPELINES ---
+    def redirect_path(self, target):
+        """リダイレクト先 → data_dir 以下の絶対パス (外へ出る指定は拒否)"""
+        if not self.data_dir: raise CommandError("Redirection is not available.")
+        root = os.path.abspath(self.data_dir)
+        path = os.path.normpath(os.path.join(root, target))
+        if not path.startswith(root + os.sep): raise CommandError(f"Redirect target must be inside {os.path.basename(root)}/: {target}")
+        return path
+
+    def run_pipeline(self, shell, stages, redirect=None):
+        """
+        段を繋いだジェネレータの連鎖をワーカーで最後まで引く (引いた分しか上流は動かない)。
+        head 等で下流が止まれば上流の走査もそこで止まる。引数の誤りは繋ぐ時点 (呼び出し側のスレッド) で報告
+        """
+        chain, items, name = [], None, "pipeline"
+        try:
+            for stage in stages:
+                cmd, name, args = self.parse(stage)
+                if cmd is None:
+                    shell.write(f"Command '{stage}' not found.\n", "red")
+                    return shell.finish(127)
+                if cmd.stream is None: raise CommandError(f"{name}: cannot be used in a pipeline")
+                items = _guarded(shell, cmd.stream(shell, args, items))
+                chain.append(items)
+            path = self.redirect_path(redirect[1]) if redirect else None
+        except CommandError as e:
+            shell.write(f"{e}\n", "orange")
+            return shell.finish(1)
+        except Exception as e:
+            shell.write(f"{name}: {e}\n", "red")
+            return shell.finish(1)
+
+        def worker():
+            status = 0
+            try:
+                if path:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, redirect[0], encoding="utf-8") as f:
+                        count = 0
+                        for item in items:
+                            f.write(f"{item}\n")
+                            count += 1
+                    shell.post(f"-- {count} line(s) written to {os.path.relpath(path, self.data_dir)} --\n", "#888888")
+                else:
+                    stream_lines(shell, map(str, items))
+                if shell.cancel.is_set(): status = 130
+            except CommandError as e:
+                shell.post(f"{e}\n", "orange")
+                status = 1
+            except Exception as e:
+                shell.post(f"pipeline: {e}\n", "red")
+                status = 1
+            finally:
+                for it in reversed(chain): it.close()   # 途中で止めた上流 (ディレクトリ走査等) を閉じる
+            shell.finish(status)
+        threading.Thread(target=worker, name="qcp-pipe", daemon=True).start()
+        return PENDING
+
+
+def split_pipeline(line):
+    """行 → ([段, ...], (モード "w"/"a", パス) または None)。引用符の中の | と > は区切りにしない"""
+    stages, quote, start = [], None, 0
+    redirect = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote: quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "|":
+            stages.append(line[start:i].strip())
+            start = i + 1
+        elif ch == ">":
+            mode = "a" if line.startswith(">>", i) else "w"
+            target = split_args(line[i + (2 if mode == "a" else 1):])
+            if len(target) != 1 or any(c in target[0] for c in "|>"):
+                raise CommandError("Syntax error: redirection needs one file name at the end (> file / >> file)")
+            redirect = (mode, target[0])
+            line = line[:i]
+            break
+    stages.append(line[start:].strip())
+    if quote: raise CommandError("Syntax error: unterminated quote")
+    if not all(stages): raise CommandError("Syntax error: empty pipeline stage")
+    return stages, redirect
+
+
+def split_args(args):
+    """引数を空白で分割。\\ はそのまま残し (Windows のパス)、語全体を囲む引用符だけ外す"""
+    try:
+        tokens = shlex.split(args, posix=False)
+    except ValueError as e:
+        raise CommandError(f"Syntax error: {e}")
+    return [t[1:-1] if len(t) >= 2 and t[0] == t[-1] and t[0] in "'\"" else t for t in tokens]
+
+
+def _guarded(shell, items):
+    """各段の出力を包む: Ctrl+C で止まり、閉じられたら段のイテレータも閉じる"""
+    cancel = shell.cancel
+    try:
+        for item in items:
+            if cancel.is_set(): return
+            yield item
+    finally:
+        close = getattr(items, "close", None)
+        if close: close()
+
+
+def item_text(item):
+    """grep/sort が見る文字列 (レコードは text 属性、無ければ表示形)"""
+    return item if isinstance(item, str) else getattr(item, "text", None) or str(item)
+
+
+def stream_lines(shell, lines, chunk=500, interval=0.05):
+    """
+    ワーカー用: 行を chunk 行ずつ (または interval 秒毎に) まとめて shell.post へ流す。
+    端末が詰まっていれば待ち、Ctrl+C されたら途中で止める。流した行数を返す
+    """
+    buf, count, last = [], 0, time.monotonic()
+    for line in lines:
+        if shell.cancel.is_set(): break
+        buf.append(line)
+        count += 1
+        if len(buf) >= chunk or time.monotonic() - last > interval:
+            shell.post("\n".join(buf) + "\n")
+            buf, last = [], time.monotonic()
+            shell.throttle()
+    if buf: shell.post("\n".join(buf) + "\n")
+    return count
+
+
+class PrefixTrie:
+    """
+    小文字キーの接頭辞木 (辺に文字列を持つ圧縮版 = radix tree。数万件でもノード数は件数の2倍程度)。
+    値は元の表記 (大文字小文字を保った名前)。ノードは [辺のラベル, 値, {先頭文字: 子}]
+    """
+    __slots__ = ("root", "size")
+
+    def __init__(self, words=()):
+        self.root = ["", None, {}]
+        self.size = 0
+        for word in words: self.insert(word.lower(), word)
+
+    def insert(self, key, value=None):
+        value = key if value is None else value
+        node, i = self.root, 0
+        while True:
+            if i == len(key):
+                if node[1] is None: self.size += 1
+                node[1] = value
+                return
+            child = node[2].get(key[i])
+            if child is None:
+                node[2][key[i]] = [key[i:], value, {}]
+                self.size += 1
+                return
+            label = child[0]
+            n = 0
+            while n < len(label) and i + n < len(key) and label[n] == key[i + n]: n += 1
+            if n < len(label):   # 辺の途中で分岐 → 辺を分割
+                mid = [label[:n], None, {label[n]: child}]
+                child[0] = label[n:]
+                node[2][key[i]] = mid
+                child = mid
+            node, i = child, i + n
+
+    def _find(self, prefix):
+        """prefix 以下の部分木の根 (prefix が辺の途中で終わればその子)"""
+        node, i = self.root, 0
+        while i < len(prefix):
+            child = node[2].get(prefix[i])
+            if child is None: return None
+            label = child[0]
+            rest = prefix[i:i + len(label)]
+            if not label.startswith(rest): return None
+            node, i = child, i + len(label)
+        return node
+
+    def complete(self, prefix, limit=200):
+        """prefix で始まる値を辞書順で最大 limit 件"""
+        node = self._find(prefix.lower())
+        if node is None: return []
+        out, stack = [], [node]
+        while stack and len(out) < limit:
+            node = stack.pop()
+            if node[1] is not None: out.append(node[1])
+            stack.extend(node[2][ch] for ch in sorted(node[2], reverse=True))
+        return out
+
+    def __contains__(self, key):
+        key = key.lower()
+        node, i = self.root, 0
+        while i < len(key):
+            node = node[2].get(key[i])
+            if node is None or not key.startswith(node[0], i): return False
+            i += len(node[0])
+        return node[1] is not None
+
+    def __len__(self):
+        return self.size
+
+
+class DirectoryCache:
+    """ディレクトリ → (mtime, 名前の接頭辞木, ディレクトリ名の集合)。mtime が変わった時だけ scandir し直す"""
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def entries(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, set()
+        with self._lock:
+            hit = self._cache.get(path)
+            if hit and hit[0] == mtime: return hit[1], hit[2]
+        trie, dirs = PrefixTrie(), set()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    trie.insert(entry.name.lower(), entry.name)
+                    try:
+                        if entry.is_dir(): dirs.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return None, set()
+        with self._lock:
+            if len(self._cache) >= self.capacity: self._cache.pop(next(iter(self._cache)))
+            self._cache[path] = (mtime, trie, dirs)
+        return trie, dirs
+
+
+    def prefetch(self, path):
+        """cd 直後等に裏で一覧を作っておく (初回の Tab でも待たせない)"""
+        threading.Thread(target=self.entries, args=(path,), name="qcp-dircache", daemon=True).start()
+
+
+def common_prefix(words):
+    if not words: return ""
+    first, last = min(words, key=str.lower), max(words, key=str.lower)
+    n = 0
+    while n < min(len(first), len(last)) and first[n].lower() == last[n].lower(): n += 1
+    return first[:n]
+
+
+class Completer:
+    """
+    入力行 → 補完候補。1語目はコマンド名、以降はコマンドの complete 指定 (パス/アプリ名) に従う。
+    戻り値は (置き換える語の開始位置, 候補のリスト)。候補は置き換え後の語そのもの。
+    """
+    def __init__(self, registry, app_names=None, dirs=None):
+        self.registry = registry
+        self.app_names = app_names or (lambda: [])
+        self.dirs = dirs or DirectoryCache()
+        self._apps = (None, PrefixTrie())
+
+    def complete(self, shell, line):
+        cmd = self.registry.parse(line)[0]
+        if "|" in line and not (cmd and cmd.prefix):   # パイプの後ろは新しいコマンドとして補完
+            offset = line.rfind("|") + 1
+            start, candidates = self.complete(shell, line[offset:])
+            return offset + start, candidates
+        start = max(line.rfind(" "), line.rfind("\t")) + 1
+        word = line[start:]
+        if not line[:start].strip():
+            cmds = [c for c in self.registry.trie.complete(word) if not self.registry.get(c).prefix]
+            return start, [c + " " for c in cmds]
+        cmd, _, args = self.registry.parse(line)
+        kind = cmd.complete if cmd else None
+        if kind == "path": return start, self.complete_path(shell.current_dir, word)
+        if kind == "app": return start, [n + " " for n in self.app_trie().complete(word)]
+        if callable(kind): return start, kind(shell, line[:start].split(), word)   # (shell, 手前の語, 補完中の語)
+        return start, []
+
+    def app_trie(self):
+        names = tuple(self.app_names())
+        if names != self._apps[0]: self._apps = (names, PrefixTrie(names))
+        return self._apps[1]
+
+    def complete_path(self, cwd, word):
+        head, sep, base = word.replace("\\", "/").rpartition("/")
+        parent = os.path.normpath(os.path.join(cwd, (head or "/") if sep else "."))
+        trie, dirs = self.dirs.entries(parent)
+        if trie is None: return []
+        prefix = word[:len(word) - len(base)]
+        hidden = base.startswith(".")
+        return [prefix + name + (os.sep if name in dirs else "")
+                for name in trie.complete(base) if hidden or not name.startswith(".")]
@@ -0,0 +1,108 @@
+import os
+import fnmatch
+import datetime
+from collections import namedtuple
+
+# =============================================================================
+# [TERMINAL FS] LAZY scandir WALK FOR qcp ls (TYPE INFO FROM DirEntry, NO EXTRA STAT)
+# =============================================================================
+
+GLOB_CHARS = "*?["
+
+class FileRecord(namedtuple("FileRecord", "path name is_dir size mtime long root", defaults=(False, None))):
+    """
+    path は起点 (root) からの相対パス。size / mtime は stat が必要な時 (-l / -S / -t) だけ埋まる。
+    str() は ls の1行 (long なら -l 形式)、text はパイプの grep/sort が見るパス
+    """
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return self.path
+
+    def with_stat(self):
+        """size / mtime を埋めたレコード (sort -k size 等が後から必要とした時用。取れなければそのまま)"""
+        if self.mtime is not None or self.root is None: return self
+        try:
+            st = os.stat(os.path.join(self.root, self.path))
+        except OSError:
+            return self
+        return self._replace(size=None if self.is_dir else st.st_size, mtime=st.st_mtime)
+
+    def __str__(self):
+        return format_record(self, self.long)
+
+
+SORT_KEYS = {
+    "name": lambda r: (r.name.lower(), r.name),
+    "size": lambda r: -(r.size or 0),
+    "time": lambda r: -(r.mtime or 0),
+}
+
+
+def split_target(cwd, arg):
+    """ls の引数 → (ディレクトリ, glob パターン)。"app/*.py" のような指定も分解する"""
+    if not arg: return cwd, None
+    if any(c in arg for c in GLOB_CHARS):
+        head, pattern = os.path.split(arg)
+        return os.path.normpath(os.path.join(cwd, head)), pattern
+    return os.path.normpath(os.path.join(cwd, arg)), None
+
+
+def _record(entry, rel, need_stat, long=False, root=None):
+    """DirEntry → (FileRecord, 辿ってよいか)。シンボリックリンク先のディレクトリは表示するが辿らない (循環防止)"""
+    try:
+        is_dir = entry.is_dir()   # DirEntry が持つ型情報 (Windows/多くの Linux FS では stat 不要)
+        descend = is_dir and not entry.is_symlink()
+    except OSError:
+        is_dir = descend = False
+    size = mtime = None
+    if need_stat:
+        try:
+            st = entry.stat()
+            size, mtime = (None if is_dir else st.st_size), st.st_mtime
+        except OSError:
+            pass
+    return FileRecord(rel, entry.name, is_dir, size, mtime, long, root), descend
+
+
+def walk(root, recursive=False, pattern=None, show_hidden=False, sort="name", reverse=False,
+         need_stat=False, long=False, errors=None):
+    """
+    root 以下の FileRecord を順に返すジェネレータ (呼び出し側が止めればその場で走査も止まる)。
+    ・並べ替えはディレクトリ単位。sort=None なら scandir の順のまま1件ずつ返す (巨大ディレクトリでも即座に出始める)
+    ・recursive は ls -R と同じく「ディレクトリ毎のまとまり」で深さ優先
+    ・pattern (fnmatch) は名前に対して。再帰時もディレクトリ自体は辿る
+    ・読めないディレクトリは errors (list) に (パス, 例外) を積んで続行
+    ・long=True のレコードは str() が -l 形式になる (stat も取る)
+    """
+    need_stat = need_stat or long or sort in ("size", "time")
+    key = SORT_KEYS.get(sort) if sort else None
+    pattern = pattern.lower() if pattern else None
+    stack = [("", root)]
+    while stack:
+        rel_dir, path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError as e:
+            if errors is not None: errors.append((path, e))
+            continue
+        with it:
+            items = (_record(e, os.path.join(rel_dir, e.name) if rel_dir else e.name, need_stat, long, root)
+                     for e in it if show_hidden or not e.name.startswith("."))
+            if key: items = sorted(items, key=lambda item: key(item[0]), reverse=reverse)
+            subdirs = []
+            for rec, descend in items:
+                if pattern is None or fnmatch.fnmatch(rec.name.lower(), pattern):
+                    yield rec
+                if recursive and descend:
+                    subdirs.append((rec.path, os.path.join(root, rec.path)))
+        stack.extend(reversed(subdirs))   # 並べた順に辿る
+
+
+def format_record(rec, long=False):
+    if not long:
+        return f" {'<DIR>' if rec.is_dir else '     '}  {rec.path}"
+    size = "" if rec.size is None else f"{rec.size:,}"
+    stamp = datetime.datetime.fromtimestamp(rec.mtime).strftime("%Y-%m-%d %H:%M") if rec.mtime else " " * 16
+    return f" {'<DIR>' if rec.is_dir else '     '} {size:>14}  {stamp}  {rec.path}"
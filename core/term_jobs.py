@@ -0,0 +1,162 @@
+import os
+import time
+import codecs
+import locale
+import signal
+import threading
+import itertools
+import subprocess
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [TERMINAL JOBS] STREAMING, CANCELLABLE HOST COMMANDS WITH BACKPRESSURE
+# =============================================================================
+
+log = get_logger("term.jobs")
+
+READ_SIZE = 8192
+
+
+class HostJob:
+    """1つのホストコマンド (シェル経由) とその読み取りスレッド"""
+    def __init__(self, job_id, command, cwd, foreground):
+        self.id = job_id
+        self.command = command
+        self.cwd = cwd
+        self.foreground = foreground
+        self.proc = None
+        self.state = "running"   # running / done / killed / failed
+        self.returncode = None
+        self.started = time.monotonic()
+        self.ended = None
+        self.bytes_out = 0
+        self.cancelled = threading.Event()
+        self._readers = []
+
+    @property
+    def elapsed(self):
+        return (self.ended or time.monotonic()) - self.started
+
+    def describe(self):
+        mark = "+" if self.foreground else " "
+        status = self.state.upper() if self.returncode is None else f"{self.state.upper()} ({self.returncode})"
+        return f"[{self.id}]{mark} {status:<14}{self.elapsed:>8.1f}s  {self.command}"
+
+
+class JobManager:
+    """
+    ホストコマンドを Popen で起動し、stdout/stderr をそれぞれの読み取りスレッドから少しずつ sink へ流します。
+    ・sink(job, text, is_err) は読み取りスレッドから呼ばれる
+    ・backlog() (= 端末の未描画量) が high_water を超えている間は読むのを止める
+      → パイプが詰まり、子プロセス側が書き込みで待つ (大量出力でもメモリは増えない)
+    ・kill はプロセスグループごと (シェルの子孫も残さない)
+    ・on_exit(job) は終了時に監視スレッドから呼ばれる
+    """
+    def __init__(self, sink, on_exit=None, backlog=None, high_water=256 * 1024, encoding=None):
+        self.sink = sink
+        self.on_exit = on_exit
+        self.backlog = backlog or (lambda: 0)
+        self.high_water = high_water
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # --- START ---
+    def start(self, command, cwd, foreground=True):
+        job = HostJob(next(self._ids), command, cwd, foreground)
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True   # 新しいプロセスグループ (killpg 用)
+        job.proc = subprocess.Popen(command, shell=True, cwd=cwd, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0, **kwargs)
+        with self._lock:
+            self.jobs[job.id] = job
+        for pipe, is_err in ((job.proc.stdout, False), (job.proc.stderr, True)):
+            t = threading.Thread(target=self._read, args=(job, pipe, is_err), name=f"qcp-job{job.id}-{'err' if is_err else 'out'}", daemon=True)
+            t.start()
+            job._readers.append(t)
+        threading.Thread(target=self._wait, args=(job,), name=f"qcp-job{job.id}-wait", daemon=True).start()
+        log.info(f"Job [{job.id}] started (pid {job.proc.pid}): {command}")
+        return job
+
+    # --- WORKERS ---
+    def _read(self, job, pipe, is_err):
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        try:
+            while True:
+                chunk = pipe.read(READ_SIZE)   # 届いた分だけ返る (bufsize=0)
+                if not chunk: break
+                job.bytes_out += len(chunk)
+                text = decoder.decode(chunk)
+                # 端末が追いつくまで待つ (この間パイプは読まれない)
+                while self.backlog() > self.high_water and not job.cancelled.is_set():
+                    time.sleep(0.01)
+                if job.cancelled.is_set(): continue   # 中断後はパイプを空にするだけ
+                if text: self.sink(job, text, is_err)
+            tail = decoder.decode(b"", final=True)
+            if tail and not job.cancelled.is_set(): self.sink(job, tail, is_err)
+        except (OSError, ValueError):
+            pass
+        finally:
+            pipe.close()
+
+    def _wait(self, job):
+        rc = job.proc.wait()
+        for t in job._readers: t.join()
+        job.returncode = rc
+        job.ended = time.monotonic()
+        if job.state == "running": job.state = "done"
+        log.info(f"Job [{job.id}] {job.state} rc={rc} ({job.bytes_out} bytes, {job.elapsed:.1f} s)")
+        if self.on_exit:
+            try:
+                self.on_exit(job)
+            except Exception:
+                log.exception("Job exit callback failed")
+        with self._lock:
+            self.jobs.pop(job.id, None)
+
+    # --- CONTROL ---
+    def kill(self, job, grace=1.0):
+        """プロセスグループごと終了 (TERM → grace 秒後も残っていれば KILL)"""
+        if job.returncode is not None: return False
+        job.state = "killed"
+        job.cancelled.set()
+        pid = job.proc.pid
+        try:
+            if os.name == "nt":
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+            else:
+                os.killpg(pid, signal.SIGTERM)
+                timer = threading.Timer(grace, self._force_kill, args=(job,))
+                timer.daemon = True   # スクリプト実行器の終了を待たせない
+                timer.start()
+        except (ProcessLookupError, PermissionError, OSError) as e:
+            log.warning(f"Job [{job.id}] kill failed: {e}")
+        return True
+
+    @staticmethod
+    def _force_kill(job):
+        if job.returncode is None and os.name != "nt":
+            try: os.killpg(job.proc.pid, signal.SIGKILL)
+            except OSError: pass
+
+    def get(self, job_id=None):
+        """id 指定 (省略時は最後に起動したもの)"""
+        with self._lock:
+            if job_id is None: return self.jobs[max(self.jobs)] if self.jobs else None
+            return self.jobs.get(job_id)
+
+    def foreground(self):
+        with self._lock:
+            return next((j for j in self.jobs.values() if j.foreground), None)
+
+    def running(self):
+        with self._lock:
+            return sorted(self.jobs.values(), key=lambda j: j.id)
+
+    def kill_all(self):
+        for job in self.running(): self.kill(job)
@@ -0,0 +1,172 @@
+import threading
+from collections import deque
+import tkinter as tk
+
+# =============================================================================
+# [TERMINAL OUTPUT] PER-FRAME BATCHED WRITES + BOUNDED SCROLLBACK FOR tk.Text
+# =============================================================================
+
+# 端末で使う定番の色 (起動時に1度だけ tag_configure する)
+PALETTE = {"out": "#dcdcdc", "info": "#ffffff", "err": "red", "warn": "orange", "dim": "#888888"}
+
+
+class OutputBuffer:
+    """
+    tk.Text への書き込みを溜めて、1フレームに1回まとめて insert します。
+    ・write() はメインスレッド、post() はワーカースレッドから (どちらも溜めるだけ)
+    ・タグは (色, 太字) ごとに1度だけ作って使い回す
+    ・1回の flush で挿入する量は chunk_chars まで (残りは次フレーム) なので巨大出力でも固まらない
+    ・max_lines を超えた古い行は先頭から捨てる (スクロールバックのリングバッファ)
+    ・出力は "out_end" マーク位置に入る。プロンプト表示中はプロンプトの直前なので、
+      裏のジョブの出力が入力中の行を壊さない
+    ・out_end は普段 left gravity (利用者の打鍵では動かない)。コマンド実行中に打った文字 (先行入力) は
+      out_end の後ろに溜まり、出力はその手前に入り、次のプロンプトもその手前に入る → そのまま次の入力行になる
+    """
+    def __init__(self, text, font, bold_font, accent="#00d9ff", max_lines=5000, chunk_chars=64 * 1024, frame_ms=16):
+        self.text = text
+        self.font = font
+        self.bold_font = bold_font
+        self.max_lines = max_lines
+        self.chunk_chars = chunk_chars
+        self.frame_ms = frame_ms
+        self._pending = deque()   # (文字列, タグ)
+        self._pending_chars = 0
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._tags = {}
+        self._prompting = False   # プロンプト表示中 (入力行は input_start 以降)
+        self.flushes = 0
+        self.trimmed_lines = 0
+
+        self.text.mark_set("out_end", "end-1c")
+        self.text.mark_gravity("out_end", "left")   # 打鍵では動かない (出力の挿入時だけ _insert で進める)
+        self.text.mark_set("input_start", "end-1c")
+        self.text.mark_gravity("input_start", "left")   # 入力した文字の前に留まる
+        for name, color in PALETTE.items():
+            self._tags[(color, False)] = self._configure(name, color, False)
+        self.accent = accent
+
+    # --- TAGS ---
+    def _configure(self, name, color, bold):
+        self.text.tag_configure(name, foreground=color, font=self.bold_font if bold else self.font)
+        return name
+
+    def tag(self, color, bold=False):
+        key = (color, bold)
+        tag = self._tags.get(key)
+        if tag is None:
+            tag = self._tags[key] = self._configure(f"c{len(self._tags)}", color, bold)
+        return tag
+
+    @property
+    def accent(self):
+        return self._accent
+
+    @accent.setter
+    def accent(self, color):
+        self._accent = color
+        self._configure("accent", color, True)
+        self._configure("prompt", color, True)
+
+    # --- WRITE ---
+    def write(self, text, color="#dcdcdc", is_bold=False, tag=None):
+        if text: self._push(text, tag or self.tag(color, is_bold))
+
+    def post(self, text, color="#dcdcdc", is_bold=False, tag=None):
+        """ワーカースレッド用 (タグ名を渡すこと。色指定はメインスレッドで解決済みのものだけ)"""
+        if not text: return
+        if tag is None:
+            tag = self._tags.get((color, is_bold)) or ("accent" if color.lower() == self._accent.lower() else "out")
+        self._push(text, tag)
+
+    def _push(self, text, tag):
+        with self._lock:
+            self._pending.append((text, tag))
+            self._pending_chars += len(text)
+            if self._scheduled: return
+            self._scheduled = True
+        try:
+            self.text.after(self.frame_ms, self.flush)
+        except (tk.TclError, RuntimeError):
+            pass   # ウィンドウ破棄後
+
+    @property
+    def pending_chars(self):
+        return self._pending_chars
+
+    # --- FLUSH (main thread) ---
+    def flush(self, limit=None):
+        """溜まった出力を挿入。limit (既定 chunk_chars) を超えた分は次のフレームへ"""
+        limit = limit or self.chunk_chars
+        args, size = [], 0
+        with self._lock:
+            while self._pending and size < limit:
+                chunk, tag = self._pending.popleft()
+                if size + len(chunk) > limit:
+                    cut = limit - size
+                    self._pending.appendleft((chunk[cut:], tag))
+                    chunk = chunk[:cut]
+                if args and args[-1] == tag: args[-2] += chunk   # 同じタグは連結して1引数に
+                else: args += [chunk, tag]
+                size += len(chunk)
+            self._pending_chars -= size
+            more = bool(self._pending)
+            self._scheduled = more
+        try:
+            if args:
+                follow = self.text.yview()[1] >= 0.999   # 最下部を見ている時だけ追従
+                self._insert(*args)
+                self._trim()
+                if follow: self.text.see(tk.END)
+                self.flushes += 1
+            if more: self.text.after(self.frame_ms, self.flush)
+        except tk.TclError:
+            pass
+
+    def _insert(self, *args):
+        """out_end に挿入し、out_end を挿入した文字の後ろへ進める (その先の先行入力は動かさない)"""
+        self.text.mark_gravity("out_end", "right")
+        try:
+            self.text.insert("out_end", *args)
+        finally:
+            self.text.mark_gravity("out_end", "left")
+        if not self._prompting:
+            self.text.mark_set("input_start", "out_end")   # 実行中: 先行入力の頭 (BackSpace で出力を消させない)
+
+    def flush_all(self):
+        while self._pending: self.flush(limit=max(self.chunk_chars, self._pending_chars))
+
+    def _trim(self):
+        lines = int(self.text.index("end-1c").split(".")[0])
+        # 1割の余裕を持たせて、削除は毎フレームではなくまとめて行う
+        if lines > self.max_lines + self.max_lines // 10:
+            excess = lines - self.max_lines
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.trimmed_lines += excess
+
+    # --- PROMPT ---
+    def prompt(self, text):
+        """出力を全て出し切ってからプロンプトを表示し、入力開始位置 (input_start) を返す"""
+        self.flush_all()
+        start = self.text.index("out_end")
+        self._insert(text, "prompt")                    # 先行入力があればその手前 (= 入力行の頭) に入る
+        self._prompting = True
+        self.text.mark_set("input_start", "out_end")
+        self.text.mark_gravity("input_start", "left")   # 入力した文字の前に留まる
+        self.text.mark_set("out_end", start)            # 以降の出力はプロンプトの上へ
+        self.text.mark_set("insert", "end-1c")
+        self.text.see(tk.END)
+
+    def commit_input(self):
+        """Enter 時: 入力行を確定し、出力位置を末尾へ戻す (以降に打った文字は先行入力として out_end の後ろに残る)"""
+        self.flush_all()
+        self._prompting = False
+        self.text.mark_set("out_end", "end-1c")
+        self.text.mark_set("input_start", "end-1c")
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._pending_chars = 0
+        self.text.delete("1.0", tk.END)
+        self.text.mark_set("out_end", "end-1c")
@@ -0,0 +1,116 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from core.logpipe import get_logger
+
+# =============================================================================
+# [THEME] ACCENT COLOR REGISTRY + IN-PLACE RECOLOR OF OPEN WINDOWS
+# =============================================================================
+
+log = get_logger("theme")
+
+PRO_ACCENT = "#ff9d00"
+DEFAULT_ACCENT = "#00d9ff"
+
+# アクセント色が入り得るウィジェットのオプション
+COLOR_OPTIONS = ("fg", "bg", "activebackground", "activeforeground", "highlightbackground", "highlightcolor",
+                 "insertbackground", "selectbackground", "selectforeground", "disabledforeground")
+# 各アプリが ttk.Style に登録しているスタイル
+TTK_STYLES = ("TNotebook", "TNotebook.Tab", "TFrame", "TLabel", "TButton", "Treeview", "Treeview.Heading",
+              "TScale", "Horizontal.TScale", "TEntry", "TCombobox")
+
+
+def accent_for(mode, user_color=None):
+    """Pro モードはオレンジ固定、それ以外はユーザー色"""
+    return PRO_ACCENT if mode == "pro" else (user_color or DEFAULT_ACCENT)
+
+
+class ThemeRegistry:
+    """
+    現在のアクセント色を保持し、変更時は開いている全ウィンドウ (ルート配下の全 Toplevel) を走査して
+    旧アクセント色のオプションだけを新色へ差し替えます (ウィジェットの作り直しはしない)。
+    Canvas の描画物など走査で拾えないものは subscribe(callback(old, new)) で各アプリが塗り替えます。
+    """
+    def __init__(self, root, accent=DEFAULT_ACCENT):
+        self.root = root
+        self.accent = accent
+        self._subscribers = []
+        self._class_options = {}   # winfo_class → 実在する COLOR_OPTIONS
+        self.last_repaint_ms = 0.0
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers: self._subscribers.remove(callback)
+
+    def set_accent(self, accent):
+        old = self.accent
+        if not accent or accent.lower() == (old or "").lower(): return 0
+        self.accent = accent
+        t0 = time.perf_counter()
+        count = self.recolor(self.root, old, accent)
+        count += self._recolor_styles(old, accent)
+        for callback in list(self._subscribers):
+            try:
+                callback(old, accent)
+            except tk.TclError:
+                self.unsubscribe(callback)   # 閉じられたウィンドウの購読は自動解除
+            except Exception:
+                log.exception("Theme subscriber failed")
+        self.last_repaint_ms = (time.perf_counter() - t0) * 1000
+        log.info(f"Accent {old} -> {accent}: {count} option(s) repainted in {self.last_repaint_ms:.1f} ms")
+        return count
+
+    def _options_of(self, widget):
+        cls = widget.winfo_class()
+        opts = self._class_options.get(cls)
+        if opts is None:
+            try:
+                keys = set(widget.keys())
+            except tk.TclError:
+                keys = set()
+            opts = self._class_options[cls] = tuple(o for o in COLOR_OPTIONS if o in keys)
+        return opts
+
+    def recolor(self, widget, old, new):
+        """widget 以下で old 色のオプションを new に置き換え、置き換えた数を返す"""
+        old = old.lower()
+        count = 0
+        stack = [widget]
+        while stack:
+            w = stack.pop()
+            try:
+                changes = {}
+                for opt in self._options_of(w):
+                    if str(w.cget(opt)).lower() == old: changes[opt] = new
+                if changes:
+                    w.configure(**changes)
+                    count += len(changes)
+                stack.extend(w.winfo_children())
+            except tk.TclError:
+                continue
+        return count
+
+    def _recolor_styles(self, old, new):
+        old = old.lower()
+        count = 0
+        style = ttk.Style(self.root)
+        for name in TTK_STYLES:
+            try:
+                conf = style.configure(name) or {}
+                changes = {k: new for k, v in conf.items() if isinstance(v, str) and v.lower() == old}
+                if changes:
+                    style.configure(name, **changes)
+                    count += len(changes)
+                for opt, specs in (style.map(name) or {}).items():
+                    # statespec は (状態..., 値) のタプル
+                    if any(str(spec[-1]).lower() == old for spec in specs):
+                        style.map(name, **{opt: [tuple(spec[:-1]) + (new if str(spec[-1]).lower() == old else spec[-1],)
+                                                 for spec in specs]})
+                        count += 1
+            except tk.TclError:
+                continue
+        return count
@@ -0,0 +1,213 @@
+import os
+import json
+import hashlib
+import secrets
+import threading
+
+from core.config_store import ConfigStore
+from core.logpipe import get_logger
+
+# =============================================================================
+# [USER DIRECTORY] PER-USER PROFILE FILES + APPEND-ONLY CREDENTIAL/NAME INDEX
+# =============================================================================
+
+log = get_logger("users")
+
+DEFAULT_ITERATIONS = 100_000
+
+
+class UserDirectoryError(ValueError):
+    """名前/パスワードの重複、存在しないユーザー等"""
+
+
+class UserDirectory:
+    """
+    users/
+      meta.qcfg        ディレクトリ共通のソルトと PBKDF2 の反復回数
+      index.log        追記専用の索引 (["+h", ハッシュ, id] / ["-h", ハッシュ] / ["+n", 名前, id] / ["-n", 名前])
+      profiles/<id>.qcfg  1ユーザー1ファイルのプロフィール (必要になった時だけ読む)
+
+    ・ログイン: PBKDF2 1回 + 索引の dict 参照 + プロフィール1件の読み込み
+    ・更新: そのユーザーのプロフィール1件の書き換え + 索引への数十バイトの追記のみ
+    ・索引は起動時に1度だけ読み、無効な行が溜まったら作り直す (compact)
+    """
+    def __init__(self, root_dir, stores=None, iterations=DEFAULT_ITERATIONS):
+        self.root_dir = root_dir
+        self.stores = stores
+        self.profile_dir = os.path.join(root_dir, "profiles")
+        self.index_path = os.path.join(root_dir, "index.log")
+        self._lock = threading.RLock()
+        self.by_hash = {}   # ソルト付きハッシュ → id
+        self.by_name = {}   # 小文字の名前 → id
+        self._profiles = {}  # id → ConfigStore (読み込み済みのみ)
+        self._dead = 0
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.meta = self._load_meta(iterations)
+        self._salt = bytes.fromhex(self.meta["salt"])
+        self._load_index()
+
+    # --- META / INDEX ---
+    def _load_meta(self, iterations):
+        meta = ConfigStore(os.path.join(self.root_dir, "meta.qcfg"), delay=0)
+        if not meta.get("salt"):
+            meta.update({"version": 1, "salt": secrets.token_hex(16), "iterations": iterations})
+            meta.flush()
+        return meta.snapshot()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path): return
+        lines = 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op, key, *rest = json.loads(line)
+                except ValueError:
+                    continue   # 書きかけの行 (電源断等) は捨てる
+                lines += 1
+                table = self.by_hash if op[1] == "h" else self.by_name
+                if op[0] == "+": table[key] = rest[0]
+                else: table.pop(key, None)
+        self._dead = lines - len(self.by_hash) - len(self.by_name)
+        if self._dead > max(64, len(self.by_hash) + len(self.by_name)):
+            self.compact()
+
+    def _append(self, *records):
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                if rec[0][0] == "-": self._dead += 2   # 削除行とそれが消す行
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self):
+        """生きているエントリだけで索引を書き直す (一時ファイル → os.replace)"""
+        with self._lock:
+            tmp = f"{self.index_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, uid in self.by_hash.items():
+                    f.write(json.dumps(["+h", key, uid]) + "\n")
+                for key, uid in self.by_name.items():
+                    f.write(json.dumps(["+n", key, uid], ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.index_path)
+            log.info(f"User index compacted: {len(self.by_hash)} credential(s), {self._dead} dead line(s) dropped.")
+            self._dead = 0
+
+    # --- PROFILES ---
+    def credential_hash(self, password):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), self._salt, self.meta["iterations"]).hex()
+
+    def _store(self, uid):
+        store = self._profiles.get(uid)
+        if store is None:
+            path = os.path.join(self.profile_dir, f"{uid}.qcfg")
+            store = self.stores.open(path) if self.stores else ConfigStore(path)
+            self._profiles[uid] = store
+        return store
+
+    def get(self, uid):
+        """id → プロフィール (コピー)。無ければ None"""
+        with self._lock:
+            if uid not in self._profiles and not os.path.exists(os.path.join(self.profile_dir, f"{uid}.qcfg")):
+                return None
+            profile = self._store(uid).snapshot()
+        profile.pop("credential", None)
+        return profile | {"id": uid}
+
+    def find(self, name):
+        uid = self.by_name.get(name.lower())
+        return self.get(uid) if uid else None
+
+    def authenticate(self, password):
+        """パスワード → プロフィール (一致しなければ None)"""
+        uid = self.by_hash.get(self.credential_hash(password))
+        return self.get(uid) if uid else None
+
+    def __len__(self):
+        return len(self.by_hash)
+
+    # --- WRITE ---
+    def create(self, name, password, role="USER", color="#00d9ff", credential=None):
+        credential = credential or self.credential_hash(password)
+        with self._lock:
+            if name.lower() in self.by_name: raise UserDirectoryError(f"user name already exists: {name}")
+            if credential in self.by_hash: raise UserDirectoryError("password already in use")
+            uid = secrets.token_hex(6)
+            store = self._store(uid)
+            store.replace({"name": name, "role": role, "color": color, "credential": credential})
+            store.flush()   # プロフィールを書いてから索引へ (索引だけ残って get() が None になる窓を作らない)
+            self._append(["+h", credential, uid], ["+n", name.lower(), uid])
+            self.by_hash[credential] = uid
+            self.by_name[name.lower()] = uid
+        return self.get(uid)
+
+    def update(self, uid, **fields):
+        """name/role/color 等の更新。名前が変わった時だけ名前索引に追記"""
+        fields.pop("credential", None)
+        fields.pop("id", None)
+        with self._lock:
+            store = self._store(uid)
+            old_name = store.get("name", "")
+            new_name = fields.get("name") or old_name
+            if new_name.lower() != old_name.lower():
+                if new_name.lower() in self.by_name: raise UserDirectoryError(f"user name already exists: {new_name}")
+                self._append(["-n", old_name.lower()], ["+n", new_name.lower(), uid])
+                self.by_name.pop(old_name.lower(), None)
+                self.by_name[new_name.lower()] = uid
+            with store.transaction() as data:
+                data.update({k: v for k, v in fields.items() if v is not None})
+        return self.get(uid)
+
+    def check_password(self, password, uid=None):
+        """password が uid 以外のユーザーに使われていれば UserDirectoryError (変更前の確認用)"""
+        owner = self.by_hash.get(self.credential_hash(password))
+        if owner is not None and owner != uid: raise UserDirectoryError("password already in use")
+
+    def set_password(self, uid, password):
+        credential = self.credential_hash(password)
+        with self._lock:
+            owner = self.by_hash.get(credential)
+            if owner == uid: return
+            if owner is not None: raise UserDirectoryError("password already in use")
+            store = self._store(uid)
+            old = store.get("credential")
+            self._append(*([["-h", old]] if old else []), ["+h", credential, uid])
+            self.by_hash.pop(old, None)
+            self.by_hash[credential] = uid
+            store.set("credential", credential)
+
+    def delete(self, uid):
+        with self._lock:
+            store = self._store(uid)
+            credential, name = store.get("credential"), store.get("name", "")
+            self._append(["-h", credential], ["-n", name.lower()])
+            self.by_hash.pop(credential, None)
+            self.by_name.pop(name.lower(), None)
+            if self.stores: self.stores.close(store.path)
+            else: store.flush()
+            self._profiles.pop(uid, None)
+            try: os.remove(store.path)
+            except OSError: pass
+
+    def flush(self, uid=None):
+        """保留中のプロフィールを書き出す (uid 指定時はその1件だけ)"""
+        with self._lock:
+            stores = [self._store(uid)] if uid else list(self._profiles.values())
+        return all([s.flush() for s in stores])
+
+    # --- MIGRATION ---
+    def migrate(self, legacy):
+        """旧 system.qcfg の "users" ({平文パスワード: 情報}) を取り込む。取り込んだ件数を返す"""
+        count = 0
+        for password, info in legacy.items():
+            credential = self.credential_hash(password)
+            if credential in self.by_hash: continue
+            name = base = info.get("name") or "USER"
+            n = 2
+            while name.lower() in self.by_name:
+                name, n = f"{base}-{n}", n + 1
+            self.create(name, password, info.get("role", "USER"), info.get("color", "#00d9ff"), credential=credential)
+            count += 1
+        if count: log.info(f"Migrated {count} legacy user(s) into {self.root_dir}")
+        return count
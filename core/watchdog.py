@@ -0,0 +1,143 @@
+import os
+import time
+import datetime
+import threading
+from collections import Counter
+
+from core import stacks
+from core.logpipe import get_logger
+
+# =============================================================================
+# [STALL WATCHDOG] MAIN-LOOP HEARTBEAT + STACK SAMPLING DURING STALLS
+# =============================================================================
+
+log = get_logger("watchdog")
+
+# system.qcfg の system_info.watchdog で上書きできる項目と型
+OPTIONS = {"threshold_ms": float, "heartbeat_ms": float, "sample_ms": float, "max_reports": int}
+
+
+class StallWatchdog(threading.Thread):
+    """
+    メインループに heartbeat_ms 間隔の after を仕掛け、ワーカースレッドから鼓動の途絶を監視します。
+    鼓動が途絶えたらメインスレッドのスタックを sample_ms 間隔で採取し、
+    threshold_ms を超えた停止はアプリ別に集計して diagnostics/ にレポートを書きます。
+    """
+    @staticmethod
+    def options(settings):
+        """設定セクション → __init__ の引数。知らない項目・数値にならない値・0 以下は警告して捨てる (起動は止めない)"""
+        opts = {}
+        for key, value in (settings if isinstance(settings, dict) else {}).items():
+            kind = OPTIONS.get(key)
+            try:
+                if kind is None: raise ValueError("unknown option")
+                value = kind(value)
+                if value <= 0: raise ValueError("must be positive")
+            except (TypeError, ValueError) as e:
+                log.warning(f"Ignoring watchdog setting {key}={value!r}: {e}")
+                continue
+            opts[key] = value
+        return opts
+
+    def __init__(self, root, report_dir, threshold_ms=500, heartbeat_ms=100, sample_ms=20,
+                 max_reports=50, after=None):
+        super().__init__(name="quori-watchdog", daemon=True)
+        self.root = root
+        self.report_dir = report_dir
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = heartbeat_ms / 1000
+        self.sample_interval = sample_ms / 1000
+        self.max_reports = max_reports
+        self._after = after or root.after
+        self._last_beat = None   # 最初の鼓動 (mainloop 開始) までは監視しない
+        self._halt = threading.Event()
+        self._lock = threading.Lock()
+        self.stalls = Counter()   # アプリ → 回数
+        self.stall_ms = Counter()  # アプリ → 合計停止時間
+        self.last_report = None
+
+    # --- MAIN THREAD ---
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        if not self._halt.is_set():
+            self._after(int(self.heartbeat * 1000), self._beat)
+
+    def start(self):
+        self._after(0, self._beat)
+        super().start()
+        return self
+
+    def stop(self):
+        self._halt.set()
+
+    # --- WATCHDOG THREAD ---
+    def run(self):
+        samples, started = [], None
+        # 鼓動の遅れが「間隔 + 2サンプル」を超えたら採取開始 (短い停止は捨てる)
+        suspect = self.heartbeat + 2 * self.sample_interval
+        while not self._halt.wait(self.sample_interval):
+            last = self._last_beat
+            if last is None: continue
+            gap = time.monotonic() - last
+            if gap > suspect:
+                if started is None:
+                    started = last + self.heartbeat   # 本来鼓動が来るはずだった時刻
+                    samples = []
+                samples.append(stacks.sample())
+            elif started is not None:
+                duration = last - started
+                if duration >= self.threshold and samples:
+                    try:
+                        self._report(started, duration, samples)
+                    except Exception:
+                        log.exception("Stall report failed")
+                started = None
+
+    def _report(self, started, duration, samples):
+        owners = Counter(stacks.owner_of_stack(s) for s in samples if s)
+        owner = owners.most_common(1)[0][0] if owners else "?"
+        ms = duration * 1000
+        with self._lock:
+            self.stalls[owner] += 1
+            self.stall_ms[owner] += ms
+
+        top = next((s for _, s in stacks.aggregate(samples) if stacks.owner_of_stack(s) == owner), samples[-1])
+        frame = stacks.culprit_frame(top, owner)
+        where = f"{frame[1]} ({os.path.basename(frame[2])}:{frame[3]})" if frame else "?"
+        path = self._write_report(ms, owner, owners, samples)
+        log.warning(f"Main loop stall: {ms:.0f} ms in {owner} at {where} ({len(samples)} samples) -> {os.path.basename(path)}")
+
+    def _write_report(self, ms, owner, owners, samples):
+        os.makedirs(self.report_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        path = os.path.join(self.report_dir, f"stall_{stamp}_{owner}.txt")
+        lines = [
+            "QUORI OS MAIN LOOP STALL REPORT",
+            f"Time      : {datetime.datetime.now().isoformat(timespec='milliseconds')}",
+            f"Duration  : {ms:.0f} ms (threshold {self.threshold * 1000:.0f} ms)",
+            f"Owner     : {owner}",
+            f"Samples   : {len(samples)} every {self.sample_interval * 1000:.0f} ms",
+            "Attribution: " + ", ".join(f"{k} {n}" for k, n in owners.most_common()),
+            "",
+        ]
+        total = max(1, len(samples))
+        for n, stack in stacks.aggregate(samples):
+            lines.append(f"--- {n}/{total} samples ({n * 100 // total}%) owner={stacks.owner_of_stack(stack)}")
+            lines.append(stacks.format_stack(stack))
+            lines.append("")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        self.last_report = path
+        self._prune()
+        return path
+
+    def _prune(self):
+        reports = sorted(e.path for e in os.scandir(self.report_dir)
+                         if e.name.startswith("stall_") and e.name.endswith(".txt"))
+        for path in reports[:-self.max_reports]:
+            try: os.remove(path)
+            except OSError: pass
+
+    def stats(self):
+        with self._lock:
+            return {owner: {"stalls": n, "total_ms": self.stall_ms[owner]} for owner, n in self.stalls.items()}
@@ -2,7 +2,6 @@ from tkinter import colorchooser
 import tkinter as tk
 from tkinter import messagebox
 import os
-import json
 
 def run(root, os_core):
     """OSコアから呼び出されるエントリポイント"""
@@ -15,9 +14,11 @@ class SettingApp:
         
         # 物理パス解決
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.config_path = os.path.join(self.base_dir, "system.qcfg")
         self.app_dir = os.path.join(self.base_dir, "app")
         
+        # system.qcfg はカーネルの設定ストア経由で読み書き (直接ファイルを触らない)
+        self.store = self.os_core.config_store
+        
         # ウィンドウ初期化
         self.win = tk.Toplevel(master)
         self.win.title("QUORI SYSTEM CONTROL CENTER")
@@ -27,29 +28,39 @@ class SettingApp:
         
         self.update_accent_color()
         
-        # メインコンテナ（この中身を入れ替える）
+        # ページは初回表示時に1度だけ構築し、以降は表示/非表示の切替のみ
+        self.pages = {}
         self.main_container = None
-        self.refresh_container()
+        self.storage_watch = None
+        self.win.bind("<Destroy>", lambda e: self.unwatch_storage() if e.widget is self.win else None)
         
         self.show_main_menu()
 
     def update_accent_color(self):
-        """Proモード同期"""
-        self.acc = "#ff9d00" if self.os_core.system_mode == "pro" else "#00d9ff"
+        """Proモード同期 (カーネルのテーマがあればその色)"""
+        theme = getattr(self.os_core, "theme", None)
+        if theme: self.acc = theme.accent
+        else: self.acc = "#ff9d00" if self.os_core.system_mode == "pro" else "#00d9ff"
 
-    def refresh_container(self):
-        """Bad window pathエラーを防ぐための重厚なコンテナ再生成ロジック"""
+    def show_page(self, name, build, on_show=None):
+        """name のページを表示 (未構築なら build で構築)。表示の度に on_show で中身だけ更新"""
         if self.main_container and self.main_container.winfo_exists():
-            self.main_container.destroy()
-        
-        self.main_container = tk.Frame(self.win, bg="#050505")
-        self.main_container.pack(fill="both", expand=True, padx=50, pady=50)
+            self.main_container.pack_forget()
+        page = self.pages.get(name)
+        if page is None or not page.winfo_exists():
+            self.update_accent_color()
+            page = self.main_container = tk.Frame(self.win, bg="#050505")
+            build()
+            self.pages[name] = page
+        self.main_container = page
+        page.pack(fill="both", expand=True, padx=50, pady=50)
+        if on_show: on_show()
 
     # --- [PAGE 1] MAIN MENU ---
     def show_main_menu(self):
-        self.refresh_container()
-        self.update_accent_color()
-        
+        self.show_page("main", self.build_main_menu)
+
+    def build_main_menu(self):
         tk.Label(self.main_container, text="CORE CONTROL PANEL", fg=self.acc, bg="#050505", 
                  font=("Consolas", 28, "bold")).pack(pady=(0, 50))
         
@@ -71,31 +82,39 @@ class SettingApp:
 
     # --- [PAGE 2] PERSONALIZATION ---
     def show_personal_settings(self):
-        self.refresh_container()
+        self.show_page("personal", self.build_personal_settings, self.load_personal_settings)
+
+    def build_personal_settings(self):
         tk.Label(self.main_container, text="PERSONALIZATION", fg=self.acc, bg="#050505", font=("Consolas", 20, "bold")).pack(pady=(0, 30))
         
         # ユーザー名
         tk.Label(self.main_container, text="DISPLAY NAME", fg="#888", bg="#050505", font=("Consolas", 10)).pack(anchor="w")
         self.user_entry = tk.Entry(self.main_container, bg="#111", fg="white", relief="flat", font=("Consolas", 14))
-        self.user_entry.insert(0, self.os_core.config.get("user_name", "ADMIN"))
         self.user_entry.pack(fill="x", pady=(5, 15), ipady=8)
 
         # パスワード
         tk.Label(self.main_container, text="ACCESS PASSWORD", fg="#888", bg="#050505", font=("Consolas", 10)).pack(anchor="w")
         self.pw_entry = tk.Entry(self.main_container, bg="#111", fg="white", relief="flat", font=("Consolas", 14))
-        self.pw_entry.insert(0, self.os_core.config.get("password", ""))
         self.pw_entry.pack(fill="x", pady=(5, 15), ipady=8)
 
         # テーマカラー
         tk.Label(self.main_container, text="THEME ACCENT COLOR", fg="#888", bg="#050505", font=("Consolas", 10)).pack(anchor="w")
-        self.target_color = self.os_core.config.get("accent_color", "#00d9ff")
-        self.color_preview = tk.Frame(self.main_container, bg=self.target_color, height=40)
+        self.color_preview = tk.Frame(self.main_container, bg="#00d9ff", height=40)
         self.color_preview.pack(fill="x", pady=5)
         
         tk.Button(self.main_container, text="PICK NEW COLOR", command=self.pick_color, bg="#222", fg="white", relief="flat").pack(fill="x", pady=(0, 15))
 
         self.add_navigation_buttons(self.save_personal)
 
+    def load_personal_settings(self):
+        """表示の度に保存済みの値へ戻す (未保存の入力は破棄)"""
+        self.user_entry.delete(0, tk.END)
+        self.user_entry.insert(0, self.os_core.config.get("user_name", "ADMIN"))
+        self.pw_entry.delete(0, tk.END)
+        self.pw_entry.insert(0, self.os_core.config.get("password", ""))
+        self.target_color = self.os_core.config.get("accent_color", "#00d9ff")
+        self.color_preview.config(bg=self.target_color)
+
     def pick_color(self):
         color = colorchooser.askcolor(initialcolor=self.target_color)[1]
         if color:
@@ -104,26 +123,29 @@ class SettingApp:
 
     # --- [PAGE 3] SYSTEM MANAGEMENT ---
     def show_system_settings(self):
-        self.refresh_container()
+        self.show_page("system", self.build_system_settings, self.load_system_settings)
+
+    def build_system_settings(self):
         tk.Label(self.main_container, text="SYSTEM ARCHITECTURE", fg=self.acc, bg="#050505", font=("Consolas", 20, "bold")).pack(pady=(0, 30))
 
-        # 容量計算
-        try:
-            app_count = len([f for f in os.listdir(self.app_dir) if f.endswith(".py")])
-            app_size = sum(os.path.getsize(os.path.join(self.app_dir, f)) for f in os.listdir(self.app_dir)) / 1024
-        except:
-            app_count, app_size = 0, 0
-        
+        # 容量 (カーネルの storage サービスのキャッシュから即描画 → 裏の再走査が終わったら差し替え)
         stat_frame = tk.Frame(self.main_container, bg="#111", padx=15, pady=15)
         stat_frame.pack(fill="x", pady=10)
-        tk.Label(stat_frame, text=f"INSTALLED APPS: {app_count}", fg="white", bg="#111", font=("Consolas", 11)).pack(anchor="w")
-        tk.Label(stat_frame, text=f"APP DIRECTORY SIZE: {app_size:.2f} KB", fg="white", bg="#111", font=("Consolas", 11)).pack(anchor="w")
+        self.storage_summary = tk.Label(stat_frame, text="", fg="white", bg="#111", font=("Consolas", 11), justify="left")
+        self.storage_summary.pack(anchor="w")
+        self.storage_table = tk.Label(stat_frame, text="", fg="#888", bg="#111", font=("Consolas", 9), justify="left")
+        self.storage_table.pack(anchor="w", pady=(8, 0))
+        storage = getattr(self.os_core, "storage", None)
+        if storage:
+            self.storage_watch = storage.subscribe(lambda snap: self.win.after(0, lambda: self.render_storage(snap)))
+        else:
+            self.storage_summary.config(text="STORAGE SERVICE NOT AVAILABLE")
 
         # Pro切替
         tk.Label(self.main_container, text="KERNEL OPERATION MODE", fg="#888", bg="#050505", font=("Consolas", 10)).pack(anchor="w", pady=(20, 0))
-        mode_text = f"SWITCH TO { 'NORMAL' if self.os_core.system_mode == 'pro' else 'PRO' } MODE"
-        tk.Button(self.main_container, text=mode_text, command=self.toggle_mode_ui, 
-                  bg=self.acc, fg="black", font=("Consolas", 12, "bold"), pady=10).pack(fill="x", pady=5)
+        self.mode_button = tk.Button(self.main_container, command=self.toggle_mode_ui, 
+                                     bg=self.acc, fg="black", font=("Consolas", 12, "bold"), pady=10)
+        self.mode_button.pack(fill="x", pady=5)
 
         # ユーザー追加
         tk.Label(self.main_container, text="SECURITY ACCESS", fg="#888", bg="#050505", font=("Consolas", 10)).pack(anchor="w", pady=(20, 0))
@@ -132,10 +154,40 @@ class SettingApp:
 
         self.add_navigation_buttons(self.save_system)
 
+    def load_system_settings(self):
+        self.mode_button.config(text=f"SWITCH TO { 'NORMAL' if self.os_core.system_mode == 'pro' else 'PRO' } MODE")
+        storage = getattr(self.os_core, "storage", None)
+        if storage:
+            self.render_storage(storage.snapshot())
+            storage.refresh_async()
+
+    def render_storage(self, snap):
+        if not self.storage_summary.winfo_exists(): return
+        if not snap["ready"]:
+            self.storage_summary.config(text="INSTALLED APPS: ...\nAPP DIRECTORY SIZE: scanning...")
+            return
+        t = snap["total"]
+        self.storage_summary.config(text=f"INSTALLED APPS: {snap['installed']}\n"
+                                         f"APP DIRECTORY SIZE: {sum(t[k] for k in ('code', 'icons', 'data', 'caches')) / 1024:.2f} KB ({t['files']} files)")
+        kb = lambda n: f"{n / 1024:.1f}"
+        lines = [f"{'APP':<14}{'CODE':>9}{'ICONS':>9}{'DATA':>9}{'CACHE':>9}  KB"]
+        rows = sorted(snap["apps"].items(), key=lambda kv: -sum(kv[1][k] for k in ("code", "icons", "data", "caches")))
+        for name, a in rows:
+            lines.append(f"{name[:13]:<14}{kb(a['code']):>9}{kb(a['icons']):>9}{kb(a['data']):>9}{kb(a['caches']):>9}")
+        self.storage_table.config(text="\n".join(lines))
+
+    def unwatch_storage(self):
+        storage = getattr(self.os_core, "storage", None)
+        if storage and self.storage_watch:
+            storage.unsubscribe(self.storage_watch)
+        self.storage_watch = None
+
     def toggle_mode_ui(self):
+        """ウィジェットは作り直さず、テーマ経由で開いている全ウィンドウの色だけ差し替える"""
         self.os_core.system_mode = "pro" if self.os_core.system_mode == "normal" else "normal"
+        self.os_core.apply_theme()
         self.update_accent_color()
-        self.show_system_settings()
+        self.load_system_settings()
 
     def add_navigation_buttons(self, save_func):
         btn_f = tk.Frame(self.main_container, bg="#050505")
@@ -151,30 +203,42 @@ class SettingApp:
         self.finalize_save(new_mode=self.os_core.system_mode)
 
     def finalize_save(self, new_user=None, new_pw=None, new_color=None, new_mode=None):
+        directory = getattr(self.os_core, "users", None)
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            else:
-                data = {"users": {}, "system_info": {}}
+            if new_pw and directory is not None:
+                # ユーザーディレクトリ: プロフィール1件の書き換えと索引への追記だけ
+                self.save_to_directory(directory, new_user, new_pw, new_color)
+
+            # トランザクション内の変更だけがストアに反映され、購読者 (カーネル等) に通知される
+            with self.store.transaction() as data:
+                if new_pw and directory is None:
+                    users = data.setdefault("users", {})
+                    old_pw = self.os_core.config.get("password")
+                    user_info = users.pop(old_pw, {"role": "ADMIN", "color": "#00d9ff", "name": "ADMIN"})
+                    if new_user: user_info["name"] = new_user
+                    if new_color: user_info["color"] = new_color
+                    users[new_pw] = user_info
+
+                if new_mode:
+                    data.setdefault("system_info", {})["mode"] = new_mode
 
             if new_pw:
-                old_pw = self.os_core.config.get("password")
-                user_info = data.get("users", {}).get(old_pw, {"role": "ADMIN", "color": "#00d9ff", "name": "ADMIN"})
-                if old_pw in data["users"]: data["users"].pop(old_pw)
-                if new_user: user_info["name"] = new_user
-                if new_color: user_info["color"] = new_color
-                data["users"][new_pw] = user_info
                 self.os_core.config.update({"password": new_pw, "user_name": new_user, "accent_color": new_color})
-
-            if new_mode:
-                if "system_info" not in data: data["system_info"] = {}
-                data["system_info"]["mode"] = new_mode
-
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+                if hasattr(self.os_core, "apply_theme"): self.os_core.apply_theme(user_color=new_color)
 
             messagebox.showinfo("SYNC", "System state updated.")
             self.show_main_menu()
         except Exception as e:
-            messagebox.showerror("ERROR", f"Save failed: {e}")
\ No newline at end of file
+            messagebox.showerror("ERROR", f"Save failed: {e}")
+
+    def save_to_directory(self, directory, new_user, new_pw, new_color):
+        """ログイン中のユーザーを更新 (id の無い旧セッションなら新規作成)"""
+        user = self.os_core.current_user
+        if user and user.get("id"):
+            directory.check_password(new_pw, user["id"])   # 名前を書き換える前に確認 (途中で失敗して半端に残さない)
+            profile = directory.update(user["id"], name=new_user or None, color=new_color)
+            directory.set_password(user["id"], new_pw)
+            user.update(profile)
+        else:
+            # 以降のセッションは作成したユーザーとして扱う (次の保存で再び作成しない)
+            self.os_core.current_user = directory.create(new_user or "ADMIN", new_pw, role="ADMIN", color=new_color or "#00d9ff")